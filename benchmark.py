@@ -0,0 +1,407 @@
+"""
+Skylark 识别翻译流程基准测试（无界面，不导入 Qt）
+
+使用合成的文字图片（多种语言、字号和对比度，覆盖预处理的各个分支）测量
+截图 / 预处理 / OCR / 翻译各阶段的耗时分位数、吞吐量和峰值内存，
+对比不同 OCR 后端和预处理方案，结果以 JSON 输出便于跟踪性能回归。
+
+示例:
+    python benchmark.py --output bench.json
+    python benchmark.py --langs en,zh --sizes 16,32 --backends tesserocr --variants default,nlmeans
+    python benchmark.py --translate argos --target zh
+    python benchmark.py --langs en --argos-tuning en-zh
+"""
+import argparse
+import contextlib
+import difflib
+import json
+import os
+import platform
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+import pytesseract
+from PIL import Image, ImageDraw, ImageFont
+
+from image_preprocess import ImagePreprocessor, DENOISE_BILATERAL, DENOISE_NLMEANS
+from languages import SUPPORTED_LANGUAGES, OCR_LANG_MAP
+from ocr_engine import get_available_ocr_backends, get_tessdata_registry, shutdown_ocr_backends
+from ocr_pipeline import OCRPipeline
+from perf_monitor import percentile
+
+# 每种语言的样例文字（两行，包含标点和数字）
+SAMPLE_TEXTS = {
+    'en': "The quick brown fox jumps over the lazy dog.\nSettings saved at 10:45, 3 items updated.",
+    'fr': "Le vif renard brun saute par-dessus le chien.\nParamètres enregistrés, 3 éléments mis à jour.",
+    'de': "Der schnelle braune Fuchs springt über den Hund.\nEinstellungen gespeichert, 3 Elemente aktualisiert.",
+    'es': "El veloz zorro marrón salta sobre el perro.\nAjustes guardados, 3 elementos actualizados.",
+    'it': "La veloce volpe marrone salta sopra il cane.\nImpostazioni salvate, 3 elementi aggiornati.",
+    'pt': "A rápida raposa marrom pula sobre o cão.\nConfigurações salvas, 3 itens atualizados.",
+    'ru': "Быстрая коричневая лиса прыгает через собаку.\nНастройки сохранены, обновлено 3 элемента.",
+    'uk': "Швидка руда лисиця стрибає через собаку.\nНалаштування збережено, оновлено 3 елементи.",
+    'el': "Η γρήγορη καφέ αλεπού πηδά πάνω από τον σκύλο.\nΟι ρυθμίσεις αποθηκεύτηκαν.",
+    'zh': "敏捷的棕色狐狸跳过了懒狗。\n设置已保存，已更新 3 个项目。",
+    'ja': "素早い茶色の狐が怠け者の犬を飛び越える。\n設定を保存しました。3 件を更新しました。",
+    'ko': "빠른 갈색 여우가 게으른 개를 뛰어넘는다.\n설정이 저장되었습니다. 3개 항목이 업데이트됨.",
+    'ar': "الثعلب البني السريع يقفز فوق الكلب الكسول.\nتم حفظ الإعدادات.",
+}
+
+# 按文字系统挑选字体（按顺序尝试，Pillow 会在系统字体目录中查找）
+FONT_CANDIDATES = {
+    'latin': ["DejaVuSans.ttf", "arial.ttf", "Arial.ttf", "LiberationSans-Regular.ttf", "Helvetica.ttc"],
+    'cjk': ["NotoSansCJK-Regular.ttc", "NotoSansCJKsc-Regular.otf", "msyh.ttc", "simhei.ttf",
+            "wqy-microhei.ttc", "PingFang.ttc", "malgun.ttf", "meiryo.ttc"],
+    'arabic': ["NotoSansArabic-Regular.ttf", "arial.ttf", "DejaVuSans.ttf"],
+}
+LANGUAGE_SCRIPTS = {'zh': 'cjk', 'ja': 'cjk', 'ko': 'cjk', 'ar': 'arabic', 'fa': 'arabic'}
+
+# 对比度方案: (背景灰度, 文字灰度, 噪声标准差)，分别命中预处理的各个分支
+CONTRASTS = {
+    'normal': (200, 30, 0),          # 正常光照 → Otsu 二值化
+    'low_contrast': (140, 115, 0),   # 低对比度 → 拉伸 + 自适应阈值
+    'dark': (18, 190, 12),           # 过暗 → 直方图均衡 + 去噪
+    'bright': (242, 120, 12),        # 过亮 → 直方图均衡 + 去噪
+}
+
+# 预处理方案: 名称 -> (ImagePreprocessor 参数, process 参数)
+PREPROCESS_VARIANTS = {
+    'default': ({}, {}),
+    'bilateral': ({'denoise_mode': DENOISE_BILATERAL}, {}),
+    'nlmeans': ({}, {'denoise': DENOISE_NLMEANS}),
+    'no_autoscale': ({'auto_scale': False}, {}),
+}
+
+Sample = namedtuple('Sample', ['name', 'lang', 'font_size', 'contrast', 'image', 'text'])
+
+
+def summarize(timings_ms):
+    """耗时统计（毫秒）"""
+    values = sorted(timings_ms)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values), 3),
+        'min_ms': round(values[0], 3),
+        'p50_ms': round(percentile(values, 50), 3),
+        'p90_ms': round(percentile(values, 90), 3),
+        'p95_ms': round(percentile(values, 95), 3),
+        'p99_ms': round(percentile(values, 99), 3),
+        'max_ms': round(values[-1], 3),
+    }
+
+
+def peak_rss_mb():
+    """进程峰值常驻内存（MB），无法获取时返回 None"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 以 KB 为单位，macOS 以字节为单位
+        return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+def text_accuracy(expected, actual):
+    """忽略空白后的字符相似度（0-1）"""
+    expected = "".join(expected.split())
+    actual = "".join(actual.split())
+    if not expected:
+        return 1.0 if not actual else 0.0
+    return round(difflib.SequenceMatcher(None, expected, actual).ratio(), 4)
+
+
+def load_font(lang, size):
+    """加载适合该语言文字系统的字体，找不到时返回 None"""
+    for name in FONT_CANDIDATES[LANGUAGE_SCRIPTS.get(lang, 'latin')]:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return None
+
+
+def render_text_image(text, font, contrast, rng, padding=20):
+    """将文字渲染为灰度图，返回 uint8 NumPy 数组"""
+    background, foreground, noise = CONTRASTS[contrast]
+    measure = ImageDraw.Draw(Image.new('L', (1, 1)))
+    left, top, right, bottom = measure.multiline_textbbox((0, 0), text, font=font, spacing=8)
+    size = (right - left + padding * 2, bottom - top + padding * 2)
+    image = Image.new('L', size, background)
+    ImageDraw.Draw(image).multiline_text((padding - left, padding - top), text, fill=foreground,
+                                         font=font, spacing=8)
+    array = np.asarray(image, dtype=np.float32)
+    if noise:
+        array = array + rng.normal(0, noise, array.shape)
+    return np.clip(array, 0, 255).astype(np.uint8)
+
+
+def build_corpus(languages, font_sizes, contrasts, seed=0):
+    """生成合成文字图片语料，返回 (样本列表, 跳过原因列表)"""
+    rng = np.random.default_rng(seed)
+    samples, skipped = [], []
+    for lang in languages:
+        if lang not in SAMPLE_TEXTS:
+            skipped.append(f"{lang}: 没有样例文字")
+            continue
+        for font_size in font_sizes:
+            font = load_font(lang, font_size)
+            if font is None:
+                skipped.append(f"{lang}: 找不到可用字体")
+                break
+            for contrast in contrasts:
+                text = SAMPLE_TEXTS[lang]
+                image = render_text_image(text, font, contrast, rng)
+                samples.append(Sample(f"{lang}-{font_size}px-{contrast}", lang, font_size, contrast, image, text))
+    return samples, skipped
+
+
+def benchmark_preprocess(samples, variants, repeat):
+    """各预处理方案的耗时和分支命中情况"""
+    results = {}
+    for variant in variants:
+        init_kwargs, process_kwargs = PREPROCESS_VARIANTS[variant]
+        preprocessor = ImagePreprocessor(**init_kwargs)
+        timings, stage_timings, branches = [], {}, {}
+        for sample in samples:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                preprocessor.process(sample.image, **process_kwargs)
+                timings.append((time.perf_counter() - start) * 1000)
+                for stage, ms in preprocessor.last_timings.items():
+                    stage_timings.setdefault(stage, []).append(ms)
+            branches[preprocessor.last_branch] = branches.get(preprocessor.last_branch, 0) + 1
+        results[variant] = {
+            'total': summarize(timings),
+            'stages': {stage: summarize(values) for stage, values in stage_timings.items()},
+            'branches': branches,
+        }
+    return results
+
+
+def benchmark_ocr(samples, backends, variants, ocr_langs):
+    """各 OCR 后端 × 预处理方案的识别耗时、识别准确度和吞吐量"""
+    results = {}
+    for backend_name in backends:
+        for variant in variants:
+            init_kwargs, process_kwargs = PREPROCESS_VARIANTS[variant]
+            pipeline = OCRPipeline(backend_name=backend_name, preprocessor=ImagePreprocessor(**init_kwargs))
+            pipeline.denoise_escalation_confidence = 0  # 单独测量每个方案，不自动重试
+            preprocess_ms, ocr_ms, accuracy, confidence = [], [], [], []
+            wall_start = time.perf_counter()
+            for sample in samples:
+                start = time.perf_counter()
+                processed = pipeline.preprocess(sample.image, **process_kwargs)
+                middle = time.perf_counter()
+                text = pipeline.recognize(processed, ocr_langs[sample.lang])
+                end = time.perf_counter()
+                preprocess_ms.append((middle - start) * 1000)
+                ocr_ms.append((end - middle) * 1000)
+                accuracy.append(text_accuracy(sample.text, text))
+                confidence.append(pipeline.last_confidence)
+            wall = time.perf_counter() - wall_start
+            pipeline.close()
+            results[f"{backend_name}/{variant}"] = {
+                'preprocess': summarize(preprocess_ms),
+                'ocr': summarize(ocr_ms),
+                'end_to_end': summarize([a + b for a, b in zip(preprocess_ms, ocr_ms)]),
+                'throughput_images_per_s': round(len(samples) / wall, 2) if wall else None,
+                'mean_accuracy': round(sum(accuracy) / len(accuracy), 4) if accuracy else None,
+                'mean_confidence': round(sum(confidence) / len(confidence), 2) if confidence else None,
+            }
+    return results
+
+
+def benchmark_translate(samples, mode, target, engine):
+    """翻译耗时（使用样例原文，排除 OCR 误差的影响）"""
+    if mode == 'argos':
+        from offline_translator import Translator
+        translator = Translator(None)
+        if not translator.initialize():
+            return {'error': "Argos 翻译引擎初始化失败"}
+        translate = translator.translate
+    else:
+        from online_translator import OnlineTranslator
+        translator = OnlineTranslator()
+        if engine:
+            translator.set_translator(engine)
+        translate = translator.translate
+
+    timings, errors = {}, 0
+    texts = {}
+    for sample in samples:
+        texts.setdefault(sample.lang, sample.text)
+    for lang, text in texts.items():
+        to_lang = target if target != lang else 'en'
+        start = time.perf_counter()
+        try:
+            translate(text, lang, to_lang)
+        except Exception as e:
+            errors += 1
+            print(f"翻译失败 ({lang}->{to_lang}): {e}")
+            continue
+        timings.setdefault(f"{lang}->{to_lang}", []).append((time.perf_counter() - start) * 1000)
+
+    all_timings = [ms for values in timings.values() for ms in values]
+    return {
+        'mode': mode,
+        'engine': engine if mode == 'online' else 'argos',
+        'total': summarize(all_timings),
+        'pairs': {pair: summarize(values) for pair, values in timings.items()},
+        'errors': errors,
+    }
+
+
+def benchmark_argos_settings(pair, repeat):
+    """比较 Argos 离线翻译的不同推理设置（线程数、计算精度）"""
+    from offline_translator import Translator
+    if len(pair) != 2:
+        return {'error': "语言对格式应为 源语言-目标语言，如 en-zh"}
+    from_code, to_code = pair
+    translator = Translator(None)
+    if not translator.initialize():
+        return {'error': "Argos 翻译引擎初始化失败"}
+    try:
+        results = translator.benchmark_settings(from_code, to_code, repeat=repeat)
+    except ValueError as e:
+        return {'error': str(e)}
+    rows = []
+    for result in results:
+        row = dict(result['settings'].to_dict())
+        row.update({key: round(value, 2) if isinstance(value, float) else value
+                    for key, value in result.items() if key != 'settings'})
+        rows.append(row)
+    return {'pair': f"{from_code}->{to_code}", 'results': rows}
+
+
+def benchmark_capture(bbox, frames):
+    """截图后端耗时（需要图形显示环境，无显示时返回错误信息）"""
+    try:
+        from screen_capture import benchmark_capture_backends, shutdown_capture_backends
+        results = benchmark_capture_backends(bbox, frames=frames)
+        shutdown_capture_backends()
+        return results
+    except Exception as e:
+        return {'error': f"无法截图（可能没有图形显示环境）: {e}"}
+
+
+def environment_info():
+    info = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+    }
+    try:
+        import cv2
+        info['opencv'] = cv2.__version__
+    except ImportError:
+        pass
+    try:
+        info['tesseract'] = str(pytesseract.get_tesseract_version())
+    except Exception as e:
+        info['tesseract'] = f"unavailable: {e}"
+    return info
+
+
+def parse_list(text):
+    return [item.strip() for item in text.split(',') if item.strip()] if text else []
+
+
+def run_benchmark(args):
+    """按命令行参数执行基准测试，返回结果字典"""
+    supported = {code for code, _ in SUPPORTED_LANGUAGES}
+    languages = [lang for lang in parse_list(args.langs) if lang in supported]
+    contrasts = [name for name in parse_list(args.contrasts) if name in CONTRASTS]
+    variants = [name for name in parse_list(args.variants) if name in PREPROCESS_VARIANTS]
+    available_backends = [name for name, _ in get_available_ocr_backends()]
+    backends = [name for name in parse_list(args.backends) if name in available_backends] or available_backends
+
+    samples, skipped = build_corpus(languages, [int(size) for size in parse_list(args.sizes)], contrasts)
+
+    # 只对已安装OCR语言包的语言做识别测试
+    registry = get_tessdata_registry()
+    ocr_langs = {lang: OCR_LANG_MAP[lang] for lang in languages if lang in OCR_LANG_MAP}
+    ocr_samples = [sample for sample in samples if registry.has_language(ocr_langs.get(sample.lang))]
+    for lang in sorted({sample.lang for sample in samples} - {sample.lang for sample in ocr_samples}):
+        skipped.append(f"{lang}: 未安装OCR语言包 {ocr_langs.get(lang)}，跳过OCR测试")
+
+    print(f"语料: {len(samples)} 张图片，其中 {len(ocr_samples)} 张用于OCR测试", file=sys.stderr)
+
+    results = {
+        'environment': environment_info(),
+        'config': {
+            'languages': languages, 'font_sizes': parse_list(args.sizes), 'contrasts': contrasts,
+            'backends': backends, 'variants': variants, 'repeat': args.repeat,
+        },
+        'corpus': {
+            'images': len(samples),
+            'ocr_images': len(ocr_samples),
+            'pixels': int(sum(sample.image.size for sample in samples)),
+            'skipped': skipped,
+        },
+    }
+
+    if args.capture:
+        bbox = tuple(int(v) for v in parse_list(args.capture))
+        results['capture'] = benchmark_capture(bbox, args.capture_frames)
+
+    results['preprocess'] = benchmark_preprocess(samples, variants, args.repeat)
+    results['ocr'] = benchmark_ocr(ocr_samples, backends, variants, ocr_langs)
+
+    if args.translate != 'none':
+        results['translate'] = benchmark_translate(samples, args.translate, args.target, args.engine)
+
+    if args.argos_tuning:
+        results['argos_settings'] = benchmark_argos_settings(tuple(args.argos_tuning.split('-', 1)), args.repeat)
+
+    shutdown_ocr_backends()
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Skylark 识别翻译流程基准测试")
+    parser.add_argument('--langs', default='en,fr,ru,zh,ja',
+                        help="测试语言，逗号分隔（取自 SUPPORTED_LANGUAGES）")
+    parser.add_argument('--sizes', default='12,20,32', help="字号（像素），逗号分隔")
+    parser.add_argument('--contrasts', default=','.join(CONTRASTS), help="对比度方案，逗号分隔")
+    parser.add_argument('--backends', default='', help="OCR后端，逗号分隔（默认全部可用后端）")
+    parser.add_argument('--variants', default=','.join(PREPROCESS_VARIANTS), help="预处理方案，逗号分隔")
+    parser.add_argument('--repeat', type=int, default=5, help="预处理重复次数")
+    parser.add_argument('--translate', choices=['none', 'argos', 'online'], default='none',
+                        help="是否测量翻译耗时（online 需要网络）")
+    parser.add_argument('--target', default='zh', help="翻译目标语言")
+    parser.add_argument('--engine', default='', help="在线翻译引擎")
+    parser.add_argument('--argos-tuning', default='',
+                        help="比较 Argos 推理设置（线程数/计算精度）的语言对，如 en-zh")
+    parser.add_argument('--capture', default='', help="测量截图耗时的区域 x1,y1,x2,y2（需要图形显示环境）")
+    parser.add_argument('--capture-frames', type=int, default=30)
+    parser.add_argument('--output', default='', help="JSON 结果文件（默认输出到标准输出）")
+    args = parser.parse_args()
+
+    # 识别过程的日志输出到标准错误，标准输出只保留 JSON 结果
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run_benchmark(args)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"结果已写入 {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+"""
+在线翻译共享 HTTP 传输层（不依赖 Qt）
+
+所有在线翻译引擎共用一个运行在后台线程中的 asyncio 事件循环和一个有上限的连接池：
+- 安装了 httpx 时使用 httpx.AsyncClient（保持长连接，安装 h2 后启用 HTTP/2）；
+- 否则退回到带连接池的 requests.Session，请求在事件循环的线程池中执行。
+每个主机的并发连接数单独限制，超时按截止时间计算（包含排队等待连接的时间）。
+
+同步代码通过 TransportSession（与 requests.Session 用法相同的 get/post/headers）调用，
+异步代码可以直接 await request_async()，便于在同一个事件循环上同时请求多个引擎或分段。
+在 cancel_scope(token) 中发出的同步请求可以通过 token.cancel() 中止（用于多引擎竞速时取消较慢的引擎）。
+"""
+import asyncio
+import functools
+import importlib.util
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# httpx 的 HTTP/2 支持依赖 h2，只检查是否已安装，不导入
+HTTP2_AVAILABLE = HTTPX_AVAILABLE and importlib.util.find_spec('h2') is not None
+
+DEFAULT_MAX_CONNECTIONS = 32    # 连接池总连接数上限
+DEFAULT_MAX_PER_HOST = 6        # 每个主机同时进行的请求数上限
+DEFAULT_KEEPALIVE_EXPIRY = 30.0 # 空闲长连接保留时间（秒）
+DEFAULT_TIMEOUT = 10.0          # 未指定时的请求超时（秒）
+
+
+class RequestCancelled(Exception):
+    """请求所在的取消令牌已被取消"""
+
+
+class CancelToken:
+    """取消令牌：cancel() 中止所有在其作用域内进行中的请求，之后的请求立即失败"""
+
+    def __init__(self):
+        self.cancelled = False
+        self._futures = set()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            futures, self._futures = self._futures, set()
+        for future in futures:
+            future.cancel()
+
+    def _register(self, future):
+        with self._lock:
+            if not self.cancelled:
+                self._futures.add(future)
+                return
+        future.cancel()
+
+    def _unregister(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+
+_local = threading.local()
+
+
+def current_cancel_token():
+    """当前线程所在的取消令牌（没有时为 None），提交到其他线程的任务可用 cancel_scope 继续使用它"""
+    return getattr(_local, 'token', None)
+
+
+@contextmanager
+def cancel_scope(token):
+    """在当前线程中使用取消令牌（token 为 None 时不起作用）"""
+    previous = current_cancel_token()
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+class AsyncTransport:
+    """共享的异步 HTTP 传输，第一次请求时启动事件循环线程"""
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, max_per_host=DEFAULT_MAX_PER_HOST,
+                 http2=True, keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.keepalive_expiry = keepalive_expiry
+        self.loop = None
+        self._thread = None
+        self._client = None
+        self._executor = None
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if not HTTPX_AVAILABLE:
+            return "requests"
+        return "httpx (HTTP/2)" if self.http2 else "httpx"
+
+    def _ensure_started(self):
+        with self._lock:
+            if self.loop is not None:
+                return self.loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name="http-transport", daemon=True)
+            self._thread.start()
+            ready.wait()
+            asyncio.run_coroutine_threadsafe(self._create_client(), loop).result()
+            self.loop = loop
+            print(f"在线翻译传输层已启动: {self.backend}, 连接上限 {self.max_connections}, "
+                  f"每主机 {self.max_per_host}")
+            return loop
+
+    async def _create_client(self):
+        if HTTPX_AVAILABLE:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections,
+                                  keepalive_expiry=self.keepalive_expiry)
+            self._client = httpx.AsyncClient(limits=limits, http2=self.http2, follow_redirects=True)
+        else:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.max_connections, pool_maxsize=self.max_per_host)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._client = session
+            self._executor = ThreadPoolExecutor(max_workers=self.max_connections,
+                                                thread_name_prefix="http-transport-io")
+
+    def _host_limit(self, url):
+        """每个主机的并发信号量（只在事件循环线程中创建和使用）"""
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return limit
+
+    async def request_async(self, method, url, params=None, data=None, json=None, headers=None,
+                            timeout=DEFAULT_TIMEOUT, deadline=None):
+        """
+        在事件循环中发送请求。deadline 为 time.monotonic() 的截止时间，
+        未指定时为当前时间加 timeout；排队等待主机连接的时间同样计入。
+        """
+        if deadline is None:
+            deadline = time.monotonic() + (timeout if timeout is not None else DEFAULT_TIMEOUT)
+
+        async def send():
+            async with self._host_limit(url):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"请求超时: {url}")
+                if HTTPX_AVAILABLE:
+                    return await self._client.request(method, url, params=params, data=data, json=json,
+                                                      headers=headers, timeout=remaining)
+                call = functools.partial(self._client.request, method, url, params=params, data=data,
+                                         json=json, headers=headers, timeout=remaining)
+                return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+        try:
+            return await asyncio.wait_for(send(), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"请求超时: {url}")
+
+    def run(self, coro):
+        """
+        在传输层的事件循环中执行协程并等待结果（不能在事件循环线程中调用）。
+        当前线程处于已取消的令牌作用域时抛出 RequestCancelled。
+        """
+        loop = self._ensure_started()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("不能在传输层事件循环线程中同步等待请求")
+        token = current_cancel_token()
+        if token is not None and token.cancelled:
+            coro.close()
+            raise RequestCancelled("请求已取消")
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        if token is None:
+            return future.result()
+        token._register(future)
+        try:
+            return future.result()
+        except CancelledError:
+            raise RequestCancelled("请求已取消")
+        finally:
+            token._unregister(future)
+
+    def request(self, method, url, **kwargs):
+        """同步请求，参数与 request_async 相同"""
+        self._ensure_started()
+        return self.run(self.request_async(method, url, **kwargs))
+
+    def gather(self, coros):
+        """同时执行多个协程，按顺序返回结果（失败的项为异常对象）"""
+        async def run_all():
+            return await asyncio.gather(*coros, return_exceptions=True)
+        return self.run(run_all())
+
+    def close(self):
+        with self._lock:
+            loop, self.loop = self.loop, None
+        if loop is None:
+            return
+
+        async def shutdown():
+            if HTTPX_AVAILABLE:
+                await self._client.aclose()
+            else:
+                self._client.close()
+                self._executor.shutdown(wait=False)
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout=5)
+        except Exception as e:
+            print(f"关闭在线翻译传输层失败: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        self._client = None
+        self._executor = None
+        self._host_limits = {}
+
+
+class TransportSession:
+    """
+    单个翻译引擎使用的会话：保存该引擎的默认请求头，请求通过共享传输层发送。
+    接口与 requests.Session 的 get/post/headers 相同。
+    """
+
+    def __init__(self, transport=None, headers=None):
+        self.transport = transport or get_transport()
+        self.headers = dict(headers or {})
+
+    def _merge_headers(self, headers):
+        if not headers:
+            return dict(self.headers)
+        merged = dict(self.headers)
+        merged.update(headers)
+        return merged
+
+    def request(self, method, url, headers=None, **kwargs):
+        return self.transport.request(method, url, headers=self._merge_headers(headers), **kwargs)
+
+    async def request_async(self, method, url, headers=None, **kwargs):
+        return await self.transport.request_async(method, url, headers=self._merge_headers(headers), **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """获取进程内共享的传输层"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = AsyncTransport()
+        return _transport
+
+
+def shutdown_transport():
+    """关闭共享传输层（程序退出时调用）"""
+    global _transport
+    with _transport_lock:
+        transport, _transport = _transport, None
+    if transport is not None:
+        transport.close()
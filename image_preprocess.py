@@ -0,0 +1,269 @@
+"""
+OCR 前的图像预处理（不依赖 Qt）
+
+ImagePreprocessor 对灰度图做一次直方图统计，均值、标准差、百分位和直方图均衡都由该直方图得出，
+各阶段通过查找表和 OpenCV 的 dst= 参数写入按图像尺寸复用的缓冲区，
+处理结果直接以 NumPy 数组交给 OCR 后端，不再转换回 PIL 图像。
+
+过暗/过亮图像的去噪分级进行：默认使用中值或双边滤波（大图在半分辨率下处理），
+只有首次识别置信度偏低时才由调用方以 denoise='nlmeans' 重新处理。
+
+处理前会根据连通域估计主要字高，将图像缩放到字高约 30 像素（Tesseract 识别效果最好的尺寸），
+大截图因此缩小、小字号放大。
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# 常量卷积核，只创建一次
+CLOSE_KERNEL = np.ones((2, 2), np.uint8)  # 闭运算，连接断开的字符笔画
+SHARPEN_KERNEL = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]], dtype=np.float32)
+
+_LEVELS = np.arange(256, dtype=np.float64)
+
+# 去噪方式
+DENOISE_MEDIAN = 'median'
+DENOISE_BILATERAL = 'bilateral'
+DENOISE_NLMEANS = 'nlmeans'
+DENOISE_MODES = (DENOISE_MEDIAN, DENOISE_BILATERAL, DENOISE_NLMEANS)
+
+# 超过该像素数时，廉价去噪在半分辨率下进行
+REDUCED_DENOISE_PIXELS = 1000000
+
+# 自动缩放
+DEFAULT_TARGET_GLYPH_HEIGHT = 30
+MIN_SCALE = 0.25
+MAX_SCALE = 4.0
+MAX_SCALED_PIXELS = 8000000   # 放大后的图像不超过该像素数
+SCALE_STEP = 0.125            # 缩放比例取整步长，避免相邻帧因估计误差得到不同尺寸
+
+
+def to_gray_array(image):
+    """将 PIL 图像或 NumPy 数组（灰度/BGR/BGRA）转换为连续的 uint8 灰度数组"""
+    if isinstance(image, Image.Image):
+        if image.mode != 'L':
+            image = image.convert('L')
+        return np.asarray(image, dtype=np.uint8)
+    if image.ndim == 3:
+        code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        return cv2.cvtColor(image, code)
+    if image.dtype != np.uint8 or not image.flags['C_CONTIGUOUS']:
+        return np.ascontiguousarray(image, dtype=np.uint8)
+    return image
+
+
+def estimate_glyph_height(gray, sample_pixels=1000000):
+    """
+    根据连通域估计图像中主要字符的高度（像素），无法估计时返回 None。
+    大图先缩小到约 sample_pixels 像素再统计，结果换算回原尺寸。
+    """
+    height, width = gray.shape[:2]
+    factor = 1.0
+    if height * width > sample_pixels:
+        factor = (sample_pixels / float(height * width)) ** 0.5
+        gray = cv2.resize(gray, (max(1, int(width * factor)), max(1, int(height * factor))),
+                          interpolation=cv2.INTER_AREA)
+
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # 像素较少的一侧视为文字
+    if cv2.countNonZero(binary) > binary.size / 2:
+        cv2.bitwise_not(binary, dst=binary)
+
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    if count <= 1:
+        return None
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    # 去掉噪点、细线和大色块，只保留大小像字符的连通域
+    plausible = ((heights >= 3) & (heights <= binary.shape[0] * 0.8)
+                 & (widths <= heights * 4) & (areas >= 6))
+    if np.count_nonzero(plausible) < 3:
+        return None
+    return float(np.median(heights[plausible])) / factor
+
+
+def choose_scale(glyph_height, shape, target_height=DEFAULT_TARGET_GLYPH_HEIGHT):
+    """根据字高计算缩放比例（按 SCALE_STEP 取整并限制范围），无需缩放时返回 1.0"""
+    if not glyph_height:
+        return 1.0
+    scale = min(MAX_SCALE, max(MIN_SCALE, target_height / glyph_height))
+    max_scale_by_size = (MAX_SCALED_PIXELS / float(shape[0] * shape[1])) ** 0.5
+    scale = min(scale, max(1.0, max_scale_by_size))
+    scale = round(scale / SCALE_STEP) * SCALE_STEP or SCALE_STEP
+    # 字高已接近目标时不缩放
+    if 0.8 <= scale <= 1.25:
+        return 1.0
+    return scale
+
+
+class HistogramStats:
+    """一次直方图统计得到的亮度信息"""
+    def __init__(self, gray):
+        self.hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+        self.count = gray.size
+        self.cdf = np.cumsum(self.hist)
+        self.mean = float(self.hist @ _LEVELS) / self.count
+        variance = float(self.hist @ (_LEVELS * _LEVELS)) / self.count - self.mean * self.mean
+        self.std = variance ** 0.5 if variance > 0 else 0.0
+
+    def percentile(self, q):
+        """返回第 q 百分位对应的灰度级"""
+        return int(np.searchsorted(self.cdf, self.count * q / 100.0))
+
+    def stretch_lut(self, low, high):
+        """线性拉伸 [low, high] 到 [0, 255] 的查找表"""
+        if high <= low:
+            return np.arange(256, dtype=np.uint8)
+        return np.clip((_LEVELS - low) * (255.0 / (high - low)), 0, 255).astype(np.uint8)
+
+    def equalize_lut(self):
+        """直方图均衡化查找表（与 cv2.equalizeHist 相同的映射）"""
+        nonzero = self.cdf[self.hist > 0]
+        cdf_min = nonzero[0] if nonzero.size else 0
+        if self.count == cdf_min:
+            return np.arange(256, dtype=np.uint8)
+        lut = np.round((self.cdf - cdf_min) * (255.0 / (self.count - cdf_min)))
+        return np.clip(lut, 0, 255).astype(np.uint8)
+
+
+class ImagePreprocessor:
+    """
+    可复用的预处理器，按图像尺寸缓存中间缓冲区（最多保留 max_cached_shapes 种尺寸）。
+    默认返回的数组是内部缓冲区，在下一次处理相同尺寸的图像前有效；
+    多个线程共用同一预处理器或需要长期保存结果时请使用 process(..., copy=True)。
+    """
+    def __init__(self, max_cached_shapes=4, denoise_mode=DENOISE_MEDIAN,
+                 auto_scale=True, target_glyph_height=DEFAULT_TARGET_GLYPH_HEIGHT):
+        self.max_cached_shapes = max_cached_shapes
+        self.denoise_mode = denoise_mode  # 默认的（廉价）去噪方式
+        self.auto_scale = auto_scale
+        self.target_glyph_height = target_glyph_height
+        self.last_scale = 1.0
+        self.last_glyph_height = None
+        self._buffers = OrderedDict()  # shape -> (buffer_a, buffer_b)
+        self._lock = threading.Lock()
+        self.last_branch = None
+        self.last_denoise = None   # 上次处理实际使用的去噪方式（未去噪时为 None）
+        self.last_timings = {}     # 上次处理各阶段耗时（毫秒）
+
+    def _get_buffers(self, shape):
+        buffers = self._buffers.get(shape)
+        if buffers is None:
+            buffers = (np.empty(shape, np.uint8), np.empty(shape, np.uint8))
+            self._buffers[shape] = buffers
+            while len(self._buffers) > self.max_cached_shapes:
+                self._buffers.popitem(last=False)
+        else:
+            self._buffers.move_to_end(shape)
+        return buffers
+
+    def process(self, image, denoise=None, copy=False):
+        """
+        执行预处理，返回二值化并锐化后的灰度 NumPy 数组。
+        denoise 指定过暗/过亮图像的去噪方式，默认使用 self.denoise_mode。
+        copy 为 True 时在持有锁期间复制结果再返回，其他线程随后的处理不会覆盖它；
+        否则返回内部缓冲区，只能在同一线程的下一次处理前使用。
+        """
+        timings = {}
+        start = stage_start = time.perf_counter()
+
+        def mark(stage):
+            nonlocal stage_start
+            now = time.perf_counter()
+            timings[stage] = (now - stage_start) * 1000
+            stage_start = now
+
+        gray = to_gray_array(image)
+        mark('convert')
+        with self._lock:
+            if self.auto_scale:
+                gray = self._rescale(gray)
+                mark('scale')
+
+            buf_a, buf_b = self._get_buffers(gray.shape)
+            stats = HistogramStats(gray)
+            mark('histogram')
+            self.last_denoise = None
+
+            # 动态调整预处理策略
+            if stats.std < 25:  # 低对比度图像
+                self.last_branch = 'low_contrast'
+                lut = stats.stretch_lut(stats.percentile(5), stats.percentile(95))
+                cv2.LUT(gray, lut, dst=buf_a)
+                mark('stretch')
+                # 使用更大的 block_size 以适应更多场景
+                block_size = max(15, int(min(gray.shape[:2]) * 0.1)) | 1
+                cv2.adaptiveThreshold(buf_a, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                      cv2.THRESH_BINARY, block_size, 5, dst=buf_b)
+                mark('threshold')
+            elif stats.mean < 50 or stats.mean > 200:  # 过暗或过亮
+                self.last_branch = 'extreme_brightness'
+                cv2.LUT(gray, stats.equalize_lut(), dst=buf_a)
+                mark('equalize')
+                # 适度去噪，保持细节
+                self.last_denoise = self._denoise(buf_a, buf_b, denoise or self.denoise_mode)
+                mark('denoise')
+            else:  # 正常光照
+                self.last_branch = 'normal'
+                cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=buf_b)
+                mark('threshold')
+
+            # 形态学闭运算增强字符连接，再锐化边缘
+            cv2.morphologyEx(buf_b, cv2.MORPH_CLOSE, CLOSE_KERNEL, dst=buf_a)
+            mark('morphology')
+            cv2.filter2D(buf_a, -1, SHARPEN_KERNEL, dst=buf_b)
+            mark('sharpen')
+
+            result = buf_b.copy() if copy else buf_b
+            timings['total'] = (time.perf_counter() - start) * 1000
+            self.last_timings = timings
+            return result
+
+    def _rescale(self, gray):
+        """按估计的字高缩放图像；与上次比例相差不大时沿用上次比例，保持相邻帧尺寸一致"""
+        self.last_glyph_height = estimate_glyph_height(gray)
+        scale = choose_scale(self.last_glyph_height, gray.shape, self.target_glyph_height)
+        if self.last_scale != 1.0 and scale != 1.0 and abs(scale - self.last_scale) / self.last_scale < 0.15:
+            scale = self.last_scale
+        self.last_scale = scale
+        if scale == 1.0:
+            return gray
+        height, width = gray.shape[:2]
+        size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+        return cv2.resize(gray, size, interpolation=interpolation)
+
+    def _denoise(self, src, dst, mode):
+        """按指定方式去噪，结果写入 dst，返回实际使用的去噪方式"""
+        if mode == DENOISE_NLMEANS:
+            cv2.fastNlMeansDenoising(src, dst, 7, 7, 21)
+            return mode
+
+        if mode != DENOISE_BILATERAL:
+            mode = DENOISE_MEDIAN
+
+        height, width = src.shape[:2]
+        if height * width <= REDUCED_DENOISE_PIXELS:
+            if mode == DENOISE_BILATERAL:
+                cv2.bilateralFilter(src, 5, 50, 50, dst=dst)
+            else:
+                cv2.medianBlur(src, 3, dst=dst)
+            return mode
+
+        # 大图在半分辨率下滤波后放大回原尺寸
+        work = cv2.resize(src, (width // 2, height // 2), interpolation=cv2.INTER_AREA)
+        if mode == DENOISE_BILATERAL:
+            work = cv2.bilateralFilter(work, 5, 50, 50)
+        else:
+            work = cv2.medianBlur(work, 3)
+        cv2.resize(work, (width, height), dst=dst, interpolation=cv2.INTER_LINEAR)
+        return mode
+
+    def format_timings(self):
+        """将上次处理的各阶段耗时格式化为日志文本"""
+        return ", ".join(f"{stage} {ms:.1f}ms" for stage, ms in self.last_timings.items())
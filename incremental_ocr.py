@@ -0,0 +1,117 @@
+"""
+增量OCR（不依赖 Qt）
+
+反复识别同一区域（聊天窗口、日志等）时，大部分文字行在两次截图之间没有变化。
+IncrementalLineOCR 把截图切分为行带并对每个行带的像素求哈希，
+只有新出现或发生变化的行带才送入 Tesseract，其余行直接复用上次的识别结果。
+识别失败、为空或置信度过低的行带不缓存，下次截图时重新识别。
+join_wrapped_lines 把被换行拆开的句子重新拼接，翻译时以完整的句子为单位。
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from text_regions import TextRegion, segment_line_bands
+
+MIN_CACHE_CONFIDENCE = 60   # 低于该置信度的行带识别结果不缓存
+SENTENCE_END = '.!?;:。！？；：…"\'”’)）」』】'
+
+
+def join_wrapped_lines(lines):
+    """
+    将按行识别的文本拼接为段落列表：不以句末标点结尾的行视为被自动换行拆开，与下一行合并，
+    空行作为段落分隔。中日文行之间直接拼接，其他语言用空格拼接。
+    """
+    paragraphs = []
+    current = ""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if current:
+                paragraphs.append(current)
+                current = ""
+            continue
+        if not current:
+            current = line
+        elif current[-1] >= '\u3000' and line[0] >= '\u3000':
+            current += line
+        else:
+            current += " " + line
+        if line[-1] in SENTENCE_END:
+            paragraphs.append(current)
+            current = ""
+    if current:
+        paragraphs.append(current)
+    return paragraphs
+
+
+class IncrementalLineOCR:
+    """按行带像素哈希缓存OCR结果，最多保留 max_entries 个行带，置信度低于 min_confidence 的结果不缓存"""
+
+    def __init__(self, max_entries=512, min_confidence=MIN_CACHE_CONFIDENCE):
+        self.max_entries = max_entries
+        self.min_confidence = min_confidence
+        self._lines = OrderedDict()  # 行带哈希 -> (文本, 置信度)
+        self._lock = threading.Lock()
+        self.last_total = 0
+        self.last_reused = 0
+
+    @staticmethod
+    def band_key(band, lang, backend_name):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{lang}|{backend_name}|{band.shape}".encode('utf-8'))
+        digest.update(band.tobytes())
+        return digest.hexdigest()
+
+    def recognize(self, recognizer, backend, gray, lang):
+        """
+        识别灰度图（通常是预处理后的二值图），未变化的行带复用缓存结果。
+        recognizer 为 MultiPassRecognizer，用于并发识别变化的行带。
+        返回 (按行拼接的文本, 按字符数加权的平均置信度)。
+        """
+        width = gray.shape[1]
+        bands = segment_line_bands(gray)
+        keys = [self.band_key(gray[y1:y2], lang, backend.name) for y1, y2 in bands]
+
+        with self._lock:
+            cached = {key: self._lines[key] for key in keys if key in self._lines}
+
+        # 只识别新出现或发生变化的行带
+        pending = [index for index, key in enumerate(keys) if key not in cached]
+        regions = []
+        for index in pending:
+            y1, y2 = bands[index]
+            regions.append(TextRegion(0, y1, width, y2 - y1, index, 7))
+        results = recognizer.recognize_crops(backend, gray, lang, regions) if regions else []
+
+        with self._lock:
+            for index, result in zip(pending, results):
+                cached[keys[index]] = result
+                text, confidence = result
+                if text and confidence >= self.min_confidence:
+                    self._lines[keys[index]] = result
+            for key in keys:
+                if key in self._lines:
+                    self._lines.move_to_end(key)
+            while len(self._lines) > self.max_entries:
+                self._lines.popitem(last=False)
+
+        lines = []
+        weighted_confidence = 0.0
+        total_chars = 0
+        for key in keys:
+            text, confidence = cached[key]
+            if not text:
+                continue
+            lines.append(text)
+            weighted_confidence += confidence * len(text)
+            total_chars += len(text)
+
+        self.last_total = len(keys)
+        self.last_reused = len(keys) - len(pending)
+        confidence = weighted_confidence / total_chars if total_chars else 0.0
+        return "\n".join(lines), confidence
+
+    def clear(self):
+        with self._lock:
+            self._lines.clear()
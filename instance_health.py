@@ -0,0 +1,231 @@
+"""
+翻译服务实例健康状态（不依赖 Qt）
+
+InstanceHealthMonitor 记录每个实例的连续失败次数和冷却截止时间：
+翻译请求本身就是健康信号，成功即视为健康，失败后按指数退避进入冷却期，
+冷却期内不再分配请求，到期后由后台线程探测（或直接重新参与分配）。
+后台线程还会定期探测长时间没有流量的实例，并缓存探测得到的语言列表。
+
+每个实例还记录延迟和错误率的指数加权移动平均（EWMA）以及最近的延迟样本，
+ranked() 按 "延迟 × 错误率惩罚" 排序可用实例，hedge_delay() 给出对冲请求的等待时间（p95）。
+"""
+import random
+import threading
+import time
+from collections import deque
+
+from perf_monitor import percentile
+
+DEFAULT_BASE_COOLDOWN = 30.0     # 第一次失败后的冷却时间（秒）
+DEFAULT_MAX_COOLDOWN = 900.0     # 冷却时间上限（秒）
+DEFAULT_PROBE_INTERVAL = 300.0   # 健康实例没有流量时的探测间隔（秒）
+
+EWMA_ALPHA = 0.3             # 新样本的权重
+ERROR_PENALTY = 4.0          # 错误率为 100% 时延迟按 (1 + 4) 倍计算
+LATENCY_WINDOW = 50          # 用于计算 p95 的最近延迟样本数
+MIN_HEDGE_SAMPLES = 5        # 样本少于该数量时不发送对冲请求
+UNKNOWN_LATENCY_FACTOR = 0.8 # 尚未测量的实例按乐观的延迟估计排序
+
+
+class InstanceState:
+    """单个实例的健康状态"""
+    __slots__ = ('url', 'failures', 'cooldown_until', 'next_probe', 'last_success',
+                 'last_error', 'languages', 'latency', 'error_rate', 'latencies')
+
+    def __init__(self, url):
+        self.url = url
+        self.failures = 0           # 连续失败次数
+        self.cooldown_until = 0.0   # 在此时间之前不分配请求
+        self.next_probe = 0.0       # 下一次后台探测的时间
+        self.last_success = None
+        self.last_error = None
+        self.languages = None       # 探测时缓存的语言列表
+        self.latency = None         # 请求延迟 EWMA（秒），尚无样本时为 None
+        self.error_rate = 0.0       # 错误率 EWMA
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def score(self, default_latency):
+        """排序分数，越小越好"""
+        latency = self.latency if self.latency is not None else default_latency
+        return latency * (1.0 + ERROR_PENALTY * self.error_rate)
+
+
+class InstanceHealthMonitor:
+    """
+    多个实例的健康状态表。probe(url) 用于后台探测，成功时返回语言列表（或 None），失败时抛出异常。
+    所有方法线程安全。
+    """
+
+    def __init__(self, probe=None, base_cooldown=DEFAULT_BASE_COOLDOWN,
+                 max_cooldown=DEFAULT_MAX_COOLDOWN, probe_interval=DEFAULT_PROBE_INTERVAL):
+        self.probe = probe
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.probe_interval = probe_interval
+        self._states = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def _state(self, url):
+        state = self._states.get(url)
+        if state is None:
+            state = self._states[url] = InstanceState(url)
+        return state
+
+    def record_success(self, url, languages=None, latency=None):
+        """请求或探测成功：清除失败计数，推迟下一次探测；latency 为翻译请求耗时（秒）"""
+        now = time.time()
+        with self._lock:
+            state = self._state(url)
+            if latency is not None:
+                state.latency = latency if state.latency is None \
+                    else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * state.latency
+                state.latencies.append(latency)
+                state.error_rate *= 1 - EWMA_ALPHA
+            if state.failures:
+                print(f"实例已恢复: {url}")
+            state.failures = 0
+            state.cooldown_until = 0.0
+            state.last_success = now
+            state.last_error = None
+            state.next_probe = now + self.probe_interval
+            if languages is not None:
+                state.languages = languages
+
+    def record_failure(self, url, error=None):
+        """请求或探测失败：按指数退避进入冷却期，返回冷却秒数"""
+        now = time.time()
+        with self._lock:
+            state = self._state(url)
+            state.failures += 1
+            state.error_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * state.error_rate
+            cooldown = min(self.max_cooldown, self.base_cooldown * (2 ** (state.failures - 1)))
+            # 加入少量随机抖动，避免多个实例同时到期
+            cooldown *= random.uniform(0.9, 1.1)
+            state.cooldown_until = now + cooldown
+            state.next_probe = state.cooldown_until
+            state.last_error = str(error) if error is not None else None
+        print(f"实例 {url} 失败 {state.failures} 次，冷却 {cooldown:.0f} 秒")
+        self._wake.set()
+        return cooldown
+
+    def is_available(self, url):
+        with self._lock:
+            state = self._states.get(url)
+            return state is None or time.time() >= state.cooldown_until
+
+    def available(self, urls):
+        """
+        按原顺序返回不在冷却期的实例；全部在冷却期时返回最早到期的一个，
+        保证调用方总有实例可以尝试。
+        """
+        now = time.time()
+        with self._lock:
+            ready = [url for url in urls if url not in self._states or now >= self._states[url].cooldown_until]
+            if ready or not urls:
+                return ready
+            return [min(urls, key=lambda url: self._states[url].cooldown_until)]
+
+    def ranked(self, urls, preferred=()):
+        """
+        可用实例按分数从好到差排序；preferred 中的实例（如用户自定义实例）始终排在前面。
+        没有延迟样本的实例按已知实例中位延迟的 UNKNOWN_LATENCY_FACTOR 倍计算，
+        因此会先被尝试一次以获得测量值（失效的实例通常已被后台探测放入冷却期）。
+        """
+        candidates = self.available(urls)
+        with self._lock:
+            known = sorted(state.latency for url, state in self._states.items()
+                           if url in candidates and state.latency is not None)
+            default_latency = percentile(known, 50) * UNKNOWN_LATENCY_FACTOR if known else 1.0
+            scores = {url: self._states[url].score(default_latency) if url in self._states else default_latency
+                      for url in candidates}
+        first = [url for url in candidates if url in preferred]
+        rest = sorted((url for url in candidates if url not in preferred), key=scores.get)
+        return first + rest
+
+    def hedge_delay(self, url):
+        """对冲请求前的等待时间：该实例最近延迟的 p95（秒），样本不足时返回 None"""
+        with self._lock:
+            state = self._states.get(url)
+            if state is None or len(state.latencies) < MIN_HEDGE_SAMPLES:
+                return None
+            return percentile(sorted(state.latencies), 95)
+
+    def cooling_down(self, urls=None):
+        """当前处于冷却期的实例"""
+        now = time.time()
+        with self._lock:
+            return {url for url, state in self._states.items()
+                    if now < state.cooldown_until and (urls is None or url in urls)}
+
+    def languages(self, url):
+        with self._lock:
+            state = self._states.get(url)
+            return state.languages if state else None
+
+    def snapshot(self):
+        """各实例状态，供界面显示"""
+        now = time.time()
+        with self._lock:
+            return {
+                url: {
+                    'available': now >= state.cooldown_until,
+                    'failures': state.failures,
+                    'cooldown_remaining': max(0.0, state.cooldown_until - now),
+                    'last_success': state.last_success,
+                    'last_error': state.last_error,
+                    'latency_ms': round(state.latency * 1000, 1) if state.latency is not None else None,
+                    'error_rate': round(state.error_rate, 3),
+                }
+                for url, state in self._states.items()
+            }
+
+    def reset(self, url=None):
+        with self._lock:
+            if url is None:
+                self._states.clear()
+            else:
+                self._states.pop(url, None)
+
+    # --- 后台探测 ---
+
+    def start(self, urls_provider):
+        """启动后台探测线程，urls_provider() 返回当前的实例列表"""
+        if self.probe is None:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(urls_provider,),
+                                            name="instance-health", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _due(self, urls):
+        now = time.time()
+        with self._lock:
+            return [url for url in urls if self._state(url).next_probe <= now]
+
+    def _next_wakeup(self, urls):
+        with self._lock:
+            times = [self._state(url).next_probe for url in urls]
+        return max(1.0, min(times) - time.time()) if times else self.probe_interval
+
+    def _run(self, urls_provider):
+        while not self._stop.is_set():
+            urls = list(urls_provider())
+            for url in self._due(urls):
+                if self._stop.is_set():
+                    return
+                try:
+                    self.record_success(url, self.probe(url))
+                except Exception as e:
+                    self.record_failure(url, e)
+            self._wake.clear()
+            self._wake.wait(self._next_wakeup(urls))
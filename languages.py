@@ -0,0 +1,73 @@
+"""
+语言代码表（不依赖 Qt，供主程序、命令行和基准测试共用）
+"""
+
+# 支持的语言列表
+SUPPORTED_LANGUAGES = [
+    ("ar", "Arabic"),
+    ("az", "Azerbaijani"),
+    ("ca", "Catalan"),
+    ("zh", "Chinese"),
+    ("cs", "Czech"),
+    ("da", "Danish"),
+    ("nl", "Dutch"),
+    ("en", "English"),
+    ("eo", "Esperanto"),
+    ("fi", "Finnish"),
+    ("fr", "French"),
+    ("de", "German"),
+    ("el", "Greek"),
+    ("he", "Hebrew"),
+    ("hi", "Hindi"),
+    ("hu", "Hungarian"),
+    ("id", "Indonesian"),
+    ("ga", "Irish"),
+    ("it", "Italian"),
+    ("ja", "Japanese"),
+    ("ko", "Korean"),
+    ("ms", "Malay"),
+    ("fa", "Persian"),
+    ("pl", "Polish"),
+    ("pt", "Portuguese"),
+    ("ru", "Russian"),
+    ("sk", "Slovak"),
+    ("es", "Spanish"),
+    ("sv", "Swedish"),
+    ("tr", "Turkish"),
+    ("uk", "Ukrainian")
+]
+
+# OCR语言映射
+OCR_LANG_MAP = {
+    "ar": "ara",
+    "az": "aze",
+    "ca": "cat",
+    "zh": "chi_sim",
+    "cs": "ces",
+    "da": "dan",
+    "nl": "nld",
+    "en": "eng",
+    "eo": "epo",
+    "fi": "fin",
+    "fr": "fra",
+    "de": "deu",
+    "el": "ell",
+    "he": "heb",
+    "hi": "hin",
+    "hu": "hun",
+    "id": "ind",
+    "ga": "gle",
+    "it": "ita",
+    "ja": "jpn",
+    "ko": "kor",
+    "ms": "msa",
+    "fa": "fas",
+    "pl": "pol",
+    "pt": "por",
+    "ru": "rus",
+    "sk": "slk",
+    "es": "spa",
+    "sv": "swe",
+    "tr": "tur",
+    "uk": "ukr"
+}
@@ -0,0 +1,478 @@
+"""
+OCR 引擎封装（不依赖 Qt，可在任意线程或无界面环境中使用）
+
+提供两种后端：
+- pytesseract: 每次识别启动一个 tesseract 进程（兼容性最好）
+- tesserocr:   通过 libtesseract C API 常驻加载语言模型，跨请求复用，省去进程启动和模型加载
+"""
+import os
+import queue
+import re
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+from perf_monitor import span
+
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+# 默认的识别配置: (PSM, OEM)
+OCR_PASS_CONFIGS = [
+    (6, 3),   # 单个文本块
+    (11, 3),  # 稀疏文本
+]
+
+# 识别线程池的默认大小，也是每种 tesserocr 配置最多创建的引擎数
+DEFAULT_OCR_WORKERS = min(8, max(2, os.cpu_count() or 2))
+
+# 任一识别配置的平均词置信度达到该值时立即返回该结果，不再等待其余配置
+DEFAULT_CONFIDENCE_THRESHOLD = 85
+
+
+def parse_ocr_pass_configs(text):
+    """解析用户输入的额外识别配置，格式如 "4/3, 7/1"（PSM/OEM），OEM 可省略"""
+    configs = []
+    for part in re.split(r'[,;\s]+', text.strip()):
+        if not part:
+            continue
+        psm_text, _, oem_text = part.partition('/')
+        psm = int(psm_text)
+        oem = int(oem_text) if oem_text else 3
+        if not 0 <= psm <= 13:
+            raise ValueError(f"无效的PSM值: {psm}（应为0-13）")
+        if not 0 <= oem <= 3:
+            raise ValueError(f"无效的OEM值: {oem}（应为0-3）")
+        if (psm, oem) not in configs:
+            configs.append((psm, oem))
+    return configs
+
+
+def format_ocr_pass_configs(configs):
+    """将识别配置列表格式化为 "4/3, 7/1" 形式"""
+    return ", ".join(f"{psm}/{oem}" for psm, oem in configs)
+
+
+def _to_pil_image(image):
+    """确保图像为 PIL Image（NumPy 数组会被包装为 PIL 图像）"""
+    if isinstance(image, Image.Image):
+        return image
+    return Image.fromarray(image)
+
+
+def _set_engine_image(api, image):
+    """
+    将图像交给 tesserocr 引擎。灰度 NumPy 数组直接以原始像素传入，
+    避免 SetImage 对 PIL 图像进行的编码/解码。
+    """
+    if isinstance(image, np.ndarray) and image.ndim == 2 and image.dtype == np.uint8:
+        height, width = image.shape
+        api.SetImageBytes(np.ascontiguousarray(image).tobytes(), width, height, 1, width)
+    else:
+        api.SetImage(_to_pil_image(image))
+
+
+class PytesseractBackend:
+    """pytesseract 后端：每次识别都会启动 tesseract 进程并重新加载语言模型"""
+    name = 'pytesseract'
+    display_name = 'Tesseract 命令行 (pytesseract)'
+
+    def is_available(self):
+        return True
+
+    def recognize(self, image, lang, psm=6, oem=3):
+        """识别图像文本"""
+        config = f'--psm {psm} --oem {oem}'
+        return pytesseract.image_to_string(image, lang=lang, config=config)
+
+    def recognize_with_confidence(self, image, lang, psm=6, oem=3):
+        """识别图像文本并返回 (文本, 平均词置信度)"""
+        config = f'--psm {psm} --oem {oem}'
+        data = pytesseract.image_to_data(image, lang=lang, config=config,
+                                         output_type=pytesseract.Output.DICT)
+        lines = {}
+        confidences = []
+        for i, word in enumerate(data['text']):
+            word = word.strip()
+            confidence = float(data['conf'][i])
+            if not word or confidence < 0:
+                continue
+            confidences.append(confidence)
+            line_key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(line_key, []).append(word)
+        text = "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+        mean_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return text, mean_confidence
+
+    def close(self):
+        pass
+
+
+class _EnginePool:
+    """同一 (语言, PSM, OEM) 配置的 libtesseract 引擎池：按需创建，最多 limit 个，借出/归还通过队列完成"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.idle = queue.Queue()
+        self.engines = []
+        self._lock = threading.Lock()
+
+    def checkout(self, limit):
+        """借出一个空闲引擎；没有空闲引擎且未达到上限时创建新引擎，否则等待归还"""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = len(self.engines) < limit
+            if create:
+                # 先占位，创建失败时移除
+                self.engines.append(None)
+        if not create:
+            return self.idle.get()
+        try:
+            api = self.factory()
+        except Exception:
+            with self._lock:
+                self.engines.remove(None)
+            raise
+        with self._lock:
+            self.engines[self.engines.index(None)] = api
+        return api
+
+    def checkin(self, api):
+        self.idle.put(api)
+
+    def close(self):
+        with self._lock:
+            engines, self.engines = [api for api in self.engines if api is not None], []
+        for api in engines:
+            try:
+                api.End()
+            except Exception as e:
+                print(f"释放OCR引擎失败: {e}")
+
+
+class TesserocrBackend:
+    """
+    tesserocr 后端：每种 (语言, PSM, OEM) 组合常驻一组 libtesseract 引擎实例。
+    单个引擎实例不能并发使用，因此每种组合最多按需创建 pool_size 个引擎，
+    使多个文字框、多行或多个服务线程的同配置识别可以在多个核心上并行。
+    """
+    name = 'tesserocr'
+    display_name = '常驻引擎 (tesserocr)'
+
+    def __init__(self, pool_size=DEFAULT_OCR_WORKERS):
+        self.pool_size = pool_size
+        self._pools = {}  # (lang, psm, oem, tessdata) -> _EnginePool
+        self._lock = threading.Lock()
+
+    def is_available(self):
+        return TESSEROCR_AVAILABLE
+
+    def ensure_pool_size(self, size):
+        """保证每种组合至少可以创建 size 个引擎（与调用方的识别线程数一致）"""
+        with self._lock:
+            self.pool_size = max(self.pool_size, size)
+
+    def _get_pool(self, lang, psm, oem):
+        tessdata_dir = os.environ.get('TESSDATA_PREFIX', '')
+        key = (lang, psm, oem, tessdata_dir)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                def create_engine():
+                    kwargs = {'lang': lang, 'psm': psm, 'oem': oem}
+                    if tessdata_dir:
+                        kwargs['path'] = os.path.join(tessdata_dir, '')
+                    api = tesserocr.PyTessBaseAPI(**kwargs)
+                    print(f"已加载常驻OCR引擎: lang={lang}, psm={psm}, oem={oem}")
+                    return api
+                pool = self._pools[key] = _EnginePool(create_engine)
+            return pool, self.pool_size
+
+    @contextmanager
+    def _engine(self, lang, psm, oem):
+        """借出（必要时创建）常驻引擎，语言模型只在创建引擎时加载一次"""
+        pool, limit = self._get_pool(lang, psm, oem)
+        api = pool.checkout(limit)
+        try:
+            yield api
+        finally:
+            pool.checkin(api)
+
+    def recognize(self, image, lang, psm=6, oem=3):
+        """识别图像文本"""
+        with self._engine(lang, psm, oem) as api:
+            _set_engine_image(api, image)
+            return api.GetUTF8Text()
+
+    def recognize_with_confidence(self, image, lang, psm=6, oem=3):
+        """识别图像文本并返回 (文本, 平均词置信度)"""
+        with self._engine(lang, psm, oem) as api:
+            _set_engine_image(api, image)
+            text = api.GetUTF8Text()
+            confidences = api.AllWordConfidences()
+        mean_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return text, mean_confidence
+
+    def close(self):
+        """释放所有常驻引擎"""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+
+class TessdataRegistry:
+    """
+    已安装OCR语言包登记表。
+    只在首次访问或 tessdata 目录发生变化时调用一次 `tesseract --list-langs`，
+    之后的查询只需 stat 目录，不会启动子进程。
+    """
+    def __init__(self):
+        self._languages = None
+        self._signature = None
+        self._extra_dirs = []
+        self._lock = threading.Lock()
+
+    def add_directory(self, path):
+        """登记额外需要扫描的 tessdata 目录（例如应用自带的语言包目录）"""
+        if not path:
+            return
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self._extra_dirs:
+                self._extra_dirs.append(path)
+                self._languages = None
+
+    def _watched_dirs(self):
+        dirs = []
+        prefix = os.environ.get('TESSDATA_PREFIX')
+        if prefix:
+            dirs.append(os.path.abspath(prefix))
+        for path in self._extra_dirs:
+            if path not in dirs:
+                dirs.append(path)
+        return dirs
+
+    def _directory_signature(self):
+        """目录及其修改时间组成的签名，语言包文件增删时目录修改时间随之变化"""
+        signature = [os.environ.get('TESSDATA_PREFIX', '')]
+        for path in self._watched_dirs():
+            try:
+                signature.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                signature.append((path, None))
+        return tuple(signature)
+
+    def _scan(self):
+        """重新收集已安装的语言包"""
+        languages = set()
+        try:
+            languages.update(pytesseract.get_languages(config=''))
+        except Exception as e:
+            print(f"获取Tesseract语言列表失败: {e}")
+
+        for path in self._watched_dirs():
+            if not os.path.isdir(path):
+                continue
+            for file_name in os.listdir(path):
+                if file_name.endswith('.traineddata'):
+                    languages.add(file_name[:-len('.traineddata')])
+
+        print(f"OCR语言包列表已更新: {sorted(languages)}")
+        return languages
+
+    def languages(self):
+        """返回已安装的OCR语言代码集合"""
+        signature = self._directory_signature()
+        with self._lock:
+            if self._languages is None or signature != self._signature:
+                self._languages = self._scan()
+                self._signature = signature
+            return set(self._languages)
+
+    def has_language(self, ocr_code):
+        """检查OCR语言包是否已安装"""
+        return ocr_code in self.languages()
+
+    def invalidate(self):
+        """标记登记表失效，下次查询时重新扫描（安装/删除语言包后调用）"""
+        with self._lock:
+            self._languages = None
+
+
+_tessdata_registry = TessdataRegistry()
+
+
+def get_tessdata_registry():
+    """获取进程内共享的OCR语言包登记表"""
+    return _tessdata_registry
+
+
+OCR_BACKEND_CLASSES = {
+    'pytesseract': PytesseractBackend,
+    'tesserocr': TesserocrBackend,
+}
+
+_backend_instances = {}
+_backend_lock = threading.Lock()
+
+
+def get_available_ocr_backends():
+    """返回当前环境可用的OCR后端列表 [(name, display_name)]"""
+    backends = []
+    for name, backend_class in OCR_BACKEND_CLASSES.items():
+        if backend_class().is_available():
+            backends.append((name, backend_class.display_name))
+    return backends
+
+
+def get_default_ocr_backend_name():
+    """优先使用常驻引擎，不可用时使用 pytesseract"""
+    return 'tesserocr' if TESSEROCR_AVAILABLE else 'pytesseract'
+
+
+def get_ocr_backend(name):
+    """获取常驻的OCR后端实例（同名后端在进程内只创建一次），不可用时回退到 pytesseract"""
+    backend_class = OCR_BACKEND_CLASSES.get(name, PytesseractBackend)
+    if not backend_class().is_available():
+        print(f"OCR后端 {name} 不可用，回退到 pytesseract")
+        backend_class = PytesseractBackend
+    with _backend_lock:
+        backend = _backend_instances.get(backend_class.name)
+        if backend is None:
+            backend = backend_class()
+            _backend_instances[backend_class.name] = backend
+        return backend
+
+
+def _timed_recognize(stage, backend, image, lang, psm, oem):
+    """在线程池中执行单个识别配置，并记录该配置的耗时"""
+    with span(stage, backend=backend.name):
+        return backend.recognize_with_confidence(image, lang, psm, oem)
+
+
+class MultiPassRecognizer:
+    """
+    并发执行多种 PSM/OEM 识别配置，按平均词置信度选择最佳结果。
+    识别工作在 tesseract 子进程（pytesseract）或释放 GIL 的 C 扩展（tesserocr）中完成，
+    因此使用线程池即可并行，且能复用常驻引擎。
+    """
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or DEFAULT_OCR_WORKERS
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self, backend=None):
+        if backend is not None and hasattr(backend, 'ensure_pool_size'):
+            # 引擎池不小于线程池，同一配置的识别任务不会因为争用同一个引擎而串行
+            backend.ensure_pool_size(self.max_workers)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="ocr-pass")
+            return self._executor
+
+    def recognize(self, backend, image, lang, pass_configs=None,
+                  confidence_threshold=DEFAULT_CONFIDENCE_THRESHOLD):
+        """
+        执行所有识别配置，返回 (最佳文本, 置信度, (psm, oem))。
+        某一配置的置信度达到阈值后立即返回，不再等待其余配置：尚未开始的配置被取消，
+        已经开始的配置无法中途停止（tesseract 进程和 libtesseract 调用都不支持），
+        会在后台运行完毕，其结果被丢弃；在此之前它仍占用一个线程、CPU 和引擎池中的一个引擎，
+        紧接着的下一帧可能需要等待这些配置结束。
+        """
+        pass_configs = pass_configs or OCR_PASS_CONFIGS
+        executor = self._get_executor(backend)
+        futures = {
+            executor.submit(_timed_recognize, f"ocr_pass.psm{psm}", backend, image, lang, psm, oem): (psm, oem)
+            for psm, oem in pass_configs
+        }
+
+        best_text, best_confidence, best_config = "", -1.0, None
+        try:
+            for future in as_completed(futures):
+                config = futures[future]
+                try:
+                    text, confidence = future.result()
+                except Exception as e:
+                    print(f"OCR配置 psm={config[0]} oem={config[1]} 识别失败: {e}")
+                    continue
+
+                text = text.strip()
+                print(f"OCR配置 psm={config[0]} oem={config[1]} 置信度: {confidence:.1f}")
+                if text and confidence > best_confidence:
+                    best_text, best_confidence, best_config = text, confidence, config
+
+                if (confidence_threshold is not None and text
+                        and confidence >= confidence_threshold):
+                    break
+        finally:
+            # 只能取消尚未开始的配置，正在运行的配置在后台完成
+            for future in futures:
+                future.cancel()
+
+        return best_text, max(best_confidence, 0.0), best_config
+
+    def recognize_crops(self, backend, image, lang, regions):
+        """
+        并发识别各文字框（regions 为 text_regions.TextRegion 列表），
+        按输入顺序返回 [(文本, 置信度)]，识别失败的文字框返回 ("", 0.0)。
+        """
+        executor = self._get_executor(backend)
+        futures = []
+        for region in regions:
+            crop = np.ascontiguousarray(image[region.y:region.y + region.h, region.x:region.x + region.w])
+            futures.append(executor.submit(_timed_recognize, "ocr_roi", backend, crop, lang, region.psm, 3))
+
+        results = []
+        for region, future in zip(regions, futures):
+            try:
+                text, confidence = future.result()
+                results.append((" ".join(text.split()), confidence))
+            except Exception as e:
+                print(f"文字框 ({region.x}, {region.y}, {region.w}, {region.h}) 识别失败: {e}")
+                results.append(("", 0.0))
+        return results
+
+    def recognize_regions(self, backend, image, lang, regions):
+        """
+        并发识别各文字框（已按阅读顺序排列），同一行的文字用空格连接，各行用换行连接。
+        返回 (文本, 按字符数加权的平均置信度)。
+        """
+        rows = {}
+        weighted_confidence = 0.0
+        total_chars = 0
+        for region, (text, confidence) in zip(regions, self.recognize_crops(backend, image, lang, regions)):
+            if not text:
+                continue
+            rows.setdefault(region.row, []).append(text)
+            weighted_confidence += confidence * len(text)
+            total_chars += len(text)
+
+        text = "\n".join(" ".join(parts) for _, parts in sorted(rows.items()))
+        confidence = weighted_confidence / total_chars if total_chars else 0.0
+        return text, confidence
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def shutdown_ocr_backends():
+    """关闭所有已创建的OCR后端"""
+    with _backend_lock:
+        for backend in _backend_instances.values():
+            backend.close()
+        _backend_instances.clear()
@@ -0,0 +1,136 @@
+"""
+预处理→OCR 流程（不依赖 Qt）
+
+OCRPipeline 汇集主窗口、命令行和基准测试共用的识别策略：
+预处理（含自动缩放和分级去噪）、增量逐行识别、稀疏文字分块识别、多配置并发识别，
+以及低置信度时的强力去噪重试。语言包检查和安装等界面相关逻辑由调用方负责。
+"""
+import time
+
+from image_preprocess import ImagePreprocessor, DENOISE_NLMEANS, to_gray_array
+from incremental_ocr import IncrementalLineOCR
+from ocr_engine import (
+    OCR_PASS_CONFIGS, DEFAULT_CONFIDENCE_THRESHOLD, MultiPassRecognizer,
+    get_ocr_backend, get_default_ocr_backend_name
+)
+from perf_monitor import get_perf_monitor
+from text_regions import detect_text_regions, should_use_regions
+
+# 过暗/过亮图像首次识别置信度低于该值时，使用 NL-means 强力去噪重新识别
+DEFAULT_DENOISE_ESCALATION_CONFIDENCE = 60
+
+
+class OCRPipeline:
+    """可复用的预处理→OCR 流程，线程安全性与 ImagePreprocessor / MultiPassRecognizer 相同"""
+
+    def __init__(self, backend_name=None, preprocessor=None, recognizer=None):
+        self.backend_name = backend_name or get_default_ocr_backend_name()
+        self.preprocessor = preprocessor or ImagePreprocessor()
+        self.recognizer = recognizer or MultiPassRecognizer()
+        self.incremental = IncrementalLineOCR()
+
+        self.extra_passes = []  # 用户额外配置的 (PSM, OEM) 组合
+        self.confidence_threshold = DEFAULT_CONFIDENCE_THRESHOLD
+        self.denoise_escalation_confidence = DEFAULT_DENOISE_ESCALATION_CONFIDENCE  # 0 表示不重试
+        self.text_region_detection = True  # 大面积稀疏文字时只识别检测到的文字框
+        self.incremental_enabled = False   # 逐行增量识别，只处理发生变化的行
+
+        self.last_confidence = 0.0
+        self.last_mode = None      # 上次识别方式: incremental / regions / full
+        self.last_timings = {}     # 上次 run() 各阶段耗时（毫秒）
+
+    def preprocess(self, image, denoise=None):
+        """
+        预处理截图，返回可直接交给OCR后端的灰度 NumPy 数组。
+        预处理器的内部缓冲区会被下一帧覆盖，而提前结束后仍在后台运行的识别配置
+        或保留结果的调用方可能继续读取该图像，因此由预处理器在锁内复制一份（与OCR耗时相比可以忽略）。
+        """
+        return self.preprocessor.process(image, denoise=denoise, copy=True)
+
+    def log_preprocess(self):
+        """输出上次预处理的缩放比例和各阶段耗时"""
+        preprocessor = self.preprocessor
+        if preprocessor.last_scale != 1.0:
+            print(f"自动缩放: 估计字高 {preprocessor.last_glyph_height:.1f}px, 缩放比例 {preprocessor.last_scale}")
+        print(f"预处理耗时: {preprocessor.format_timings()}")
+
+    def recognize(self, image, ocr_lang):
+        """识别预处理后的图像，返回文本；置信度记录在 last_confidence"""
+        self.last_confidence = 0.0
+        backend = get_ocr_backend(self.backend_name)
+        print(f"OCR 使用语言: {ocr_lang}, 引擎: {backend.name}")
+
+        if self.incremental_enabled:
+            # 增量模式：只识别像素发生变化的文字行，其余行复用上次结果
+            gray = to_gray_array(image)
+            text, confidence = self.incremental.recognize(self.recognizer, backend, gray, ocr_lang)
+            self.last_mode = 'incremental'
+            self.last_confidence = confidence
+            print(f"OCR 增量识别结果 (共 {self.incremental.last_total} 行, "
+                  f"复用 {self.incremental.last_reused} 行, 置信度: {confidence:.1f}): {text}")
+            return text
+
+        if self.text_region_detection:
+            gray = to_gray_array(image)
+            regions = detect_text_regions(gray)
+            if should_use_regions(regions, gray.shape):
+                # 文字稀疏：只并发识别各文字框，按阅读顺序拼接
+                text, confidence = self.recognizer.recognize_regions(backend, gray, ocr_lang, regions)
+                self.last_mode = 'regions'
+                self.last_confidence = confidence
+                print(f"OCR 分块识别结果 ({len(regions)} 个文字框, 置信度: {confidence:.1f}): {text}")
+                return text
+
+        # 并发尝试不同的PSM配置，按平均词置信度选择最佳结果
+        pass_configs = OCR_PASS_CONFIGS + self.extra_passes
+        best_text, confidence, best_config = self.recognizer.recognize(
+            backend, image, ocr_lang, pass_configs, self.confidence_threshold
+        )
+        self.last_mode = 'full'
+        self.last_confidence = confidence
+        print(f"OCR 识别结果 (配置: {best_config}, 置信度: {confidence:.1f}): {best_text}")
+        return best_text if best_text else ""
+
+    def should_escalate_denoise(self):
+        """上次预处理使用了廉价去噪且识别置信度偏低时，需要改用强力去噪重新识别"""
+        return (self.denoise_escalation_confidence > 0
+                and self.preprocessor.last_denoise not in (None, DENOISE_NLMEANS)
+                and self.last_confidence < self.denoise_escalation_confidence)
+
+    def run(self, image, ocr_lang, on_stage=None):
+        """
+        对截图执行完整的预处理→OCR流程，返回识别文本。
+        on_stage(stage) 在每个阶段开始前调用（stage 为 preprocess / ocr / preprocess_retry / ocr_retry），
+        用于汇报进度。
+        """
+        timings = {}
+        monitor = get_perf_monitor()
+
+        def stage(name, func, *args, **kwargs):
+            if on_stage:
+                on_stage(name)
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            timings[name] = (time.perf_counter() - start) * 1000
+            monitor.record(name, timings[name])
+            return result
+
+        processed = stage('preprocess', self.preprocess, image)
+        self.log_preprocess()
+        text = stage('ocr', self.recognize, processed, ocr_lang)
+
+        if self.should_escalate_denoise():
+            # 廉价去噪后识别置信度偏低，改用 NL-means 去噪重试，保留置信度更高的结果
+            first_confidence = self.last_confidence
+            processed = stage('preprocess_retry', self.preprocess, image, denoise=DENOISE_NLMEANS)
+            retry_text = stage('ocr_retry', self.recognize, processed, ocr_lang)
+            if self.last_confidence > first_confidence:
+                text = retry_text
+            else:
+                self.last_confidence = first_confidence
+
+        self.last_timings = timings
+        return text
+
+    def close(self):
+        self.recognizer.close()
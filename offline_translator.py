@@ -0,0 +1,600 @@
+"""
+Argos Translate 离线翻译封装（不依赖 Qt）
+
+OCR 文本先切分为句子，已翻译过的句子从缓存读取，其余句子分词后一次性交给
+CTranslate2 的 translate_batch 批量推理（中转翻译的两段各一次），
+无法取得底层模型时退回逐句调用 argostranslate。
+"""
+import json
+import os
+import re
+import threading
+import time
+import traceback
+
+from perf_monitor import span
+
+DEFAULT_BATCH_SIZE = 32  # 每次 CTranslate2 推理的最大句子数
+DEFAULT_BEAM_SIZE = 4    # 与 argostranslate 默认值一致，调小可降低延迟
+
+# CTranslate2 计算精度，default 表示使用模型保存时的精度
+COMPUTE_TYPES = ('default', 'int8', 'int8_float32', 'float32')
+DEVICES = ('cpu', 'auto', 'cuda')
+
+# 推理设置基准测试使用的句子
+BENCHMARK_SENTENCES = [
+    "The settings have been saved successfully.",
+    "Click the button below to continue.",
+    "An error occurred while connecting to the server.",
+    "Your download will begin in a few seconds.",
+    "Please restart the application to apply the update.",
+    "The file could not be opened because it is in use.",
+    "Are you sure you want to delete this item?",
+    "New messages are available in your inbox.",
+]
+WARMUP_TEXT = "Hello."   # 预热时的试译文本
+
+# 句子之间不使用空格的语言
+NO_SPACE_LANGUAGES = {'zh', 'ja'}
+
+SENTENCE_END = re.compile(r'(?<=[.!?;:])\s+(?=\S)')
+CJK_SENTENCE_END = re.compile(r'(?<=[。！？；])')
+
+
+def split_segments(text, lang):
+    """
+    将OCR文本切分为翻译单元，返回 [[句子, ...], ...]（每项对应输出中的一行）。
+    拉丁字母等语言中，下一行以小写字母开头时视为同一句被折行，先合并再分句；
+    中文/日文的每一行单独分句。
+    """
+    no_space = lang in NO_SPACE_LANGUAGES
+    units = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if units and not no_space and line[0].islower():
+            previous = units[-1]
+            units[-1] = previous[:-1] + line if previous.endswith('-') else f"{previous} {line}"
+        else:
+            units.append(line)
+
+    pattern = CJK_SENTENCE_END if no_space else SENTENCE_END
+    return [[sentence.strip() for sentence in pattern.split(unit) if sentence.strip()] for unit in units]
+
+
+def join_segments(units, lang):
+    """split_segments 的逆操作，按目标语言决定句子之间是否加空格"""
+    joiner = '' if lang in NO_SPACE_LANGUAGES else ' '
+    return "\n".join(joiner.join(sentences) for sentences in units)
+
+
+class InferenceSettings:
+    """
+    CTranslate2 推理设置：线程数、计算精度、设备和绑定的 CPU 核心，保存为 JSON。
+    inter_threads 为可并行处理的批次数（适合同时处理多个请求），
+    intra_threads 为单个批次使用的线程数（0 表示由 CTranslate2 决定，适合单个请求低延迟）。
+    """
+    DEFAULTS = {
+        'device': 'cpu',
+        'compute_type': 'default',
+        'inter_threads': 1,
+        'intra_threads': 0,
+        'cpu_cores': [],  # 为空表示不绑定
+        'batch_size': DEFAULT_BATCH_SIZE,
+        'beam_size': DEFAULT_BEAM_SIZE,
+    }
+
+    def __init__(self, **values):
+        for name, default in self.DEFAULTS.items():
+            setattr(self, name, values.get(name, default))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.DEFAULTS}
+
+    def copy(self, **changes):
+        values = self.to_dict()
+        values.update(changes)
+        return InferenceSettings(**values)
+
+    def model_options(self):
+        """创建 ctranslate2.Translator 时使用的参数"""
+        return {
+            'device': self.device,
+            'compute_type': self.compute_type,
+            'inter_threads': max(1, int(self.inter_threads)),
+            'intra_threads': max(0, int(self.intra_threads)),
+        }
+
+    def cache_engine(self):
+        """翻译缓存中使用的引擎名称，包含影响译文的设置（beam_size、compute_type），设置改变后不会命中旧结果"""
+        return f"argos:beam{self.beam_size}:{self.compute_type}"
+
+    def describe(self):
+        threads = f"{self.inter_threads}x{self.intra_threads or '自动'}"
+        cores = format_cpu_cores(self.cpu_cores) or "不绑定"
+        return f"{self.device}/{self.compute_type}, 线程 {threads}, 核心 {cores}"
+
+    @classmethod
+    def load(cls, path):
+        """读取设置文件，不存在或格式错误时返回默认设置"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(**{name: data[name] for name in cls.DEFAULTS if name in data})
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError, TypeError) as e:
+            print(f"读取离线翻译设置失败，使用默认设置: {e}")
+            return cls()
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def __eq__(self, other):
+        return isinstance(other, InferenceSettings) and self.to_dict() == other.to_dict()
+
+
+def parse_cpu_cores(text):
+    """解析 "0-3,6" 形式的 CPU 核心列表"""
+    cores = []
+    for part in text.replace(' ', '').split(','):
+        if not part:
+            continue
+        if '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+            if end < start:
+                raise ValueError(f"无效的核心范围: {part}")
+            cores.extend(range(start, end + 1))
+        else:
+            cores.append(int(part))
+    return sorted(set(cores))
+
+
+def format_cpu_cores(cores):
+    return ",".join(str(core) for core in cores)
+
+
+_original_affinity = None  # 第一次绑定前进程原有的 CPU 核心，清空设置时恢复
+
+
+def _get_affinity():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    import psutil  # Windows/macOS 需要 psutil
+    return list(psutil.Process().cpu_affinity())
+
+
+def _set_affinity(cores):
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    else:
+        import psutil
+        psutil.Process().cpu_affinity(list(cores))
+
+
+def apply_cpu_affinity(cores):
+    """
+    将当前进程（包括界面、截图和OCR线程，不只是翻译推理）绑定到指定 CPU 核心，返回是否已绑定。
+    cores 为空时恢复第一次绑定前的核心（之前没有绑定过则不做任何事）。
+    """
+    global _original_affinity
+    try:
+        if not cores:
+            if _original_affinity is not None:
+                _set_affinity(_original_affinity)
+                print(f"已恢复CPU核心: {format_cpu_cores(_original_affinity)}")
+                _original_affinity = None
+            return False
+        if _original_affinity is None:
+            _original_affinity = _get_affinity()
+        _set_affinity(cores)
+        return True
+    except ImportError:
+        print("当前系统绑定CPU核心需要安装 psutil")
+    except (OSError, ValueError) as e:
+        print(f"绑定CPU核心失败: {e}")
+    return False
+
+
+def _package_of(translation):
+    """取得 argostranslate 翻译对象及其语言包，结构不符时返回 (翻译对象, None)"""
+    translation = getattr(translation, 'underlying', translation)  # CachedTranslation
+    pkg = getattr(translation, 'pkg', None)
+    if pkg is None or not hasattr(translation, 'translator') or getattr(pkg, 'tokenizer', None) is None:
+        return translation, None
+    return translation, pkg
+
+
+def _create_model(pkg, settings):
+    import ctranslate2
+    return ctranslate2.Translator(str(pkg.package_path / "model"), **settings.model_options())
+
+
+def _load_package_model(translation, settings):
+    """
+    取得 argostranslate 翻译对象底层的 (CTranslate2 翻译器, 分词器, target_prefix)，
+    不同版本的内部结构不同，无法取得时返回 None。
+    """
+    translation, pkg = _package_of(translation)
+    if pkg is None:
+        return None
+    if translation.translator is None:
+        # 按推理设置加载模型，并存回翻译对象供 argostranslate 复用
+        translation.translator = _create_model(pkg, settings)
+    return translation.translator, pkg.tokenizer, getattr(pkg, 'target_prefix', '') or ''
+
+
+def _translate_tokens(translator, tokenizer, target_prefix, sentences, settings):
+    """分词后一次性批量推理，返回译文列表"""
+    tokenized = [tokenizer.encode(sentence) for sentence in sentences]
+    options = {}
+    if target_prefix:
+        options['target_prefix'] = [[target_prefix]] * len(tokenized)
+    results = translator.translate_batch(
+        tokenized, max_batch_size=settings.batch_size, beam_size=settings.beam_size,
+        num_hypotheses=1, replace_unknowns=True, **options
+    )
+
+    translated = []
+    for result in results:
+        tokens = result.hypotheses[0]
+        if target_prefix:
+            tokens = tokens[1:]
+        translated.append(tokenizer.decode(tokens).strip())
+    return translated
+
+
+def default_benchmark_candidates():
+    """基准测试的候选设置：各计算精度 × (单请求低延迟, 多请求并行)"""
+    cpu_count = os.cpu_count() or 1
+    thread_layouts = [(1, 0)]
+    if cpu_count >= 4:
+        thread_layouts.append((2, cpu_count // 2))
+    return [InferenceSettings(compute_type=compute_type, inter_threads=inter, intra_threads=intra)
+            for compute_type in COMPUTE_TYPES[1:] for inter, intra in thread_layouts]
+
+
+class Translator:
+    """
+    封装翻译功能，支持直接翻译和自动中转翻译。
+    """
+    def __init__(self, status_queue, cache=None, settings=None):
+        self.status_queue = status_queue
+        self.cache = cache  # 可选的 TranslationCache
+        self.settings = settings or InferenceSettings()  # CTranslate2 推理设置，initialize() 加载模型时生效
+        # 您可以在这里设置默认的源语言和目标语言
+        # self.from_code = SOURCE_LANG 
+        # self.to_code = TARGET_LANG
+        self.ready = False
+        self.lang_map = {}  # 用于快速查找已安装的语言对象
+        self.diagnostic_log = [] # 用于存储诊断日志
+        self.available_languages = [] # <--- 新增：恢复此属性以兼容UI
+        self.translations = {}  # (源语言, 目标语言) -> 已解析并预热的翻译对象
+        self._translations_lock = threading.Lock()
+
+    def log(self, message):
+        """记录日志到队列和控制台"""
+        self.diagnostic_log.append(message)
+        if self.status_queue:
+            self.status_queue.put(message)
+        print(f"[Translator] {message}")
+
+    def initialize(self, warm_pairs=()):
+        """
+        初始化翻译引擎，加载语言模型并构建速查表。
+        warm_pairs 为需要预热的 (源语言, 目标语言) 列表，预热完成后才报告就绪。
+        """
+        self.log("开始初始化翻译引擎...")
+        try:
+            from argostranslate import package, translate
+            
+            # 确保使用正确的包目录
+            if 'ARGOS_PACKAGES_DIR' in os.environ:
+                custom_dir = os.environ['ARGOS_PACKAGES_DIR']
+                self.log(f"使用自定义包目录: {custom_dir}")
+                
+                # 尝试设置包目录（如果库提供了相应的API）
+                try:
+                    # 尝试设置包目录（如果库提供了相应的API）
+                    if hasattr(package, 'set_packages_dir'):
+                        package.set_packages_dir(custom_dir)
+                        self.log(f"已设置包目录: {custom_dir}")
+                except Exception as e:
+                    self.log(f"设置包目录失败: {e}")
+            
+            if apply_cpu_affinity(self.settings.cpu_cores):
+                self.log(f"已绑定CPU核心: {format_cpu_cores(self.settings.cpu_cores)}")
+            self._apply_argos_settings()
+            
+            package.update_package_index()
+            installed_languages = translate.get_installed_languages()
+            
+            if not installed_languages:
+                self.log("警告: 未找到任何已安装的 argostranslate 语言包。")
+                self.log("请先安装argostranslate 以及语言包")
+                self.ready = False  # 明确设置为未就绪
+                return False  # 返回 False 表示初始化失败
+    
+            # 构建语言代码到语言对象的映射，方便内部快速查找
+            self.lang_map = {lang.code: lang for lang in installed_languages}
+            with self._translations_lock:
+                self.translations = {}
+            
+            # 填充 available_languages 列表
+            self.available_languages = []
+            for lang in installed_languages:
+                self.available_languages.append((lang.code, lang.name))
+            # 对列表进行排序，让UI显示更友好
+            self.available_languages.sort(key=lambda x: x[1]) 
+    
+            installed_codes = list(self.lang_map.keys())
+            self.log(f"已成功加载的语言包: {', '.join(installed_codes)}")
+            
+            self.warm_up(warm_pairs)
+            self.ready = True
+            self.log("翻译引擎初始化完成，随时可用。")
+            return True  # 返回 True 表示初始化成功
+    
+        except Exception as e:
+            self.log(f"翻译引擎初始化失败: {str(e)}")
+            self.log(traceback.format_exc())
+            self.ready = False
+            return False  # 返回 False 表示初始化失败
+
+    def _get_translation(self, from_code, to_code):
+        """
+        【内部方法】查找直接翻译路径，解析结果保存在 translations 表中复用。
+        返回 (翻译对象, 错误信息)
+        """
+        translation = self.translations.get((from_code, to_code))
+        if translation is not None:
+            return translation, None
+
+        from_lang = self.lang_map.get(from_code)
+        to_lang = self.lang_map.get(to_code)
+
+        if not from_lang:
+            return None, f"未安装源语言包: {from_code}"
+        if not to_lang:
+            return None, f"未安装目标语言包: {to_code}"
+        
+        with self._translations_lock:
+            translation = self.translations.get((from_code, to_code))
+            if translation is None:
+                translation = from_lang.get_translation(to_lang)
+                if translation:
+                    self.translations[(from_code, to_code)] = translation
+        
+        if not translation:
+            return None, f"没有可用的直接翻译路径: {from_code} -> {to_code}"
+        return translation, None
+
+    def _warm_up_legs(self, pairs):
+        """【内部方法】需要预热的直接翻译路径（没有直接路径时为经英语中转的两段）"""
+        legs = []
+        for from_code, to_code in pairs:
+            if not from_code or not to_code or from_code == to_code:
+                continue
+            translation, _ = self._get_translation(from_code, to_code)
+            if translation is not None:
+                candidates = [(from_code, to_code)]
+            elif from_code != 'en' and to_code != 'en':
+                candidates = [(from_code, 'en'), ('en', to_code)]
+            else:
+                candidates = []
+            legs.extend(leg for leg in candidates if leg not in legs)
+        return legs
+
+    def warm_up(self, pairs):
+        """
+        预先解析翻译对象并各试译一次，使模型在第一次真正翻译之前加载完毕。
+        返回成功预热的路径数。
+        """
+        legs = self._warm_up_legs(pairs)
+        warmed = 0
+        for index, (from_code, to_code) in enumerate(legs, 1):
+            self.log(f"正在预热翻译模型 ({index}/{len(legs)}): {from_code} -> {to_code}")
+            translation, error = self._get_translation(from_code, to_code)
+            if error:
+                self.log(f"预热失败: {error}")
+                continue
+            start = time.perf_counter()
+            try:
+                with span("translate.warmup"):
+                    self._run_batch(translation, [WARMUP_TEXT])
+            except Exception as e:
+                self.log(f"预热失败: {from_code} -> {to_code}: {e}")
+                continue
+            warmed += 1
+            self.log(f"翻译模型已预热: {from_code} -> {to_code} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return warmed
+
+    def _apply_argos_settings(self):
+        """【内部方法】退回逐句翻译时由 argostranslate 自己加载模型，同样应用线程和设备设置"""
+        try:
+            from argostranslate import settings
+        except ImportError:
+            return
+        options = self.settings.model_options()
+        for name in ('device', 'inter_threads', 'intra_threads'):
+            if hasattr(settings, name):
+                setattr(settings, name, options[name])
+
+    def _run_batch(self, translation, sentences):
+        """【内部方法】对一组句子执行一次批量推理，返回译文列表"""
+        model = _load_package_model(translation, self.settings)
+        if model is None:
+            return [translation.translate(sentence) for sentence in sentences]
+        translator, tokenizer, target_prefix = model
+        return _translate_tokens(translator, tokenizer, target_prefix, sentences, self.settings)
+
+    def benchmark_settings(self, from_code, to_code, candidates=None, repeat=3, progress=None):
+        """
+        用不同推理设置分别加载 from_code -> to_code 的模型，测量加载耗时、
+        单句延迟（中位数）和批量吞吐量，返回结果列表（按单句延迟排序）。
+        progress(message) 用于汇报进度。
+        """
+        translation, error = self._get_translation(from_code, to_code)
+        if error:
+            raise ValueError(error)
+        _, pkg = _package_of(translation)
+        if pkg is None:
+            raise ValueError("当前 argostranslate 版本无法直接访问模型，不支持推理设置测试")
+        target_prefix = getattr(pkg, 'target_prefix', '') or ''
+        candidates = candidates or default_benchmark_candidates()
+
+        results = []
+        for index, settings in enumerate(candidates, 1):
+            if progress:
+                progress(f"正在测试推理设置 ({index}/{len(candidates)}): {settings.describe()}")
+            result = {'settings': settings}
+            try:
+                start = time.perf_counter()
+                model = _create_model(pkg, settings)
+                result['load_ms'] = (time.perf_counter() - start) * 1000
+
+                _translate_tokens(model, pkg.tokenizer, target_prefix, BENCHMARK_SENTENCES[:1], settings)  # 预热
+                single = []
+                for _ in range(repeat):
+                    for sentence in BENCHMARK_SENTENCES:
+                        start = time.perf_counter()
+                        _translate_tokens(model, pkg.tokenizer, target_prefix, [sentence], settings)
+                        single.append((time.perf_counter() - start) * 1000)
+                single.sort()
+                result['single_ms'] = single[len(single) // 2]
+
+                sentences = BENCHMARK_SENTENCES * repeat
+                start = time.perf_counter()
+                _translate_tokens(model, pkg.tokenizer, target_prefix, sentences, settings)
+                result['batch_sentences_per_s'] = len(sentences) / (time.perf_counter() - start)
+            except Exception as e:
+                # 部分 CPU 不支持某些计算精度
+                result['error'] = str(e)
+            results.append(result)
+
+        results.sort(key=lambda item: item.get('single_ms', float('inf')))
+        return results
+
+    def _get_direct_translation(self, sentences, from_code, to_code):
+        """
+        【内部方法】尝试进行直接翻译。
+        返回 (译文列表, 错误信息)
+        """
+        translation, error = self._get_translation(from_code, to_code)
+        if error:
+            return None, error
+            
+        try:
+            with span("translate.argos", sentences=len(sentences)):
+                result = self._run_batch(translation, sentences)
+            self.log(f"直接翻译成功: {from_code} -> {to_code} ({len(sentences)} 句)")
+            return result, None
+        except Exception as e:
+            return None, f"翻译执行时发生错误: {str(e)}"
+
+    def _get_pivot_translation(self, sentences, from_code, to_code, pivot_code='en'):
+        """
+        【内部方法】通过中转语言进行翻译，两段各批量推理一次。
+        返回 (译文列表, 错误信息)
+        """
+        self.log(f"尝试中转翻译: {from_code} -> {pivot_code} -> {to_code}")
+
+        if pivot_code not in self.lang_map:
+            return None, f"中转失败：未安装中转语言包: {pivot_code}"
+
+        self.log(f"中转第一步: {from_code} -> {pivot_code}")
+        step1_result, error = self._get_direct_translation(sentences, from_code, pivot_code)
+        if error:
+            return None, f"中转第一步失败: {error}"
+            
+        self.log(f"中转第二步: {pivot_code} -> {to_code}")
+        step2_result, error = self._get_direct_translation(step1_result, pivot_code, to_code)
+        if error:
+            return None, f"中转第二步失败: {error}"
+        
+        self.log("中转翻译成功！")
+        return step2_result, None
+
+    def translate(self, text, from_code, to_code):
+        """
+        智能翻译文本。优先尝试直接翻译，失败后自动尝试中转翻译。
+        """
+        return self.translate_batch([text], from_code, to_code)[0]
+
+    def translate_batch(self, texts, from_code, to_code):
+        """
+        翻译多段文本，返回与输入顺序一致的译文列表（失败时为错误信息）。
+        所有文本中未缓存的句子合并为一次批量推理。
+        """
+        if not self.ready:
+            error_msg = "翻译引擎未就绪，请先调用 initialize()"
+            self.log(error_msg)
+            return [error_msg] * len(texts)
+
+        results = [None] * len(texts)
+        layouts = {}  # 文本序号 -> 切分后的句子结构
+        for index, text in enumerate(texts):
+            if not text or not text.strip():
+                results[index] = ""
+                continue
+            cached = self._lookup(text, from_code, to_code)
+            if cached is not None:
+                self.log(f"翻译缓存命中: {from_code} -> {to_code}")
+                results[index] = cached
+            else:
+                layouts[index] = split_segments(text, from_code)
+
+        if not layouts:
+            return results
+
+        # 已翻译过的句子直接复用，其余句子去重后批量翻译
+        translated = {}
+        pending = {}  # 按首次出现顺序保存的待翻译句子
+        for units in layouts.values():
+            for sentence in (sentence for sentences in units for sentence in sentences):
+                if sentence in translated or sentence in pending:
+                    continue
+                cached = self._lookup(sentence, from_code, to_code)
+                if cached is not None:
+                    translated[sentence] = cached
+                else:
+                    pending[sentence] = None
+        pending = list(pending)
+
+        if pending:
+            self.log(f"开始翻译任务: 从 {from_code} 到 {to_code} "
+                     f"({len(pending)} 句待翻译, {len(translated)} 句来自缓存)")
+            batch, error = self._get_direct_translation(pending, from_code, to_code)
+            if batch is None:
+                self.log(f"直接翻译失败: {error}")
+                if from_code != 'en' and to_code != 'en':
+                    batch, error = self._get_pivot_translation(pending, from_code, to_code, pivot_code='en')
+
+            if batch is None:
+                final_error_msg = f"翻译彻底失败: {from_code} -> {to_code}. 原因: {error}"
+                self.log(final_error_msg)
+                for index in layouts:
+                    results[index] = final_error_msg
+                return results
+
+            for sentence, result in zip(pending, batch):
+                translated[sentence] = self._remember(sentence, from_code, to_code, result)
+
+        for index, units in layouts.items():
+            result = join_segments([[translated[sentence] for sentence in sentences] for sentences in units], to_code)
+            results[index] = self._remember(texts[index], from_code, to_code, result)
+        return results
+
+    def _lookup(self, text, from_code, to_code):
+        if self.cache is None:
+            return None
+        return self.cache.get(text, from_code, to_code, self.settings.cache_engine())
+
+    def _remember(self, text, from_code, to_code, result):
+        """将成功的翻译结果写入缓存（失败信息不缓存）"""
+        if self.cache is not None:
+            self.cache.put(text, from_code, to_code, self.settings.cache_engine(), result)
+        return result
@@ -1,4 +1,3 @@
-import requests
 import json
 import hashlib
 import random
@@ -7,6 +6,26 @@ from urllib.parse import quote
 import urllib.request
 import urllib.parse
 import re
+import threading
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+
+from http_transport import (
+    CancelToken, RequestCancelled, TransportSession, cancel_scope, current_cancel_token
+)
+from instance_health import InstanceHealthMonitor
+from perf_monitor import percentile, span
+from rate_limit import TokenBucket
+
+# 长文本分段翻译的默认并发数和请求速率（每秒请求数），各引擎可在构造时调整
+DEFAULT_CHUNK_CONCURRENCY = 2
+DEFAULT_REQUEST_RATE = 5.0
+
+# 当前引擎失败后按此顺序尝试备用引擎，竞速模式也按此顺序选择参赛引擎
+FALLBACK_ORDER = ['libretranslate', 'mymemory', 'google', 'deepl', 'microsoft', 'baidu']
+DEFAULT_RACE_SIZE = 2   # 竞速模式同时请求的引擎数
+RACE_LATENCY_WINDOW = 100
 
 class BaseTranslator:
     """翻译器基类，提供通用的语言处理功能"""
@@ -36,11 +55,51 @@ class BaseTranslator:
         # API特定的语言映射（子类可以覆盖）
         self.api_lang_map = {}
         
-        # 创建session
-        self.session = requests.Session()
-        self.session.headers.update({
+        # 创建session（所有引擎共用传输层的事件循环和连接池，各自保存默认请求头）
+        self.session = TransportSession(headers={
             'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36'
         })
+        
+        # 分段翻译的并发上限和令牌桶限速
+        self._chunk_executor = None
+        self.configure_concurrency(DEFAULT_CHUNK_CONCURRENCY, DEFAULT_REQUEST_RATE)
+    
+    def configure_concurrency(self, max_concurrency, request_rate):
+        """设置同时进行的分段请求数和每秒请求数上限"""
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.rate_limiter = TokenBucket(request_rate, capacity=self.max_concurrency)
+        if self._chunk_executor is not None:
+            self._chunk_executor.shutdown(wait=False)
+            self._chunk_executor = None
+    
+    def _translate_chunks(self, chunks, translate_chunk):
+        """
+        并发翻译各段文本（受并发上限和令牌桶限速约束），按原顺序返回译文，
+        翻译失败的段保留原文。
+        """
+        if self._chunk_executor is None:
+            self._chunk_executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix=f"{type(self).__name__}-chunk"
+            )
+        
+        # 竞速时被取消的引擎，其分段请求同样应被取消
+        token = current_cancel_token()
+        
+        def run(chunk):
+            with cancel_scope(token):
+                self.rate_limiter.acquire()
+                return translate_chunk(chunk)
+        
+        futures = [self._chunk_executor.submit(run, chunk) for chunk in chunks]
+        translated_chunks = []
+        for i, (chunk, future) in enumerate(zip(chunks, futures)):
+            try:
+                translated_chunks.append(future.result())
+            except Exception as e:
+                print(f"第 {i+1} 段翻译失败: {e}")
+                # 如果某段失败，使用原文
+                translated_chunks.append(chunk)
+        return translated_chunks
     
     def map_language(self, lang_code):
         """将通用语言代码映射到API特定代码"""
@@ -63,7 +122,7 @@ class BaseTranslator:
 class OnlineTranslator:
     """在线翻译引擎管理类"""
     
-    def __init__(self):
+    def __init__(self, cache=None):
         self.translators = {
             'libretranslate': LibreTranslateTranslator(),
             'mymemory': MyMemoryTranslator(),
@@ -73,6 +132,46 @@ class OnlineTranslator:
             'microsoft': MicrosoftTranslator()
         }
         self.current_translator = 'libretranslate'  # 默认使用LibreTranslate
+        self.cache = cache  # 可选的 TranslationCache
+        
+        # 竞速模式：同时请求前 race_size 个支持该语言对的引擎，使用最先成功的结果
+        self.racing = False
+        self.last_engine = None  # 最近一次翻译实际使用的引擎（竞速胜出或备用引擎）
+        self.race_size = DEFAULT_RACE_SIZE
+        self._race_executor = None
+        self._race_stats = {}   # 引擎名称 -> 参赛/胜出/失败次数和最近延迟
+        self._race_lock = threading.Lock()
+    
+    def set_racing(self, enabled, race_size=None):
+        """开启/关闭竞速模式，race_size 为同时请求的引擎数"""
+        self.racing = bool(enabled)
+        if race_size is not None:
+            self.race_size = max(2, int(race_size))
+    
+    def share_rate_limit(self, processes):
+        """
+        多个进程各自创建翻译器、同时请求同一服务时调用：每个引擎的并发和速率上限按进程数平分，
+        所有进程合计不超过单个进程的限制。
+        """
+        processes = max(1, int(processes))
+        if processes == 1:
+            return
+        for translator in self.translators.values():
+            translator.configure_concurrency(max(1, translator.max_concurrency // processes),
+                                             translator.rate_limiter.rate / processes)
+    
+    def set_cache(self, cache):
+        """设置翻译结果缓存（None 表示不使用缓存）"""
+        self.cache = cache
+    
+    def _translate_with(self, name, text, from_lang, to_lang):
+        """使用指定引擎翻译，结果写入缓存"""
+        with span(f"translate.{name}", chars=len(text)):
+            result = self.translators[name].translate(text, from_lang, to_lang)
+        # 部分引擎失败时原样返回输入文本，这类结果不缓存
+        if self.cache is not None and result and result.strip() != text.strip():
+            self.cache.put(text, from_lang, to_lang, name, result)
+        return result
     
     def set_translator(self, translator_name):
         """设置当前翻译引擎"""
@@ -121,6 +220,114 @@ class OnlineTranslator:
         
         return False
     
+    def _engines_for_pair(self, from_lang, to_lang):
+        """支持该语言对的引擎：当前引擎优先，其余按备用顺序"""
+        order = [self.current_translator] + FALLBACK_ORDER + list(self.translators)
+        engines = []
+        for name in order:
+            if name in engines or name not in self.translators:
+                continue
+            translator = self.translators[name]
+            if translator.is_language_supported(from_lang) and translator.is_language_supported(to_lang):
+                engines.append(name)
+        return engines
+    
+    def _record_race(self, name, outcome, latency=None):
+        """记录一次参赛结果：outcome 为 wins/losses/failures/cancelled，latency 为完成耗时（秒）"""
+        with self._race_lock:
+            entry = self._race_stats.get(name)
+            if entry is None:
+                entry = self._race_stats[name] = {
+                    'races': 0, 'wins': 0, 'losses': 0, 'failures': 0, 'cancelled': 0,
+                    'latencies': deque(maxlen=RACE_LATENCY_WINDOW),
+                }
+            entry['races'] += 1
+            entry[outcome] += 1
+            if latency is not None:
+                entry['latencies'].append(latency)
+    
+    def race_stats(self):
+        """
+        各引擎的竞速统计，用于调整 race_size：
+        {引擎: {races, wins, losses, failures, cancelled, win_rate, p50_ms, p95_ms}}，
+        延迟只统计完成了请求的参赛（胜出或在取消生效前完成）。
+        """
+        with self._race_lock:
+            entries = {name: dict(entry, latencies=sorted(entry['latencies']))
+                       for name, entry in self._race_stats.items()}
+        stats = {}
+        for name, entry in entries.items():
+            latencies = entry.pop('latencies')
+            entry['win_rate'] = entry['wins'] / entry['races'] if entry['races'] else 0.0
+            entry['p50_ms'] = percentile(latencies, 50) * 1000 if latencies else None
+            entry['p95_ms'] = percentile(latencies, 95) * 1000 if latencies else None
+            stats[name] = entry
+        return stats
+    
+    def reset_race_stats(self):
+        with self._race_lock:
+            self._race_stats.clear()
+    
+    def _race(self, engines, text, from_lang, to_lang):
+        """
+        同时请求多个引擎，返回 (引擎名称, 译文)；较慢的引擎通过取消令牌中止其进行中的请求。
+        部分引擎失败时会原样返回输入文本，这类结果不算成功。全部失败时抛出最后一个错误。
+        """
+        if self._race_executor is None:
+            self._race_executor = ThreadPoolExecutor(max_workers=len(self.translators),
+                                                     thread_name_prefix="translate-race")
+        tokens = {name: CancelToken() for name in engines}
+        
+        def run(name):
+            start = time.perf_counter()
+            with cancel_scope(tokens[name]):
+                result = self._translate_with(name, text, from_lang, to_lang)
+            if not result or result.strip() == text.strip():
+                raise Exception(f"{name} 未返回有效译文")
+            return result, time.perf_counter() - start
+        
+        print(f"竞速翻译: {', '.join(engines)}")
+        futures = {self._race_executor.submit(run, name): name for name in engines}
+        last_error = None
+        with span("translate.race", engines=len(engines)):
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    result, latency = future.result()
+                except Exception as e:
+                    print(f"竞速引擎 {name} 失败: {e}")
+                    self._record_race(name, 'failures')
+                    last_error = e
+                    continue
+                
+                self._record_race(name, 'wins', latency)
+                print(f"竞速胜出: {name} ({latency * 1000:.0f} ms)")
+                # 取消其余引擎：尚未开始的任务直接取消，进行中的请求由取消令牌中止
+                for other, other_name in futures.items():
+                    if not other.done():
+                        tokens[other_name].cancel()
+                        other.cancel()
+                        other.add_done_callback(
+                            lambda f, n=other_name: self._finish_loser(f, n, tokens[n]))
+                return name, result
+        
+        raise last_error or Exception("竞速引擎全部失败")
+    
+    def _finish_loser(self, future, name, token):
+        """
+        记录未胜出引擎的结果：被取消、失败，或在取消生效前已完成。
+        引擎可能把取消包装成其他异常（或因分段被取消而返回原文），因此以令牌状态为准判断是否被取消。
+        """
+        if future.cancelled():
+            self._record_race(name, 'cancelled')
+            return
+        try:
+            _, latency = future.result()
+        except Exception:
+            self._record_race(name, 'cancelled' if token.cancelled else 'failures')
+        else:
+            self._record_race(name, 'losses', latency)
+    
     def translate(self, text, from_lang, to_lang):
         """翻译文本"""
         if not text or not text.strip():
@@ -142,27 +349,53 @@ class OnlineTranslator:
                 # 如果没有翻译器明确支持，尝试使用当前翻译器（可能支持但未在列表中）
                 print(f"警告：没有翻译器明确支持语言对 {from_lang}->{to_lang}，尝试使用当前翻译器")
         
-        translator = self.translators[self.current_translator]
+        if self.racing:
+            engines = self._engines_for_pair(from_lang, to_lang)[:self.race_size]
+            if len(engines) > 1:
+                if self.cache is not None:
+                    for name in engines:
+                        cached = self.cache.get(text, from_lang, to_lang, name)
+                        if cached is not None:
+                            print(f"翻译缓存命中 ({name})")
+                            self.last_engine = name
+                            return cached
+                try:
+                    self.last_engine, result = self._race(engines, text, from_lang, to_lang)
+                    return result
+                except Exception as e:
+                    print(f"竞速引擎全部失败: {e}")
+                    return self._translate_fallback(text, from_lang, to_lang, e, skip=engines)
+        
+        if self.cache is not None:
+            cached = self.cache.get(text, from_lang, to_lang, self.current_translator)
+            if cached is not None:
+                print(f"翻译缓存命中 ({self.current_translator})")
+                self.last_engine = self.current_translator
+                return cached
+        
         try:
             print(f"使用翻译引擎: {self.current_translator}")
-            result = translator.translate(text, from_lang, to_lang)
+            result = self._translate_with(self.current_translator, text, from_lang, to_lang)
+            self.last_engine = self.current_translator
             return result
         except Exception as e:
             print(f"翻译失败 ({self.current_translator}): {e}")
-            # 按优先级尝试备用翻译器
-            fallback_order = ['libretranslate', 'mymemory', 'google', 'deepl', 'microsoft', 'baidu']
-            
-            for name in fallback_order:
-                if name != self.current_translator and name in self.translators:
-                    try:
-                        print(f"尝试备用翻译器: {name}")
-                        result = self.translators[name].translate(text, from_lang, to_lang)
-                        return result
-                    except Exception as backup_error:
-                        print(f"备用翻译器 {name} 失败: {backup_error}")
-                        continue
-            
-            raise Exception(f"所有翻译引擎都失败了: {e}")
+            return self._translate_fallback(text, from_lang, to_lang, e, skip=[self.current_translator])
+    
+    def _translate_fallback(self, text, from_lang, to_lang, error, skip=()):
+        """按优先级尝试备用翻译器（跳过已经失败的引擎）"""
+        for name in FALLBACK_ORDER:
+            if name not in skip and name in self.translators:
+                try:
+                    print(f"尝试备用翻译器: {name}")
+                    result = self._translate_with(name, text, from_lang, to_lang)
+                    self.last_engine = name
+                    return result
+                except Exception as backup_error:
+                    print(f"备用翻译器 {name} 失败: {backup_error}")
+                    continue
+        
+        raise Exception(f"所有翻译引擎都失败了: {error}")
 
 
 class LibreTranslateTranslator(BaseTranslator):
@@ -242,8 +475,15 @@ class LibreTranslateTranslator(BaseTranslator):
         # 最大字符限制
         self.max_chars = 2000
         
-        # 实例状态跟踪
-        self.failed_instances = set()
+        # 分段并发翻译：最多 4 个请求同时进行，平均每秒不超过 5 个（原先每段之间固定等待 0.2 秒）
+        self.configure_concurrency(4, 5.0)
+        
+        # 实例健康状态：翻译请求本身即健康信号，失败的实例按指数退避冷却后重新参与分配，
+        # 后台线程负责探测冷却到期或长时间无流量的实例
+        self.health = InstanceHealthMonitor(probe=self._probe_instance)
+        # 首选实例超过其 p95 延迟仍未响应时，向次优实例发送对冲请求，取先返回的结果
+        self.hedging = True
+        self._executor = None
         
         # 更新session headers
         self.session.headers.update({
@@ -271,9 +511,10 @@ class LibreTranslateTranslator(BaseTranslator):
         # 重新构建公共实例列表：自定义实例 + 原始公共实例
         self.public_instances = self.custom_instances + self.original_public_instances
         
-        # 设置当前实例为第一个自定义实例
+        # 设置当前实例为第一个自定义实例（用户主动设置的实例清除之前的失败记录）
         self.current_instance_index = 0
         self.base_url = self.public_instances[self.current_instance_index]
+        self.health.reset(custom_url)
         
         print(f"已设置自定义LibreTranslate实例: {custom_url}")
         print(f"当前实例列表: {len(self.public_instances)} 个实例")
@@ -333,7 +574,7 @@ class LibreTranslateTranslator(BaseTranslator):
         # 重置当前实例
         self.current_instance_index = 0
         self.base_url = self.public_instances[self.current_instance_index]
-        self.failed_instances.clear()
+        self.health.reset()
         
         print(f"已清除所有自定义实例，恢复 {len(self.public_instances)} 个公共实例")
         return removed_count
@@ -346,49 +587,60 @@ class LibreTranslateTranslator(BaseTranslator):
             'total_instances': len(self.public_instances),
             'custom_instances': self.custom_instances.copy(),
             'failed_instances': list(self.failed_instances),
+            'instance_health': self.health.snapshot(),
             'api_key_set': bool(self.api_key)
         }
     
+    @property
+    def failed_instances(self):
+        """当前处于冷却期的实例"""
+        return self.health.cooling_down(self.public_instances)
+    
     def get_supported_languages(self):
-        """动态获取LibreTranslate支持的语言"""
-        # 尝试从当前实例获取支持的语言
-        try:
-            langs_url = f"{self.base_url}/languages"
-            response = self.session.get(langs_url, timeout=5)
-            if response.status_code == 200:
-                languages = response.json()
-                return [lang['code'] for lang in languages]
-        except:
-            pass
+        """获取LibreTranslate支持的语言（优先使用健康探测缓存的语言列表）"""
+        languages = self.health.languages(self.base_url)
+        if languages is None:
+            try:
+                languages = self._probe_instance(self.base_url)
+                self.health.record_success(self.base_url, languages)
+            except Exception:
+                languages = None
         
         # 如果无法动态获取，返回预设的语言
-        return list(self.api_lang_map.values())
+        return languages or list(self.api_lang_map.values())
     
     def _get_next_available_instance(self):
-        """获取下一个可用实例"""
-        for i in range(len(self.public_instances)):
-            index = (self.current_instance_index + i) % len(self.public_instances)
-            instance = self.public_instances[index]
-            if instance not in self.failed_instances:
-                self.current_instance_index = index
-                self.base_url = instance
-                return True
-        return False
+        """切换到最优的可用实例（自定义实例优先，其余按延迟和错误率排序）"""
+        instances = self._candidate_instances()
+        if not instances:
+            return False
+        self._use_instance(instances[0])
+        return True
     
-    def _mark_instance_as_failed(self, instance):
-        """标记实例为失败"""
-        self.failed_instances.add(instance)
-        print(f"标记实例为失败: {instance}")
+    def _use_instance(self, instance):
+        if instance != self.base_url:
+            print(f"切换到LibreTranslate实例: {instance}")
+        self.base_url = instance
+        self.current_instance_index = self.public_instances.index(instance)
     
-    def _check_instance_health(self, base_url):
-        """检查实例健康状态"""
-        try:
-            # 尝试获取语言列表
-            langs_url = f"{base_url}/languages"
-            response = self.session.get(langs_url, timeout=5)
-            return response.status_code == 200
-        except:
-            return False
+    def _mark_instance_as_failed(self, instance, error=None):
+        """标记实例为失败（进入冷却期，到期后重新参与分配）"""
+        self.health.record_failure(instance, error)
+    
+    def _probe_instance(self, base_url):
+        """后台健康探测：获取语言列表，失败时抛出异常"""
+        response = self.session.get(f"{base_url}/languages", timeout=5)
+        response.raise_for_status()
+        return [lang['code'] for lang in response.json()]
+    
+    def _candidate_instances(self):
+        """本次请求依次尝试的实例：跳过冷却中的实例，自定义实例优先，其余按延迟和错误率从优到劣"""
+        return self.health.ranked(self.public_instances, preferred=self.custom_instances)
+    
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="libretranslate")
+        return self._executor
     
     def _split_text(self, text, max_length=2000):
         """将长文本分割成多个不超过max_length的段落"""
@@ -432,58 +684,91 @@ class LibreTranslateTranslator(BaseTranslator):
         if len(text) > self.max_chars:
             print(f"文本长度{len(text)}超过LibreTranslate限制({self.max_chars})，进行分割翻译")
             chunks = self._split_text(text, self.max_chars)
-            translated_chunks = []
-            
-            for i, chunk in enumerate(chunks):
-                print(f"翻译第 {i+1}/{len(chunks)} 段 (长度: {len(chunk)})")
-                try:
-                    translated_chunk = self._translate_with_retry(chunk, from_lang, to_lang)
-                    translated_chunks.append(translated_chunk)
-                    # 添加短暂延迟避免请求过快
-                    time.sleep(0.2)
-                except Exception as e:
-                    print(f"第 {i+1} 段翻译失败: {e}")
-                    # 如果某段失败，尝试使用原文
-                    translated_chunks.append(chunk)
-            
+            print(f"并发翻译 {len(chunks)} 段 (并发上限: {self.max_concurrency})")
+            translated_chunks = self._translate_chunks(
+                chunks, lambda chunk: self._translate_with_retry(chunk, from_lang, to_lang)
+            )
             return " ".join(translated_chunks)
         else:
             return self._translate_with_retry(text, from_lang, to_lang)
     
+    def _attempt(self, text, from_lang, to_lang, instance):
+        """向指定实例发送一次翻译请求，并把耗时或失败记录到健康状态"""
+        start = time.perf_counter()
+        try:
+            result = self._translate_chunk(text, from_lang, to_lang, instance)
+        except RequestCancelled:
+            # 竞速中被取消不代表实例不健康
+            raise
+        except Exception as e:
+            print(f"实例 {instance} 翻译失败: {e}")
+            # 标记实例为失败（冷却后自动恢复）
+            self._mark_instance_as_failed(instance, e)
+            raise
+        self.health.record_success(instance, latency=time.perf_counter() - start)
+        return result
+    
     def _translate_with_retry(self, text, from_lang, to_lang, max_retries=None):
-        """带重试的翻译方法"""
-        if max_retries is None:
-            max_retries = len(self.public_instances)
+        """
+        带重试的翻译方法：按排序依次尝试可用实例，翻译结果即作为实例的健康信号。
+        首选实例超过其 p95 延迟仍未响应时，向下一个实例发送对冲请求，使用先成功返回的结果。
+        """
+        self.health.start(lambda: list(self.public_instances))
+        instances = self._candidate_instances()
+        if max_retries is not None:
+            instances = instances[:max_retries]
         
         last_error = None
-        
-        for attempt in range(max_retries):
-            try:
-                return self._translate_chunk(text, from_lang, to_lang)
-            except Exception as e:
-                last_error = e
-                print(f"实例 {self.base_url} 翻译失败: {e}")
-                
-                # 标记当前实例为失败并尝试下一个
-                self._mark_instance_as_failed(self.base_url)
-                
-                if not self._get_next_available_instance():
-                    # 所有实例都失败了，重置失败列表再试一次
-                    if attempt == max_retries - 1:
-                        break
-                    self.failed_instances.clear()
-                    self._get_next_available_instance()
-                
-                print(f"切换到LibreTranslate实例: {self.base_url}")
-                time.sleep(1)  # 添加延迟
+        index = 0
+        token = current_cancel_token()
+        
+        def attempt(instance):
+            with cancel_scope(token):
+                return self._attempt(text, from_lang, to_lang, instance)
+        
+        while index < len(instances):
+            primary = instances[index]
+            backup = instances[index + 1] if index + 1 < len(instances) else None
+            index += 1
+            hedge_delay = self.health.hedge_delay(primary) if self.hedging and backup else None
+            
+            if hedge_delay is None:
+                try:
+                    result = self._attempt(text, from_lang, to_lang, primary)
+                except RequestCancelled:
+                    # 竞速中被取消：不再尝试其余实例，原样向上传递
+                    raise
+                except Exception as e:
+                    last_error = e
+                    continue
+                self._use_instance(primary)
+                return result
+            
+            executor = self._get_executor()
+            futures = {executor.submit(attempt, primary): primary}
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done:
+                print(f"实例 {primary} 超过 p95 ({hedge_delay * 1000:.0f} ms) 未响应，对冲请求 {backup}")
+                futures[executor.submit(attempt, backup)] = backup
+                index += 1
+            
+            # 较慢的请求继续在后台完成，其耗时同样计入实例统计
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except RequestCancelled:
+                    raise
+                except Exception as e:
+                    last_error = e
+                    continue
+                self._use_instance(futures[future])
+                return result
         
         raise Exception(f"所有LibreTranslate实例都失败: {last_error}")
     
-    def _translate_chunk(self, text, from_lang, to_lang):
-        """翻译单个文本块"""
-        # 首先检查实例健康状态
-        if not self._check_instance_health(self.base_url):
-            raise Exception(f"实例 {self.base_url} 健康检查失败")
+    def _translate_chunk(self, text, from_lang, to_lang, base_url=None):
+        """翻译单个文本块（不再预先做健康检查，请求本身的结果就是健康信号）"""
+        base_url = base_url or self.base_url
         
         # 准备请求数据
         data = {
@@ -494,10 +779,10 @@ class LibreTranslateTranslator(BaseTranslator):
         }
         
         # 添加API密钥（如果需要）
-        if self.api_key and 'libretranslate.com' in self.base_url:
+        if self.api_key and 'libretranslate.com' in base_url:
             data['api_key'] = self.api_key
         
-        url = f"{self.base_url}/translate"
+        url = f"{base_url}/translate"
         
         print(f"LibreTranslate翻译: {from_lang} -> {to_lang} (长度: {len(text)})")
         
@@ -557,6 +842,9 @@ class MyMemoryTranslator(BaseTranslator):
         }
         
         self.max_chars = 500
+        
+        # 分段并发翻译：最多 3 个请求同时进行，平均每秒不超过 10 个（原先每段之间固定等待 0.1 秒）
+        self.configure_concurrency(3, 10.0)
 
     def set_base_url(self, base_url):
         """设置自定义API端点"""
@@ -610,18 +898,10 @@ class MyMemoryTranslator(BaseTranslator):
         if len(text) > self.max_chars:
             print(f"文本长度{len(text)}超过MyMemory限制({self.max_chars})，进行分割翻译")
             chunks = self._split_text(text, self.max_chars)
-            translated_chunks = []
-            
-            for i, chunk in enumerate(chunks):
-                print(f"翻译第 {i+1}/{len(chunks)} 段 (长度: {len(chunk)})")
-                try:
-                    translated_chunk = self._translate_chunk(chunk, from_lang, to_lang)
-                    translated_chunks.append(translated_chunk)
-                    time.sleep(0.1)
-                except Exception as e:
-                    print(f"第 {i+1} 段翻译失败: {e}")
-                    translated_chunks.append(chunk)
-            
+            print(f"并发翻译 {len(chunks)} 段 (并发上限: {self.max_concurrency})")
+            translated_chunks = self._translate_chunks(
+                chunks, lambda chunk: self._translate_chunk(chunk, from_lang, to_lang)
+            )
             return " ".join(translated_chunks)
         else:
             return self._translate_chunk(text, from_lang, to_lang)
@@ -1147,7 +1427,7 @@ class DeepLTranslator(BaseTranslator):
         }
         
         try:
-            response = requests.post(self.base_url, headers=headers, json=data, timeout=10)
+            response = self.session.post(self.base_url, headers=headers, json=data, timeout=10)
             response.raise_for_status()
             
             result = response.json()
@@ -1191,7 +1471,7 @@ class DeepLTranslator(BaseTranslator):
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             
-            response = requests.post(url, json=data, headers=headers, timeout=15)
+            response = self.session.post(url, json=data, headers=headers, timeout=15)
             if response.status_code == 200:
                 result = response.json()
                 if 'result' in result and 'translations' in result['result']:
@@ -1399,7 +1679,7 @@ class MicrosoftTranslator(BaseTranslator):
         body = [{'text': text}]
         
         try:
-            response = requests.post(self.base_url, params=params, headers=headers, json=body, timeout=10)
+            response = self.session.post(self.base_url, params=params, headers=headers, json=body, timeout=10)
             response.raise_for_status()
             
             result = response.json()
@@ -0,0 +1,137 @@
+"""
+性能计时（不依赖 Qt，开销很小，可在任意线程中使用）
+
+用法:
+    from perf_monitor import span
+    with span("ocr"):
+        ...
+
+每个阶段保留最近 window 次耗时，用于计算 p50/p95/p99；
+开启跟踪后每次计时都会以一行 JSON 追加写入跟踪文件，便于离线分析延迟分布。
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+DEFAULT_WINDOW = 500
+
+
+def percentile(sorted_values, q):
+    """已排序数据的第 q 百分位（线性插值）"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class PerfMonitor:
+    """按阶段名称统计滚动耗时分位数，可选导出 JSONL 跟踪文件"""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self._samples = {}   # 阶段名称 -> deque(最近的耗时毫秒)
+        self._counts = {}    # 阶段名称 -> 累计次数
+        self._lock = threading.Lock()
+        self._trace_file = None
+        self.trace_path = None
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """计时上下文，退出时记录耗时（出现异常时同样记录，并标记 error）"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            attrs['error'] = True
+            raise
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000, **attrs)
+
+    def record(self, name, elapsed_ms, **attrs):
+        """记录一次耗时（毫秒）"""
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(elapsed_ms)
+            self._counts[name] = self._counts.get(name, 0) + 1
+            if self._trace_file is not None:
+                event = {
+                    'ts': round(time.time(), 6),
+                    'stage': name,
+                    'ms': round(elapsed_ms, 3),
+                    'thread': threading.current_thread().name,
+                }
+                if attrs:
+                    event.update(attrs)
+                try:
+                    self._trace_file.write(json.dumps(event, ensure_ascii=False) + "\n")
+                except (OSError, ValueError) as e:
+                    print(f"写入性能跟踪文件失败: {e}")
+                    self._trace_file = None
+
+    def stats(self, name):
+        """返回单个阶段的统计，没有数据时返回 None"""
+        with self._lock:
+            samples = self._samples.get(name)
+            if not samples:
+                return None
+            values = sorted(samples)
+            last = samples[-1]
+            count = self._counts[name]
+        return {
+            'count': count,
+            'last_ms': last,
+            'mean_ms': sum(values) / len(values),
+            'p50_ms': percentile(values, 50),
+            'p95_ms': percentile(values, 95),
+            'p99_ms': percentile(values, 99),
+        }
+
+    def snapshot(self):
+        """返回所有阶段的统计 {阶段名称: 统计}"""
+        with self._lock:
+            names = list(self._samples)
+        return {name: stats for name in sorted(names) for stats in [self.stats(name)] if stats}
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def start_trace(self, path):
+        """开始将每次计时追加写入 JSONL 跟踪文件"""
+        trace_file = open(path, 'a', encoding='utf-8', buffering=1)
+        with self._lock:
+            if self._trace_file is not None:
+                self._trace_file.close()
+            self._trace_file = trace_file
+            self.trace_path = path
+
+    def stop_trace(self):
+        with self._lock:
+            if self._trace_file is not None:
+                self._trace_file.close()
+            self._trace_file = None
+            self.trace_path = None
+
+    @property
+    def tracing(self):
+        return self._trace_file is not None
+
+
+_perf_monitor = PerfMonitor()
+
+
+def get_perf_monitor():
+    """获取进程内共享的性能计时器"""
+    return _perf_monitor
+
+
+def span(name, **attrs):
+    """在共享计时器上计时一个阶段"""
+    return _perf_monitor.span(name, **attrs)
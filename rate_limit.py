@@ -0,0 +1,50 @@
+"""
+令牌桶限速（不依赖 Qt）
+
+替代在请求之间固定 sleep 的做法：令牌以 rate 个/秒的速度补充，最多积累 capacity 个，
+空闲一段时间后的突发请求可以立即发出，持续请求的平均速率不超过 rate。
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """线程安全的令牌桶，rate 为每秒补充的令牌数，capacity 为桶容量（允许的突发请求数）"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """有足够令牌时立即取走并返回 True，否则返回 False"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1, timeout=None):
+        """等待直到取得令牌，超时返回 False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
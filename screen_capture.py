@@ -0,0 +1,343 @@
+"""
+屏幕截图相关工具（不依赖 Qt，可在任意线程或无界面环境中使用）
+
+- 截图后端: PIL ImageGrab（兼容性最好）和 mss（每个线程复用一个常驻截图实例，
+  以 NumPy 视图访问 mss 返回的截图缓冲区，除 mss 内部的一次复制外不再复制）
+- exclude_window_from_capture: 让翻译框窗口不出现在截图中，截图前无需隐藏翻译框
+- FrameChangeDetector: 监视模式下判断截图区域内容是否发生变化，
+  只在内容变化并稳定后才触发完整的预处理→OCR→翻译流程
+- watch_capture_plan: 监视模式检测时翻译框的处理方式（忽略其所在区域或隐藏后截图）
+
+可直接运行本模块对比各截图后端的性能:
+    python screen_capture.py --bbox 0,0,800,200 --frames 100
+"""
+import argparse
+import ctypes
+import json
+import platform
+import threading
+import time
+
+import cv2
+import numpy as np
+from PIL import Image, ImageGrab
+
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+
+class PILCaptureBackend:
+    """PIL ImageGrab 后端：每次截图都重新建立截图上下文"""
+    name = 'pil'
+    display_name = 'PIL ImageGrab'
+
+    def is_available(self):
+        return True
+
+    def grab(self, bbox):
+        """截取 bbox=(x1, y1, x2, y2) 区域，返回 RGB 的 NumPy 数组"""
+        image = ImageGrab.grab(bbox=bbox, all_screens=True)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return np.asarray(image)
+
+    def grab_gray(self, bbox):
+        """截取区域并返回灰度 NumPy 数组（只做一次颜色转换）"""
+        image = ImageGrab.grab(bbox=bbox, all_screens=True)
+        return np.asarray(image.convert('L'))
+
+    def close(self):
+        pass
+
+
+class MSSCaptureBackend:
+    """
+    mss 后端：每个线程持有一个常驻的 mss 实例（mss 实例不能跨线程使用），
+    截图结果以 mss 返回的 BGRA 字节缓冲区的 NumPy 视图返回，Python 侧不再复制。
+    mss 本身每次截图都会把系统截图缓冲区（Windows BitBlt / Linux XGetImage）复制到新的字节缓冲区，
+    并不是直接映射 XShm 等共享内存的零复制截图。
+    """
+    name = 'mss'
+    display_name = 'mss (常驻截图实例)'
+
+    def __init__(self):
+        self._local = threading.local()
+        self._instances = []
+        self._lock = threading.Lock()
+
+    def is_available(self):
+        return MSS_AVAILABLE
+
+    def _get_grabber(self):
+        grabber = getattr(self._local, 'grabber', None)
+        if grabber is None:
+            grabber = mss.mss()
+            self._local.grabber = grabber
+            with self._lock:
+                self._instances.append(grabber)
+        return grabber
+
+    def grab(self, bbox):
+        """截取 bbox=(x1, y1, x2, y2) 区域，返回 BGRA 缓冲区的 NumPy 视图 (h, w, 4)"""
+        x1, y1, x2, y2 = bbox
+        monitor = {'left': x1, 'top': y1, 'width': x2 - x1, 'height': y2 - y1}
+        shot = self._get_grabber().grab(monitor)
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def grab_gray(self, bbox):
+        """截取区域并直接从 BGRA 缓冲区转换为灰度数组"""
+        return cv2.cvtColor(self.grab(bbox), cv2.COLOR_BGRA2GRAY)
+
+    def close(self):
+        with self._lock:
+            for grabber in self._instances:
+                try:
+                    grabber.close()
+                except Exception as e:
+                    print(f"关闭截图实例失败: {e}")
+            self._instances.clear()
+        self._local = threading.local()
+
+
+# SetWindowDisplayAffinity 参数：窗口在屏幕上正常显示，但不会出现在任何截图中（Windows 10 2004+）
+WDA_NONE = 0x00
+WDA_EXCLUDEFROMCAPTURE = 0x11
+
+
+def exclude_window_from_capture(window_id, exclude=True):
+    """
+    将窗口排除在屏幕截图之外，成功返回 True。
+    目前仅支持 Windows；其他平台或旧版本 Windows 返回 False，调用方需自行隐藏窗口。
+    """
+    if platform.system() != "Windows":
+        return False
+    try:
+        user32 = ctypes.windll.user32
+        affinity = WDA_EXCLUDEFROMCAPTURE if exclude else WDA_NONE
+        return bool(user32.SetWindowDisplayAffinity(ctypes.c_void_p(int(window_id)), affinity))
+    except Exception as e:
+        print(f"设置窗口截图排除失败: {e}")
+        return False
+
+
+CAPTURE_BACKEND_CLASSES = {
+    'mss': MSSCaptureBackend,
+    'pil': PILCaptureBackend,
+}
+
+_capture_backends = {}
+_capture_backend_lock = threading.Lock()
+
+
+def get_available_capture_backends():
+    """返回当前环境可用的截图后端列表 [(name, display_name)]"""
+    return [(name, backend_class.display_name)
+            for name, backend_class in CAPTURE_BACKEND_CLASSES.items()
+            if backend_class().is_available()]
+
+
+def get_default_capture_backend_name():
+    """优先使用 mss，不可用时使用 PIL"""
+    return 'mss' if MSS_AVAILABLE else 'pil'
+
+
+def get_capture_backend(name):
+    """获取常驻的截图后端实例，不可用时回退到 PIL"""
+    backend_class = CAPTURE_BACKEND_CLASSES.get(name, PILCaptureBackend)
+    if not backend_class().is_available():
+        print(f"截图后端 {name} 不可用，回退到 PIL")
+        backend_class = PILCaptureBackend
+    with _capture_backend_lock:
+        backend = _capture_backends.get(backend_class.name)
+        if backend is None:
+            backend = backend_class()
+            _capture_backends[backend_class.name] = backend
+        return backend
+
+
+def shutdown_capture_backends():
+    """关闭所有已创建的截图后端"""
+    with _capture_backend_lock:
+        for backend in _capture_backends.values():
+            backend.close()
+        _capture_backends.clear()
+
+
+def benchmark_capture_backends(bbox, frames=50, warmup=3, gray=True, backends=None):
+    """
+    对比各截图后端的耗时，返回 {后端名: 统计结果}。
+    统计包括平均值、中位数、p95（毫秒）和每秒帧数。
+    """
+    results = {}
+    for name, _ in get_available_capture_backends():
+        if backends and name not in backends:
+            continue
+        backend = get_capture_backend(name)
+        grab = backend.grab_gray if gray else backend.grab
+        try:
+            for _ in range(warmup):
+                grab(bbox)
+            timings = []
+            for _ in range(frames):
+                start = time.perf_counter()
+                grab(bbox)
+                timings.append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            results[name] = {'error': str(e)}
+            continue
+        timings.sort()
+        mean_ms = sum(timings) / len(timings)
+        results[name] = {
+            'frames': frames,
+            'mean_ms': round(mean_ms, 3),
+            'p50_ms': round(timings[len(timings) // 2], 3),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+            'fps': round(1000 / mean_ms, 1) if mean_ms else None,
+        }
+    return results
+
+
+# 翻译框遮住截图区域的比例达到该值时，监视模式不再屏蔽该区域，改为隐藏翻译框后截图检测
+WATCH_MASK_MAX_COVERAGE = 0.5
+
+
+def watch_capture_plan(capture_area, overlay_rect, max_coverage=WATCH_MASK_MAX_COVERAGE):
+    """
+    决定监视模式检测变化时如何处理出现在截图中的翻译框。
+    capture_area 和 overlay_rect 都是屏幕坐标 (x1, y1, x2, y2)，overlay_rect 为 None 表示翻译框不会出现在截图中。
+    返回 (mask, hide_overlay)：
+    - 翻译框与截图区域不相交: (None, False)，直接截图比较；
+    - 只遮住一部分: (截图区域内坐标的矩形, False)，不隐藏翻译框，比较时忽略该矩形；
+    - 遮住的比例达到 max_coverage（例如翻译框与截图区域重合）: (None, True)，
+      屏蔽后已无可比较的内容，隐藏翻译框后截图检测。
+    """
+    if not capture_area or overlay_rect is None:
+        return None, False
+    left, top, right, bottom = capture_area
+    x1, y1 = max(overlay_rect[0], left), max(overlay_rect[1], top)
+    x2, y2 = min(overlay_rect[2], right), min(overlay_rect[3], bottom)
+    if x2 <= x1 or y2 <= y1:
+        return None, False
+    area = max(1, (right - left) * (bottom - top))
+    if (x2 - x1) * (y2 - y1) >= max_coverage * area:
+        return None, True
+    return (x1 - left, y1 - top, x2 - left, y2 - top), False
+
+
+class FrameChangeDetector:
+    """
+    基于缩略图差分的帧变化检测。
+
+    每帧缩小到 thumb_width 宽度的灰度缩略图后与参考帧逐像素比较，
+    亮度差超过 pixel_delta 的像素占比超过 change_ratio 即视为内容变化。
+    变化后需连续 stable_frames 帧与前一帧基本一致（例如字幕逐字出现结束）才触发处理，
+    避免在动画或滚动过程中反复识别。
+    mask 为帧内需要忽略的矩形 (x1, y1, x2, y2)（例如覆盖在区域上的翻译框），比较时两帧的该区域都被排除。
+    """
+    def __init__(self, thumb_width=96, pixel_delta=24, change_ratio=0.004, stable_frames=1):
+        self.thumb_width = thumb_width
+        self.pixel_delta = pixel_delta
+        self.change_ratio = change_ratio
+        self.stable_frames = stable_frames
+        self.reset()
+
+    def reset(self):
+        """清除参考帧，下一帧稳定后会被视为新内容"""
+        self._reference = None   # 上次触发处理时的缩略图
+        self._previous = None    # 上一次检测的缩略图
+        self._stable_count = 0
+
+    def _thumbnail(self, frame):
+        """生成灰度缩略图（PIL 图像或 NumPy 数组均可）"""
+        if isinstance(frame, Image.Image):
+            if frame.mode != 'L':
+                frame = frame.convert('L')
+            width, height = frame.size
+            scale = min(1.0, self.thumb_width / max(width, 1))
+            size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            thumb = np.asarray(frame.resize(size, Image.BILINEAR), dtype=np.int16)
+        else:
+            frame = np.asarray(frame)
+            if frame.ndim == 3:
+                code = cv2.COLOR_BGRA2GRAY if frame.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+                frame = cv2.cvtColor(frame, code)
+            height, width = frame.shape[:2]
+            scale = min(1.0, self.thumb_width / max(width, 1))
+            size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            thumb = cv2.resize(frame, size, interpolation=cv2.INTER_AREA).astype(np.int16)
+        return thumb
+
+    def _thumb_mask(self, frame, thumb, mask):
+        """将帧坐标的忽略矩形换算为缩略图坐标（向外取整），返回切片或 None"""
+        if mask is None:
+            return None
+        if isinstance(frame, Image.Image):
+            width, height = frame.size
+        else:
+            height, width = np.asarray(frame).shape[:2]
+        scale_y = thumb.shape[0] / max(height, 1)
+        scale_x = thumb.shape[1] / max(width, 1)
+        x1, y1, x2, y2 = mask
+        x1, y1 = max(0, int(x1 * scale_x)), max(0, int(y1 * scale_y))
+        x2, y2 = min(thumb.shape[1], int(np.ceil(x2 * scale_x))), min(thumb.shape[0], int(np.ceil(y2 * scale_y)))
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return (slice(y1, y2), slice(x1, x2))
+
+    def _differs(self, a, b, mask=None):
+        if a is None or b is None or a.shape != b.shape:
+            return True
+        diff = np.abs(a - b) > self.pixel_delta
+        if mask is not None:
+            diff[mask] = False
+        changed = np.count_nonzero(diff)
+        return changed > self.change_ratio * a.size
+
+    def update(self, frame, mask=None):
+        """输入新的一帧，返回是否需要对该帧执行完整的识别翻译流程"""
+        thumb = self._thumbnail(frame)
+        thumb_mask = self._thumb_mask(frame, thumb, mask)
+        previous, self._previous = self._previous, thumb
+
+        if not self._differs(thumb, self._reference, thumb_mask):
+            self._stable_count = 0
+            return False
+
+        # 内容与参考帧不同，等待画面稳定
+        if self._differs(thumb, previous, thumb_mask):
+            self._stable_count = 0
+        else:
+            self._stable_count += 1
+
+        if self._stable_count >= self.stable_frames:
+            self._reference = thumb
+            self._stable_count = 0
+            return True
+        return False
+
+    def invalidate(self):
+        """放弃当前参考帧（例如本次变化因翻译进行中未被处理），保留上一帧用于稳定判断"""
+        self._reference = None
+        self._stable_count = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="截图后端性能对比")
+    parser.add_argument('--bbox', default='0,0,800,200', help="截图区域 x1,y1,x2,y2")
+    parser.add_argument('--frames', type=int, default=50, help="每个后端截图次数")
+    parser.add_argument('--color', action='store_true', help="测试彩色截图（默认测试灰度）")
+    parser.add_argument('--backend', action='append', help="只测试指定后端，可重复")
+    args = parser.parse_args()
+
+    bbox = tuple(int(v) for v in args.bbox.split(','))
+    results = benchmark_capture_backends(bbox, frames=args.frames, gray=not args.color,
+                                         backends=args.backend)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    shutdown_capture_backends()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+"""
+Skylark 命令行批量识别翻译（无界面，不导入 Qt）
+
+对图片文件、目录或通配符匹配到的截图执行与主窗口相同的预处理→OCR→翻译流程，
+使用按 CPU 核数创建的进程池并行处理，每张图片完成后立即以一行 JSON 输出结果。
+
+示例:
+    python skylark_cli.py screenshots/ --source en --target zh > results.jsonl
+    python skylark_cli.py "archive/**/*.png" --translate argos --workers 4 --output results.jsonl
+    python skylark_cli.py page1.png page2.png --translate none
+"""
+import argparse
+import atexit
+import contextlib
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+
+# 每个工作进程中常驻的识别流程和翻译器，由 _init_worker 创建
+_worker = None
+
+
+def expand_inputs(inputs, recursive=False):
+    """将文件、目录和通配符展开为去重后的图片路径列表（保持输入顺序）"""
+    paths = []
+    seen = set()
+
+    def add(path):
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in seen and path.lower().endswith(IMAGE_EXTENSIONS):
+            seen.add(key)
+            paths.append(path)
+
+    for item in inputs:
+        if os.path.isdir(item):
+            if recursive:
+                for root, dirs, files in os.walk(item):
+                    dirs.sort()
+                    for name in sorted(files):
+                        add(os.path.join(root, name))
+            else:
+                for name in sorted(os.listdir(item)):
+                    path = os.path.join(item, name)
+                    if os.path.isfile(path):
+                        add(path)
+        elif os.path.isfile(item):
+            add(item)
+        else:
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path):
+                    add(path)
+    return paths
+
+
+def load_image(path):
+    """读取图片为灰度 NumPy 数组（支持非 ASCII 路径），无法解码时返回 None"""
+    import cv2
+    import numpy as np
+    data = np.fromfile(path, dtype=np.uint8)
+    if data.size == 0:
+        return None
+    return cv2.imdecode(data, cv2.IMREAD_GRAYSCALE)
+
+
+class BatchWorker:
+    """单个进程内的识别翻译流程"""
+
+    def __init__(self, options):
+        from languages import OCR_LANG_MAP
+        from ocr_engine import MultiPassRecognizer, get_tessdata_registry
+        from ocr_pipeline import OCRPipeline
+
+        self.options = options
+        # 进程池已经占满所有核心，每个进程内的多配置识别串行执行，避免线程过度争用
+        self.pipeline = OCRPipeline(backend_name=options['backend'] or None,
+                                    recognizer=MultiPassRecognizer(max_workers=1))
+        self.pipeline.text_region_detection = options['regions']
+        self.pipeline.preprocessor.auto_scale = options['auto_scale']
+
+        ocr_lang = OCR_LANG_MAP.get(options['source'], 'eng')
+        if not get_tessdata_registry().has_language(ocr_lang):
+            print(f"OCR语言包 {ocr_lang} 未安装，使用英语OCR作为后备")
+            ocr_lang = 'eng'
+        self.ocr_lang = ocr_lang
+
+        self.cache = None
+        if options['cache']:
+            from translation_cache import TranslationCache
+            self.cache = TranslationCache(options['cache'])
+
+        self.translate_func = None
+        self.translator_error = None
+        if options['translate'] == 'argos':
+            from offline_translator import Translator, InferenceSettings
+            settings = InferenceSettings.load(options['argos_settings']) if options['argos_settings'] else None
+            translator = Translator(None, cache=self.cache, settings=settings)
+            if translator.initialize(warm_pairs=[(options['source'], options['target'])]):
+                self.translate_func = translator.translate
+            else:
+                self.translator_error = "Argos 翻译引擎初始化失败"
+        elif options['translate'] == 'online':
+            from online_translator import OnlineTranslator
+            translator = OnlineTranslator(cache=self.cache)
+            if options['engine']:
+                translator.set_translator(options['engine'])
+            # 各进程的令牌桶互不相通，平分每个引擎的并发和速率上限，总请求速率不超过单进程时的限制
+            translator.share_rate_limit(options['workers'])
+            self.translate_func = translator.translate
+
+    def process(self, path):
+        result = {'path': path}
+        start = time.perf_counter()
+        try:
+            image = load_image(path)
+            if image is None:
+                result['error'] = "无法读取图片"
+                return result
+            text = self.pipeline.run(image, self.ocr_lang)
+            timings = dict(self.pipeline.last_timings)
+            result.update({
+                'text': text,
+                'confidence': round(self.pipeline.last_confidence, 2),
+                'mode': self.pipeline.last_mode,
+                'scale': self.pipeline.preprocessor.last_scale,
+            })
+
+            if text and self.options['translate'] != 'none':
+                if self.translate_func is None:
+                    result['error'] = self.translator_error
+                else:
+                    translate_start = time.perf_counter()
+                    result['translation'] = self.translate_func(
+                        text, self.options['source'], self.options['target']
+                    )
+                    timings['translate'] = (time.perf_counter() - translate_start) * 1000
+            result['timings_ms'] = {name: round(ms, 2) for name, ms in timings.items()}
+        except Exception as e:
+            result['error'] = str(e)
+        result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    def close(self):
+        from ocr_engine import shutdown_ocr_backends
+        self.pipeline.close()
+        shutdown_ocr_backends()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def _init_worker(options):
+    """进程池初始化：每个进程只加载一次OCR引擎和翻译模型"""
+    global _worker
+    # 标准输出只用于结果，识别和翻译日志输出到标准错误
+    sys.stdout = sys.stderr
+    # Tesseract 内部的 OpenMP 并行与进程池叠加会导致核心争用
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+    try:
+        import cv2
+        cv2.setNumThreads(1)
+    except ImportError:
+        pass
+    _worker = BatchWorker(options)
+    atexit.register(_worker.close)
+
+
+def _process_path(path):
+    return _worker.process(path)
+
+
+def run_batch(paths, options, workers, write):
+    """
+    并行处理所有图片，每完成一张调用 write(result)，返回 (成功数, 失败数)。
+    工作进程初始化失败或异常退出时进程池不再可用，未完成的图片都记为失败。
+    """
+    succeeded = failed = 0
+    # 限制同时提交的任务数，图片很多时不会一次性占用大量内存
+    max_pending = workers * 4
+    remaining = iter(paths)
+    broken = None  # 进程池损坏的原因
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(options,)) as executor:
+        pending = {}
+        while True:
+            if broken is None:
+                for path in remaining:
+                    try:
+                        pending[executor.submit(_process_path, path)] = path
+                    except BrokenProcessPool as e:
+                        broken = e
+                        write({'path': path, 'error': f"进程池已损坏: {e}"})
+                        failed += 1
+                        break
+                    if len(pending) >= max_pending:
+                        break
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    broken = e
+                    result = {'path': path, 'error': f"进程池已损坏: {e}"}
+                if 'error' in result:
+                    failed += 1
+                else:
+                    succeeded += 1
+                write(result)
+
+    if broken is not None:
+        print(f"工作进程初始化失败或异常退出，剩余图片未处理: {broken}", file=sys.stderr)
+        for path in remaining:
+            write({'path': path, 'error': "进程池已损坏，未处理"})
+            failed += 1
+    return succeeded, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Skylark 命令行批量识别翻译，结果以 JSON Lines 输出")
+    parser.add_argument('inputs', nargs='+', help="图片文件、目录或通配符（如 \"shots/**/*.png\"）")
+    parser.add_argument('--recursive', '-r', action='store_true', help="递归处理目录")
+    parser.add_argument('--source', default='en', help="源语言代码（决定OCR语言包）")
+    parser.add_argument('--target', default='zh', help="目标语言代码")
+    parser.add_argument('--translate', choices=['none', 'argos', 'online'], default='argos',
+                        help="翻译方式（none 只做OCR）")
+    parser.add_argument('--engine', default='', help="在线翻译引擎")
+    parser.add_argument('--backend', default='', help="OCR后端（默认优先使用常驻引擎）")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="进程数（默认 CPU 核数）")
+    parser.add_argument('--no-regions', dest='regions', action='store_false', help="关闭稀疏文字分块识别")
+    parser.add_argument('--no-autoscale', dest='auto_scale', action='store_false', help="关闭按字高自动缩放")
+    parser.add_argument('--cache', default='', help="翻译缓存 SQLite 文件（多个进程共用）")
+    parser.add_argument('--argos-settings', default='', help="离线推理设置 JSON 文件（与主程序的 argos_settings.json 格式相同）")
+    parser.add_argument('--output', '-o', default='', help="JSONL 结果文件（默认输出到标准输出）")
+    args = parser.parse_args()
+
+    paths = expand_inputs(args.inputs, recursive=args.recursive)
+    if not paths:
+        print("没有找到图片文件", file=sys.stderr)
+        return 1
+
+    options = {
+        'source': args.source, 'target': args.target, 'translate': args.translate,
+        'engine': args.engine, 'backend': args.backend, 'regions': args.regions,
+        'auto_scale': args.auto_scale, 'cache': args.cache, 'argos_settings': args.argos_settings,
+    }
+    workers = max(1, min(args.workers, len(paths)))
+    options['workers'] = workers
+    print(f"共 {len(paths)} 张图片，使用 {workers} 个进程", file=sys.stderr)
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+
+    def write(result):
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        output.flush()
+
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            succeeded, failed = run_batch(paths, options, workers, write)
+    except KeyboardInterrupt:
+        print("已中断", file=sys.stderr)
+        return 130
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"完成: 成功 {succeeded} 张, 失败 {failed} 张, 耗时 {elapsed:.1f}s "
+          f"({len(paths) / elapsed:.2f} 张/秒)", file=sys.stderr)
+    return 0 if not failed else 2
+
+
+if __name__ == '__main__':
+    # 打包为可执行文件后，进程池的子进程需要 freeze_support 才能正常启动
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
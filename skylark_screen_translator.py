@@ -5,21 +5,36 @@ import time
 import re
 import queue
 import threading
-import pytesseract
-from PIL import ImageGrab, Image, ImageEnhance
-import numpy as np
+from PIL import ImageEnhance
 import subprocess
 import platform
 import shutil
 import requests
 import json
 import math
-import cv2
 import socket
 from datetime import datetime
 from threading import Lock
 from pathlib import Path
 from online_translator import OnlineTranslator
+from offline_translator import (
+    Translator, InferenceSettings, COMPUTE_TYPES, DEVICES, parse_cpu_cores, format_cpu_cores
+)
+from languages import SUPPORTED_LANGUAGES, OCR_LANG_MAP
+from screen_capture import (
+    FrameChangeDetector, get_capture_backend, get_available_capture_backends,
+    get_default_capture_backend_name, shutdown_capture_backends, exclude_window_from_capture,
+    watch_capture_plan
+)
+from translation_cache import TranslationCache
+from ocr_pipeline import OCRPipeline
+from incremental_ocr import join_wrapped_lines
+from perf_monitor import get_perf_monitor, span
+from http_transport import shutdown_transport
+from ocr_engine import (
+    OCR_PASS_CONFIGS, get_available_ocr_backends, shutdown_ocr_backends, get_tessdata_registry,
+    parse_ocr_pass_configs, format_ocr_pass_configs
+)
 
 
 
@@ -804,9 +819,10 @@ from PyQt5.QtWidgets import (
     QComboBox, QHBoxLayout, QVBoxLayout, QGroupBox, QSizePolicy, QMessageBox, QDialog,
     QLineEdit, QListWidget, QListWidgetItem, QTabWidget, QFileDialog,
     QDialogButtonBox, QProgressBar, QTableWidget, QTableWidgetItem, QHeaderView,
-    QAbstractItemView, QTreeWidget, QTreeWidgetItem, QRadioButton, QMenu, QDesktopWidget, QProgressDialog
+    QAbstractItemView, QTreeWidget, QTreeWidgetItem, QRadioButton, QMenu, QDesktopWidget, QProgressDialog,
+    QSpinBox, QCheckBox
 )
-from PyQt5.QtCore import Qt, QRect, QTimer, QPoint, QEvent, QThread, pyqtSignal, QLibraryInfo, QSize, QMetaType, QObject
+from PyQt5.QtCore import Qt, QRect, QTimer, QPoint, QEvent, QThread, pyqtSignal, pyqtSlot, QLibraryInfo, QSize, QMetaType, QObject
 from PyQt5.QtGui import (
     QPainter, QColor, QPen, QBrush, QFont, QFontMetrics, QKeyEvent, 
     QMouseEvent, QImage, QPixmap, QIcon, QTextCursor
@@ -859,76 +875,6 @@ except ImportError:
 SOURCE_LANG = "en"
 TARGET_LANG = "zh"
 
-# 支持的语言列表
-SUPPORTED_LANGUAGES = [
-    ("ar", "Arabic"),
-    ("az", "Azerbaijani"),
-    ("ca", "Catalan"),
-    ("zh", "Chinese"),
-    ("cs", "Czech"),
-    ("da", "Danish"),
-    ("nl", "Dutch"),
-    ("en", "English"),
-    ("eo", "Esperanto"),
-    ("fi", "Finnish"),
-    ("fr", "French"),
-    ("de", "German"),
-    ("el", "Greek"),
-    ("he", "Hebrew"),
-    ("hi", "Hindi"),
-    ("hu", "Hungarian"),
-    ("id", "Indonesian"),
-    ("ga", "Irish"),
-    ("it", "Italian"),
-    ("ja", "Japanese"),
-    ("ko", "Korean"),
-    ("ms", "Malay"),
-    ("fa", "Persian"),
-    ("pl", "Polish"),
-    ("pt", "Portuguese"),
-    ("ru", "Russian"),
-    ("sk", "Slovak"),
-    ("es", "Spanish"),
-    ("sv", "Swedish"),
-    ("tr", "Turkish"),
-    ("uk", "Ukrainian")
-]
-
-# OCR语言映射
-OCR_LANG_MAP = {
-    "ar": "ara",
-    "az": "aze",
-    "ca": "cat",
-    "zh": "chi_sim",
-    "cs": "ces",
-    "da": "dan",
-    "nl": "nld",
-    "en": "eng",
-    "eo": "epo",
-    "fi": "fin",
-    "fr": "fra",
-    "de": "deu",
-    "el": "ell",
-    "he": "heb",
-    "hi": "hin",
-    "hu": "hun",
-    "id": "ind",
-    "ga": "gle",
-    "it": "ita",
-    "ja": "jpn",
-    "ko": "kor",
-    "ms": "msa",
-    "fa": "fas",
-    "pl": "pol",
-    "pt": "por",
-    "ru": "rus",
-    "sk": "slk",
-    "es": "spa",
-    "sv": "swe",
-    "tr": "tur",
-    "uk": "ukr"
-}
-
 # 包大小信息（如果无法从网络获取，使用这些估计值）
 PACKAGE_SIZE_ESTIMATES = {
     "ar": 150, "az": 120, "ca": 130, "zh": 300, "cs": 140,
@@ -1262,159 +1208,6 @@ class SystemDetector:
         
         return commands.get(pkg_manager)
 
-class Translator:
-    """
-    封装翻译功能，支持直接翻译和自动中转翻译。
-    """
-    def __init__(self, status_queue):
-        self.status_queue = status_queue
-        # 您可以在这里设置默认的源语言和目标语言
-        # self.from_code = SOURCE_LANG 
-        # self.to_code = TARGET_LANG
-        self.ready = False
-        self.lang_map = {}  # 用于快速查找已安装的语言对象
-        self.diagnostic_log = [] # 用于存储诊断日志
-        self.available_languages = [] # <--- 新增：恢复此属性以兼容UI
-
-    def log(self, message):
-        """记录日志到队列和控制台"""
-        self.diagnostic_log.append(message)
-        if self.status_queue:
-            self.status_queue.put(message)
-        print(f"[Translator] {message}")
-
-    def initialize(self):
-        """
-        初始化翻译引擎，加载语言模型并构建速查表。
-        """
-        self.log("开始初始化翻译引擎...")
-        try:
-            from argostranslate import package, translate
-            
-            # 确保使用正确的包目录
-            if 'ARGOS_PACKAGES_DIR' in os.environ:
-                custom_dir = os.environ['ARGOS_PACKAGES_DIR']
-                self.log(f"使用自定义包目录: {custom_dir}")
-                
-                # 尝试设置包目录（如果库提供了相应的API）
-                try:
-                    # 尝试设置包目录（如果库提供了相应的API）
-                    if hasattr(package, 'set_packages_dir'):
-                        package.set_packages_dir(custom_dir)
-                        self.log(f"已设置包目录: {custom_dir}")
-                except Exception as e:
-                    self.log(f"设置包目录失败: {e}")
-            
-            package.update_package_index()
-            installed_languages = translate.get_installed_languages()
-            
-            if not installed_languages:
-                self.log("警告: 未找到任何已安装的 argostranslate 语言包。")
-                self.log("请先安装argostranslate 以及语言包")
-                self.ready = False  # 明确设置为未就绪
-                return False  # 返回 False 表示初始化失败
-    
-            # 构建语言代码到语言对象的映射，方便内部快速查找
-            self.lang_map = {lang.code: lang for lang in installed_languages}
-            
-            # 填充 available_languages 列表
-            self.available_languages = []
-            for lang in installed_languages:
-                self.available_languages.append((lang.code, lang.name))
-            # 对列表进行排序，让UI显示更友好
-            self.available_languages.sort(key=lambda x: x[1]) 
-    
-            installed_codes = list(self.lang_map.keys())
-            self.log(f"已成功加载的语言包: {', '.join(installed_codes)}")
-            
-            self.ready = True
-            self.log("翻译引擎初始化完成，随时可用。")
-            return True  # 返回 True 表示初始化成功
-    
-        except Exception as e:
-            self.log(f"翻译引擎初始化失败: {str(e)}")
-            self.log(traceback.format_exc())
-            self.ready = False
-            return False  # 返回 False 表示初始化失败
-
-    def _get_direct_translation(self, text, from_code, to_code):
-        """
-        【内部方法】尝试进行直接翻译。
-        返回 (翻译结果, 错误信息)
-        """
-        from_lang = self.lang_map.get(from_code)
-        to_lang = self.lang_map.get(to_code)
-
-        if not from_lang:
-            return None, f"未安装源语言包: {from_code}"
-        if not to_lang:
-            return None, f"未安装目标语言包: {to_code}"
-        
-        translation = from_lang.get_translation(to_lang)
-        
-        if not translation:
-            return None, f"没有可用的直接翻译路径: {from_code} -> {to_code}"
-            
-        try:
-            result = translation.translate(text)
-            self.log(f"直接翻译成功: {from_code} -> {to_code}")
-            return result, None
-        except Exception as e:
-            return None, f"翻译执行时发生错误: {str(e)}"
-
-    def _get_pivot_translation(self, text, from_code, to_code, pivot_code='en'):
-        """
-        【内部方法】通过中转语言进行翻译。
-        返回 (翻译结果, 错误信息)
-        """
-        self.log(f"尝试中转翻译: {from_code} -> {pivot_code} -> {to_code}")
-
-        if pivot_code not in self.lang_map:
-            return None, f"中转失败：未安装中转语言包: {pivot_code}"
-
-        self.log(f"中转第一步: {from_code} -> {pivot_code}")
-        step1_result, error = self._get_direct_translation(text, from_code, pivot_code)
-        if error:
-            return None, f"中转第一步失败: {error}"
-            
-        self.log(f"中转第二步: {pivot_code} -> {to_code}")
-        step2_result, error = self._get_direct_translation(step1_result, pivot_code, to_code)
-        if error:
-            return None, f"中转第二步失败: {error}"
-        
-        self.log("中转翻译成功！")
-        return step2_result, None
-
-    def translate(self, text, from_code, to_code):
-        """
-        智能翻译文本。优先尝试直接翻译，失败后自动尝试中转翻译。
-        """
-        if not self.ready:
-            error_msg = "翻译引擎未就绪，请先调用 initialize()"
-            self.log(error_msg)
-            return error_msg
-        
-        if not text or not text.strip():
-            return ""
-
-        self.log(f"开始翻译任务: 从 {from_code} 到 {to_code}")
-
-        result, error = self._get_direct_translation(text, from_code, to_code)
-        if result is not None:
-            return result
-        
-        self.log(f"直接翻译失败: {error}")
-
-        if from_code != 'en' and to_code != 'en':
-            result, error = self._get_pivot_translation(text, from_code, to_code, pivot_code='en')
-            if result is not None:
-                return result
-        
-        final_error_msg = f"翻译彻底失败: {from_code} -> {to_code}. 原因: {error}"
-        self.log(final_error_msg)
-        return final_error_msg
-
-
 class PackageManager:
     """
     管理Argos Translate语言包的安装、卸载和存储，兼容Windows、Linux、macOS和AppImage环境。
@@ -2289,7 +2082,7 @@ class PackageInfoDialog(QDialog):
     def get_ocr_status(self, lang_code):
         """获取OCR语言包安装状态"""
         try:
-            langs = pytesseract.get_languages()
+            langs = get_tessdata_registry().languages()
             ocr_code = OCR_LANG_MAP.get(lang_code, "")
             if ocr_code and ocr_code in langs:
                 return "已安装"
@@ -2508,7 +2301,7 @@ class LanguagePackDialog(QDialog):
                             self.main_window.status_queue.put(f"设置包目录失败: {e}")
                     
                     # 重新初始化翻译器
-                    success = self.main_window.translator.initialize()
+                    success = self.main_window.translator.initialize(warm_pairs=[(SOURCE_LANG, TARGET_LANG)])
                     self.main_window.translator.ready = success
                     self.main_window.translation_ready = success
                     
@@ -2956,7 +2749,7 @@ class OCRLanguageTab(QWidget):
         btn_layout.addWidget(self.remove_btn)
         
         self.refresh_btn = QPushButton("刷新列表")
-        self.refresh_btn.clicked.connect(self.populate_lang_list)
+        self.refresh_btn.clicked.connect(self.refresh_lang_list)
         btn_layout.addWidget(self.refresh_btn)
         
         layout.addLayout(btn_layout)
@@ -2970,23 +2763,11 @@ class OCRLanguageTab(QWidget):
         tessdata_dir = self.get_tessdata_dir()
         
         try:
-            import pytesseract
-            # 获取系统安装的语言包
-            installed_langs = pytesseract.get_languages()
-            self.main_window.status_queue.put(f"已检测到系统安装的语言包: {installed_langs}")
-            
-            # 检查自定义目录中的语言包
-            custom_langs = []
-            if os.path.exists(tessdata_dir):
-                for file in os.listdir(tessdata_dir):
-                    if file.endswith('.traineddata'):
-                        lang_code = file.replace('.traineddata', '')
-                        custom_langs.append(lang_code)
-                self.main_window.status_queue.put(f"已检测到自定义目录的语言包: {custom_langs}")
-            
-            # 合并两个列表
-            all_installed_langs = list(set(installed_langs + custom_langs))
-            self.main_window.status_queue.put(f"所有可用的语言包: {all_installed_langs}")
+            # 系统安装的语言包和自定义目录中的语言包都由共享登记表统一收集
+            registry = get_tessdata_registry()
+            registry.add_directory(tessdata_dir)
+            all_installed_langs = registry.languages()
+            self.main_window.status_queue.put(f"所有可用的语言包: {sorted(all_installed_langs)}")
             
         except Exception as e:
             all_installed_langs = []
@@ -3014,6 +2795,11 @@ class OCRLanguageTab(QWidget):
             
             item.setData(0, Qt.UserRole, ocr_code)
     
+    def refresh_lang_list(self):
+        """强制重新扫描已安装的语言包并刷新列表"""
+        get_tessdata_registry().invalidate()
+        self.populate_lang_list()
+    
     def get_package_manager(self):
         """动态检测包管理器 - 增强版，支持所有主要Linux发行版"""
         system = platform.system()
@@ -3235,6 +3021,7 @@ class OCRLanguageTab(QWidget):
             pass
         
         self.progress_dialog.close()
+        get_tessdata_registry().invalidate()
         
         if success:
             self.main_window.status_queue.put(message)
@@ -3339,6 +3126,7 @@ class OCRLanguageTab(QWidget):
             QMessageBox.warning(self, "删除失败", error_msg)
         
         # 刷新语言包列表
+        get_tessdata_registry().invalidate()
         self.populate_lang_list()
     
     def _remove_with_sudo(self, file_path, ocr_code):
@@ -4245,7 +4033,7 @@ class TranslatorOverlay(QWidget):
         if self.max_scroll_offset > 0:
             self.draw_scroll_indicator(painter)
     
-    def paintEvent(self, event):
+    def _paint_overlay(self):
         """绘制覆盖层内容"""
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
@@ -4300,6 +4088,11 @@ class TranslatorOverlay(QWidget):
         if self.max_scroll_offset > 0:
             self.draw_scroll_indicator(painter, adjusted_text_rect)
 
+    def paintEvent(self, event):
+        """绘制覆盖层内容，并记录绘制耗时"""
+        with span("overlay_paint"):
+            self._paint_overlay()
+
     def draw_scroll_indicator(self, painter, text_rect):
         """绘制滚动指示器"""
         # 计算滚动条位置和大小
@@ -4393,12 +4186,92 @@ class TranslatorOverlay(QWidget):
         self.prepare_text_display()
         self.update()
 
+class TranslationPipelineWorker(QObject):
+    """截图→预处理→OCR 流水线工作对象，常驻在独立的 QThread 中运行，避免阻塞GUI线程"""
+    finished = pyqtSignal(str)       # OCR识别结果（未识别到文本时为空字符串）
+    failed = pyqtSignal(str, str)    # 状态栏文本, 翻译框文本
+    frame_changed = pyqtSignal(object)  # 监视模式下检测到区域内容变化，携带该帧截图
+
+    def __init__(self, main_window):
+        super().__init__()
+        self.main_window = main_window
+
+    @pyqtSlot()
+    def run(self):
+        """执行一次完整的截图→预处理→OCR流程，各阶段进度通过 update_ui_signal 回报"""
+        main_window = self.main_window
+        try:
+            main_window.update_ui_signal.emit("正在截图...", "正在截图...")
+            image = main_window.capture_screen_region()
+            if image is None:
+                self.failed.emit("截图失败，请重新选择区域", "截图失败")
+                return
+        except Exception as e:
+            import traceback
+            error_msg = f"截图/OCR流程出错: {e}"
+            print(f"{error_msg}\n{traceback.format_exc()}")
+            self.failed.emit(error_msg, f"错误: {e}")
+            return
+        self.process_frame(image)
+
+    @pyqtSlot()
+    def check_frame(self):
+        """监视模式：截取一帧并检测内容变化，未变化时不做任何后续处理"""
+        main_window = self.main_window
+        try:
+            # 翻译框只遮住一部分区域时检测不隐藏翻译框（避免按检测频率闪烁），该区域不参与比较；
+            # 遮住大部分区域时屏蔽后已无内容可比较，按原方式隐藏翻译框后截图
+            mask = main_window.watch_overlay_mask
+            image = main_window.capture_screen_region(hide_overlay=main_window.watch_hide_overlay)
+            if image is not None and main_window.frame_change_detector.update(image, mask=mask):
+                if mask is not None:
+                    # 该帧包含翻译框，识别前隐藏翻译框重新截图
+                    image = main_window.capture_screen_region()
+                if image is not None:
+                    self.frame_changed.emit(image)
+        except Exception as e:
+            print(f"监视模式检测失败: {e}")
+        finally:
+            main_window.watch_check_pending = False
+
+    @pyqtSlot(object)
+    def process_frame(self, image):
+        """对已截取的图像执行预处理→OCR流程"""
+        main_window = self.main_window
+        stage_messages = {
+            'preprocess': ("正在预处理图像...", "正在预处理..."),
+            'ocr': ("正在识别文字...", "正在识别文字..."),
+            'preprocess_retry': ("识别置信度较低，正在强力去噪后重新识别...", "正在重新识别..."),
+        }
+
+        def report_stage(stage):
+            if stage in stage_messages:
+                main_window.update_ui_signal.emit(*stage_messages[stage])
+
+        try:
+            ocr_lang = main_window.resolve_ocr_language()
+            text = main_window.ocr_pipeline.run(image, ocr_lang, on_stage=report_stage)
+            self.finished.emit(text)
+        except Exception as e:
+            import traceback
+            error_msg = f"截图/OCR流程出错: {e}"
+            print(f"{error_msg}\n{traceback.format_exc()}")
+            self.failed.emit(error_msg, f"错误: {e}")
+
 class ScreenTranslator(QMainWindow):
     # 定义线程安全的UI更新信号
     update_ui_signal = QtCore.pyqtSignal(str, str)
     # 新增信号用于安全更新文本编辑框
     update_text_edit_signal = QtCore.pyqtSignal(str)
-    
+    # 流水线线程相关信号
+    pipeline_requested = QtCore.pyqtSignal()
+    frame_pipeline_requested = QtCore.pyqtSignal(object)  # 对已截取的帧执行预处理/OCR
+    watch_check_requested = QtCore.pyqtSignal()           # 监视模式检测一帧
+    status_signal = QtCore.pyqtSignal(str)
+    overlay_capture_signal = QtCore.pyqtSignal(bool)  # 阻塞连接，截图前后切换翻译框透明度
+    ocr_install_signal = QtCore.pyqtSignal(str)       # 阻塞连接，在GUI线程中安装OCR语言包
+    argos_benchmark_signal = QtCore.pyqtSignal(object)  # 离线推理设置基准测试结果（列表或错误信息）
+
     def __init__(self):
         super().__init__()
         
@@ -4414,6 +4287,7 @@ class ScreenTranslator(QMainWindow):
         if platform.system() == "Windows":
             # 使用用户AppData目录
             appdata_dir = Path(os.environ.get('APPDATA', Path.home()))
+            self.app_data_dir = appdata_dir / "SkylarkTranslator"
             
             # 设置 Argos Translate 包目录
             argos_package_dir = appdata_dir / "SkylarkTranslator" / "argos_packages"
@@ -4426,6 +4300,7 @@ class ScreenTranslator(QMainWindow):
             os.environ['TESSDATA_PREFIX'] = str(tessdata_dir)
         else:
             # 非Windows系统保持原有逻辑
+            self.app_data_dir = app_dir
             # 设置 Argos Translate 包目录
             argos_package_dir = app_dir / "argos_packages"
             setup_custom_package_dir(argos_package_dir)
@@ -4442,6 +4317,9 @@ class ScreenTranslator(QMainWindow):
         self.capture_area = None
         self.translator_overlay = None
         self.translation_in_progress = False
+        self.offline_initializing = False   # 后台正在加载离线模型（持有翻译锁）
+        self.translation_started_at = None  # 本次翻译开始时间，用于统计端到端耗时
+        self.perf_monitor = get_perf_monitor()
         self.translation_ready = False
         
         # 添加全局鼠标监听相关属性
@@ -4450,11 +4328,31 @@ class ScreenTranslator(QMainWindow):
         
         self.status_queue = queue.Queue()
         
+        # 翻译结果缓存（内存 + 应用数据目录下的 SQLite），在线和离线翻译共用
+        self.translation_cache = TranslationCache(self.app_data_dir / "translation_cache.sqlite3")
+        
         # 🆕 修改翻译器初始化
-        self.translator = Translator(self.status_queue) if ARGOS_TRANSLATE_AVAILABLE else None
-        self.online_translator = OnlineTranslator()  # 添加在线翻译器
+        # 离线翻译推理设置（线程数、计算精度、CPU绑定）保存在应用数据目录
+        self.argos_settings_path = self.app_data_dir / "argos_settings.json"
+        self.translator = Translator(
+            self.status_queue, cache=self.translation_cache,
+            settings=InferenceSettings.load(self.argos_settings_path)
+        ) if ARGOS_TRANSLATE_AVAILABLE else None
+        self.online_translator = OnlineTranslator(cache=self.translation_cache)  # 添加在线翻译器
         self.use_online_translation = True  # 默认使用在线翻译
         self.translation_ready = False  # 初始化为 False，需通过 initialize_offline_translator 设置
+        # 预处理→OCR流程（默认优先使用常驻OCR引擎），识别设置都保存在其中
+        self.ocr_pipeline = OCRPipeline()
+        self.capture_backend_name = get_default_capture_backend_name()  # 默认优先使用 mss
+        self.capture_settle_delay = 0.05  # 无法将翻译框排除在截图外时，切换透明度后的等待时间（秒）
+        
+        # 监视模式：按设定频率检测截图区域，内容变化时自动翻译
+        self.watch_mode_enabled = False
+        self.watch_fps = 2
+        self.watch_check_pending = False  # 流水线线程尚未处理完上一次检测
+        self.watch_overlay_mask = None    # 监视模式检测时需要忽略的翻译框区域（截图区域内坐标）
+        self.watch_hide_overlay = False   # 翻译框遮住大部分截图区域时，检测前隐藏翻译框
+        self.frame_change_detector = FrameChangeDetector()
 
 
         # 启动离线翻译器初始化（如果默认在线，可在切换时初始化）
@@ -4484,8 +4382,74 @@ class ScreenTranslator(QMainWindow):
         self.last_right_click_time = 0
         self.click_delay = 0.3  # 300毫秒的点击延迟
 
+        self.init_pipeline_worker()
         self.init_plugin_system()
 
+    def init_pipeline_worker(self):
+        """创建常驻的截图/OCR流水线线程"""
+        self._overlay_saved_opacity = None
+        self._ocr_install_result = None
+
+        self.pipeline_thread = QThread(self)
+        self.pipeline_worker = TranslationPipelineWorker(self)
+        self.pipeline_worker.moveToThread(self.pipeline_thread)
+
+        self.pipeline_requested.connect(self.pipeline_worker.run)
+        self.frame_pipeline_requested.connect(self.pipeline_worker.process_frame)
+        self.watch_check_requested.connect(self.pipeline_worker.check_frame)
+        self.pipeline_worker.finished.connect(self.on_pipeline_finished)
+        self.pipeline_worker.failed.connect(self.on_pipeline_failed)
+        self.pipeline_worker.frame_changed.connect(self.on_watch_frame_changed)
+
+        self.status_signal.connect(self.update_status)
+        # 流水线线程需要等待GUI线程完成这些操作后才能继续
+        self.overlay_capture_signal.connect(self._set_overlay_capture_mode, Qt.BlockingQueuedConnection)
+        self.ocr_install_signal.connect(self._install_ocr_language_blocking, Qt.BlockingQueuedConnection)
+
+        self.pipeline_thread.start()
+
+    def is_gui_thread(self):
+        """当前是否运行在GUI线程中"""
+        return QThread.currentThread() == self.thread()
+
+    @pyqtSlot(bool)
+    def _set_overlay_capture_mode(self, capturing):
+        """截图期间将翻译框设为完全透明，截图结束后恢复（在GUI线程中执行）"""
+        if not self.translator_overlay:
+            return
+        if capturing:
+            # 保存当前透明度并设置为完全透明
+            self._overlay_saved_opacity = self.translator_overlay.windowOpacity()
+            self.translator_overlay.setWindowOpacity(0.0)
+            # 强制立即重绘
+            self.translator_overlay.repaint()
+            QApplication.processEvents()
+        else:
+            opacity = self._overlay_saved_opacity if self._overlay_saved_opacity is not None else 0.8
+            self.translator_overlay.setWindowOpacity(opacity)
+            self.translator_overlay.repaint()
+            self._overlay_saved_opacity = None
+
+    def set_overlay_capture_mode(self, capturing):
+        """线程安全地切换截图模式，流水线线程中会阻塞等待GUI线程完成"""
+        if self.is_gui_thread():
+            self._set_overlay_capture_mode(capturing)
+        else:
+            self.overlay_capture_signal.emit(capturing)
+
+    @pyqtSlot(str)
+    def _install_ocr_language_blocking(self, lang_code):
+        """在GUI线程中执行OCR语言包安装（可能弹出密码对话框）"""
+        self._ocr_install_result = self.ensure_ocr_language_installed(lang_code)
+
+    def request_ocr_language_install(self, lang_code):
+        """请求安装OCR语言包，流水线线程中调用时转交GUI线程执行并等待结果"""
+        if self.is_gui_thread():
+            return self.ensure_ocr_language_installed(lang_code)
+        self._ocr_install_result = (False, "OCR语言包安装请求未完成")
+        self.ocr_install_signal.emit(lang_code)
+        return self._ocr_install_result
+
     def init_global_mouse_listener(self):
         """初始化全局鼠标监听器"""
         if PYNPUT_AVAILABLE:
@@ -4625,6 +4589,74 @@ class ScreenTranslator(QMainWindow):
         online_engine_layout.addWidget(self.api_settings_btn)
         
         engine_layout.addLayout(online_engine_layout)
+        
+        # 竞速模式：同时请求多个在线引擎，使用最先返回的结果
+        race_layout = QHBoxLayout()
+        self.race_checkbox = QCheckBox("竞速模式 (同时请求多个引擎，取最快结果)")
+        self.race_checkbox.setChecked(self.online_translator.racing)
+        self.race_checkbox.toggled.connect(self.on_race_settings_changed)
+        race_layout.addWidget(self.race_checkbox)
+        race_layout.addWidget(QLabel("引擎数:"))
+        self.race_size_spin = QSpinBox()
+        self.race_size_spin.setRange(2, len(available_engines))
+        self.race_size_spin.setValue(self.online_translator.race_size)
+        self.race_size_spin.valueChanged.connect(self.on_race_settings_changed)
+        race_layout.addWidget(self.race_size_spin)
+        self.race_stats_label = QLabel()
+        self.race_stats_label.setStyleSheet("color: #666; font-size: 12px;")
+        race_layout.addWidget(self.race_stats_label)
+        race_layout.addStretch()
+        engine_layout.addLayout(race_layout)
+        
+        # OCR引擎选择
+        ocr_engine_layout = QHBoxLayout()
+        ocr_engine_layout.addWidget(QLabel("OCR引擎:"))
+        
+        self.ocr_engine_combo = QComboBox()
+        for backend_name, display_name in get_available_ocr_backends():
+            self.ocr_engine_combo.addItem(display_name, backend_name)
+        index = self.ocr_engine_combo.findData(self.ocr_pipeline.backend_name)
+        if index >= 0:
+            self.ocr_engine_combo.setCurrentIndex(index)
+        self.ocr_engine_combo.currentIndexChanged.connect(self.on_ocr_engine_changed)
+        ocr_engine_layout.addWidget(self.ocr_engine_combo)
+        
+        self.ocr_settings_btn = QPushButton("OCR设置")
+        self.ocr_settings_btn.clicked.connect(self.configure_ocr_settings)
+        ocr_engine_layout.addWidget(self.ocr_settings_btn)
+        
+        engine_layout.addLayout(ocr_engine_layout)
+        
+        # 截图方式选择
+        capture_layout = QHBoxLayout()
+        capture_layout.addWidget(QLabel("截图方式:"))
+        
+        self.capture_backend_combo = QComboBox()
+        for backend_name, display_name in get_available_capture_backends():
+            self.capture_backend_combo.addItem(display_name, backend_name)
+        index = self.capture_backend_combo.findData(self.capture_backend_name)
+        if index >= 0:
+            self.capture_backend_combo.setCurrentIndex(index)
+        self.capture_backend_combo.currentIndexChanged.connect(self.on_capture_backend_changed)
+        capture_layout.addWidget(self.capture_backend_combo)
+        
+        engine_layout.addLayout(capture_layout)
+        
+        # 离线翻译推理设置
+        argos_layout = QHBoxLayout()
+        argos_layout.addWidget(QLabel("离线推理:"))
+        self.argos_settings_label = QLabel(
+            self.translator.settings.describe() if self.translator else "未安装 argostranslate"
+        )
+        self.argos_settings_label.setStyleSheet("color: #666;")
+        argos_layout.addWidget(self.argos_settings_label)
+        argos_layout.addStretch()
+        self.argos_settings_btn = QPushButton("离线推理设置")
+        self.argos_settings_btn.setEnabled(self.translator is not None)
+        self.argos_settings_btn.clicked.connect(self.configure_argos_settings)
+        argos_layout.addWidget(self.argos_settings_btn)
+        engine_layout.addLayout(argos_layout)
+        
         engine_group.setLayout(engine_layout)
         main_layout.addWidget(engine_group)
         
@@ -4652,10 +4684,62 @@ class ScreenTranslator(QMainWindow):
         
         main_layout.addLayout(control_layout)
         
+        # 监视模式设置
+        watch_layout = QHBoxLayout()
+        self.watch_mode_checkbox = QCheckBox("监视模式 (区域内容变化时自动翻译)")
+        self.watch_mode_checkbox.toggled.connect(self.toggle_watch_mode)
+        watch_layout.addWidget(self.watch_mode_checkbox)
+        
+        watch_layout.addWidget(QLabel("检测频率 (次/秒):"))
+        self.watch_fps_spin = QSpinBox()
+        self.watch_fps_spin.setRange(1, 10)
+        self.watch_fps_spin.setValue(self.watch_fps)
+        self.watch_fps_spin.valueChanged.connect(self.on_watch_fps_changed)
+        watch_layout.addWidget(self.watch_fps_spin)
+        watch_layout.addStretch()
+        
+        main_layout.addLayout(watch_layout)
+        
         self.status_label = QLabel("正在准备...")
         self.status_label.setStyleSheet("font-weight: bold;")
         main_layout.addWidget(self.status_label)
         
+        cache_layout = QHBoxLayout()
+        self.cache_stats_label = QLabel()
+        self.cache_stats_label.setStyleSheet("color: #666; font-size: 12px;")
+        cache_layout.addWidget(self.cache_stats_label)
+        cache_layout.addStretch()
+        self.clear_cache_btn = QPushButton("清空缓存")
+        self.clear_cache_btn.clicked.connect(self.clear_translation_cache)
+        cache_layout.addWidget(self.clear_cache_btn)
+        main_layout.addLayout(cache_layout)
+        self.update_cache_stats()
+        
+        latency_group = QGroupBox("延迟统计")
+        latency_layout = QVBoxLayout()
+        
+        self.latency_table = QTableWidget(0, 5)
+        self.latency_table.setHorizontalHeaderLabels(["阶段", "次数", "p50 (ms)", "p95 (ms)", "p99 (ms)"])
+        self.latency_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.latency_table.verticalHeader().setVisible(False)
+        self.latency_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.latency_table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.latency_table.setMaximumHeight(160)
+        latency_layout.addWidget(self.latency_table)
+        
+        latency_btn_layout = QHBoxLayout()
+        latency_btn_layout.addStretch()
+        self.trace_btn = QPushButton("导出跟踪")
+        self.trace_btn.clicked.connect(self.toggle_perf_trace)
+        latency_btn_layout.addWidget(self.trace_btn)
+        self.reset_latency_btn = QPushButton("重置")
+        self.reset_latency_btn.clicked.connect(self.reset_latency_stats)
+        latency_btn_layout.addWidget(self.reset_latency_btn)
+        latency_layout.addLayout(latency_btn_layout)
+        
+        latency_group.setLayout(latency_layout)
+        main_layout.addWidget(latency_group)
+        
         result_group = QGroupBox("翻译历史记录")
         result_layout = QVBoxLayout()
         
@@ -4673,12 +4757,20 @@ class ScreenTranslator(QMainWindow):
         
         self.status_timer = QTimer(self)
         self.status_timer.timeout.connect(self.check_status_queue)
+        self.status_timer.timeout.connect(self.update_cache_stats)
         self.status_timer.start(500)
         
         self.activation_timer = QTimer(self)
         self.activation_timer.timeout.connect(self.check_window_activation)
         self.activation_timer.start(1000)
         
+        self.watch_timer = QTimer(self)
+        self.watch_timer.timeout.connect(self.on_watch_timer)
+        
+        self.latency_timer = QTimer(self)
+        self.latency_timer.timeout.connect(self.update_latency_stats)
+        self.latency_timer.start(1000)
+        
         self.on_translation_type_changed()
 
         # 添加动态窗口大小设置
@@ -4738,6 +4830,8 @@ class ScreenTranslator(QMainWindow):
         
         self.online_engine_combo.setEnabled(self.use_online_translation)
         self.api_settings_btn.setEnabled(self.use_online_translation)
+        self.race_checkbox.setEnabled(self.use_online_translation)
+        self.race_size_spin.setEnabled(self.use_online_translation)
         
         if self.use_online_translation:
             self.translation_ready = True
@@ -4764,6 +4858,328 @@ class ScreenTranslator(QMainWindow):
                 engine_name = self.online_engine_combo.currentText()
                 self.update_status(f"已切换到 {engine_name}")
 
+    def on_race_settings_changed(self):
+        racing = self.race_checkbox.isChecked()
+        self.online_translator.set_racing(racing, self.race_size_spin.value())
+        if racing:
+            self.update_status(f"竞速模式已开启：同时请求 {self.online_translator.race_size} 个引擎")
+        else:
+            self.update_status("竞速模式已关闭")
+
+    def update_race_stats(self):
+        """显示各引擎的竞速胜出次数和 p50 延迟，用于调整同时请求的引擎数"""
+        stats = self.online_translator.race_stats()
+        if not stats:
+            self.race_stats_label.setText("")
+            return
+        parts = []
+        for name, entry in sorted(stats.items(), key=lambda item: -item[1]['wins']):
+            latency = f" {entry['p50_ms']:.0f}ms" if entry['p50_ms'] is not None else ""
+            parts.append(f"{name} {entry['wins']}/{entry['races']}{latency}")
+        self.race_stats_label.setText("胜出: " + ", ".join(parts))
+
+    def on_ocr_engine_changed(self):
+        backend_name = self.ocr_engine_combo.currentData()
+        if backend_name:
+            self.ocr_pipeline.backend_name = backend_name
+            self.update_status(f"OCR引擎已切换到 {self.ocr_engine_combo.currentText()}")
+
+    def on_capture_backend_changed(self):
+        backend_name = self.capture_backend_combo.currentData()
+        if backend_name:
+            self.capture_backend_name = backend_name
+            self.update_status(f"截图方式已切换到 {self.capture_backend_combo.currentText()}")
+
+    def configure_ocr_settings(self):
+        """OCR识别参数设置对话框"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("OCR设置")
+        dialog.setMinimumWidth(420)
+        pipeline = self.ocr_pipeline
+        
+        layout = QVBoxLayout(dialog)
+        
+        layout.addWidget(QLabel(f"默认识别配置 (PSM/OEM): {format_ocr_pass_configs(OCR_PASS_CONFIGS)}"))
+        
+        layout.addWidget(QLabel("额外识别配置 (PSM/OEM):"))
+        extra_input = QLineEdit()
+        extra_input.setPlaceholderText("例如: 4/3, 7/1")
+        extra_input.setText(format_ocr_pass_configs(pipeline.extra_passes))
+        layout.addWidget(extra_input)
+        
+        threshold_layout = QHBoxLayout()
+        threshold_layout.addWidget(QLabel("提前结束置信度阈值:"))
+        threshold_spin = QSpinBox()
+        threshold_spin.setRange(0, 100)
+        threshold_spin.setValue(int(pipeline.confidence_threshold or 0))
+        threshold_layout.addWidget(threshold_spin)
+        layout.addLayout(threshold_layout)
+        
+        incremental_checkbox = QCheckBox("逐行增量识别和翻译 (适合聊天窗口、日志等逐行变化的区域)")
+        incremental_checkbox.setChecked(pipeline.incremental_enabled)
+        layout.addWidget(incremental_checkbox)
+        
+        region_checkbox = QCheckBox("文字稀疏时只识别检测到的文字区域")
+        region_checkbox.setChecked(pipeline.text_region_detection)
+        layout.addWidget(region_checkbox)
+        
+        scale_layout = QHBoxLayout()
+        scale_checkbox = QCheckBox("根据字高自动缩放，目标字高 (像素):")
+        scale_checkbox.setChecked(pipeline.preprocessor.auto_scale)
+        scale_layout.addWidget(scale_checkbox)
+        glyph_height_spin = QSpinBox()
+        glyph_height_spin.setRange(10, 80)
+        glyph_height_spin.setValue(int(pipeline.preprocessor.target_glyph_height))
+        scale_layout.addWidget(glyph_height_spin)
+        layout.addLayout(scale_layout)
+        
+        delay_layout = QHBoxLayout()
+        delay_layout.addWidget(QLabel("截图前等待翻译框透明 (毫秒):"))
+        delay_spin = QSpinBox()
+        delay_spin.setRange(0, 500)
+        delay_spin.setValue(int(self.capture_settle_delay * 1000))
+        delay_layout.addWidget(delay_spin)
+        layout.addLayout(delay_layout)
+        
+        escalation_layout = QHBoxLayout()
+        escalation_layout.addWidget(QLabel("低于该置信度时强力去噪重试 (0为关闭):"))
+        escalation_spin = QSpinBox()
+        escalation_spin.setRange(0, 100)
+        escalation_spin.setValue(int(pipeline.denoise_escalation_confidence))
+        escalation_layout.addWidget(escalation_spin)
+        layout.addLayout(escalation_layout)
+        
+        overlay_excluded = bool(self.translator_overlay and getattr(self.translator_overlay, 'capture_excluded', False))
+        delay_note = QLabel("当前翻译框已排除在截图之外，截图无需等待" if overlay_excluded
+                            else "系统不支持将翻译框排除在截图之外时，截图前需将翻译框设为透明并等待")
+        delay_note.setStyleSheet("color: #666; font-size: 12px;")
+        delay_note.setWordWrap(True)
+        layout.addWidget(delay_note)
+        
+        info_label = QLabel(
+            "使用说明:\n"
+            "• 所有识别配置并发执行，按平均词置信度选择最佳结果\n"
+            "• 任一配置达到阈值后立即采用其结果，不再等待其余配置\n"
+            "• 阈值设为0表示总是等待所有配置完成"
+        )
+        info_label.setStyleSheet("color: #666; font-size: 12px;")
+        info_label.setWordWrap(True)
+        layout.addWidget(info_label)
+        
+        def save_ocr_settings():
+            try:
+                extra_passes = parse_ocr_pass_configs(extra_input.text())
+            except ValueError as e:
+                QMessageBox.warning(dialog, "警告", f"识别配置格式错误: {e}")
+                return
+            pipeline.extra_passes = [config for config in extra_passes if config not in OCR_PASS_CONFIGS]
+            threshold = threshold_spin.value()
+            pipeline.confidence_threshold = threshold if threshold > 0 else None
+            self.capture_settle_delay = delay_spin.value() / 1000.0
+            pipeline.denoise_escalation_confidence = escalation_spin.value()
+            pipeline.text_region_detection = region_checkbox.isChecked()
+            pipeline.incremental_enabled = incremental_checkbox.isChecked()
+            pipeline.preprocessor.auto_scale = scale_checkbox.isChecked()
+            pipeline.preprocessor.target_glyph_height = glyph_height_spin.value()
+            self.update_status(f"OCR设置已保存: 额外配置 {len(pipeline.extra_passes)} 个")
+            dialog.accept()
+        
+        save_btn = QPushButton("保存")
+        save_btn.clicked.connect(save_ocr_settings)
+        layout.addWidget(save_btn)
+        
+        dialog.exec_()
+
+    def configure_argos_settings(self):
+        """离线翻译（CTranslate2）推理设置对话框，含基准测试"""
+        if not self.translator:
+            return
+        settings = self.translator.settings
+        
+        dialog = QDialog(self)
+        dialog.setWindowTitle("离线推理设置")
+        dialog.setMinimumWidth(520)
+        layout = QVBoxLayout(dialog)
+        
+        def add_row(label, widget):
+            row = QHBoxLayout()
+            row.addWidget(QLabel(label))
+            row.addWidget(widget)
+            layout.addLayout(row)
+            return widget
+        
+        device_combo = add_row("设备:", QComboBox())
+        device_combo.addItems(DEVICES)
+        device_combo.setCurrentText(settings.device)
+        
+        compute_combo = add_row("计算精度:", QComboBox())
+        compute_combo.addItems(COMPUTE_TYPES)
+        compute_combo.setCurrentText(settings.compute_type)
+        
+        inter_spin = add_row("并行批次数 (inter_threads):", QSpinBox())
+        inter_spin.setRange(1, 16)
+        inter_spin.setValue(int(settings.inter_threads))
+        
+        intra_spin = add_row("每批线程数 (intra_threads, 0为自动):", QSpinBox())
+        intra_spin.setRange(0, os.cpu_count() or 64)
+        intra_spin.setValue(int(settings.intra_threads))
+        
+        cores_input = add_row("绑定CPU核心（整个程序）:", QLineEdit())
+        cores_input.setPlaceholderText("例如: 0-3,6（留空不绑定）")
+        cores_input.setToolTip("绑定的是整个程序（包括界面、截图和OCR），不只是离线翻译；清空后恢复原来的核心")
+        cores_input.setText(format_cpu_cores(settings.cpu_cores))
+        
+        batch_spin = add_row("每批最大句子数:", QSpinBox())
+        batch_spin.setRange(1, 256)
+        batch_spin.setValue(int(settings.batch_size))
+        
+        beam_spin = add_row("Beam 大小 (越小越快):", QSpinBox())
+        beam_spin.setRange(1, 8)
+        beam_spin.setValue(int(settings.beam_size))
+        
+        info_label = QLabel(
+            "使用说明:\n"
+            "• 单个翻译请求追求低延迟：并行批次数 1，每批线程数设为核心数或自动\n"
+            "• 同时处理多个请求（服务模式）：增加并行批次数，减少每批线程数\n"
+            "• int8 通常最快且内存占用最小，float32 精度最高\n"
+            "• 保存后会重新加载离线翻译模型"
+        )
+        info_label.setStyleSheet("color: #666; font-size: 12px;")
+        info_label.setWordWrap(True)
+        layout.addWidget(info_label)
+        
+        # 基准测试：在当前语言对上比较不同设置
+        bench_table = QTableWidget(0, 4)
+        bench_table.setHorizontalHeaderLabels(["设置", "加载 (ms)", "单句 (ms)", "批量 (句/秒)"])
+        bench_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        bench_table.verticalHeader().setVisible(False)
+        bench_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        bench_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        bench_table.setMaximumHeight(180)
+        layout.addWidget(bench_table)
+        bench_results = []
+        
+        bench_layout = QHBoxLayout()
+        bench_btn = QPushButton("运行基准测试")
+        apply_btn = QPushButton("使用选中的设置")
+        apply_btn.setEnabled(False)
+        bench_layout.addWidget(bench_btn)
+        bench_layout.addWidget(apply_btn)
+        layout.addLayout(bench_layout)
+        
+        def show_benchmark(results):
+            bench_btn.setEnabled(True)
+            if isinstance(results, str):
+                QMessageBox.warning(dialog, "基准测试失败", results)
+                return
+            bench_results[:] = results
+            bench_table.setRowCount(len(results))
+            for row, result in enumerate(results):
+                values = [result['settings'].describe()]
+                if 'error' in result:
+                    values += ["不支持", "", ""]
+                else:
+                    values += [f"{result['load_ms']:.0f}", f"{result['single_ms']:.1f}",
+                               f"{result['batch_sentences_per_s']:.1f}"]
+                for column, value in enumerate(values):
+                    bench_table.setItem(row, column, QTableWidgetItem(value))
+            usable = any('error' not in result for result in results)
+            apply_btn.setEnabled(usable)
+            if usable:
+                bench_table.selectRow(0)  # 结果按单句延迟排序，第一行最快
+            self.update_status("离线推理基准测试完成")
+        
+        def run_benchmark():
+            if not self.translator.ready:
+                QMessageBox.warning(dialog, "警告", "离线翻译未就绪，无法测试")
+                return
+            # 基准测试与翻译争用同一翻译器和CPU，只在空闲时进行，测试期间暂停翻译
+            if not self.translation_lock.acquire(blocking=False):
+                QMessageBox.information(dialog, "提示", "正在翻译，请在翻译完成后再运行基准测试")
+                return
+            self.translation_in_progress = True
+            bench_btn.setEnabled(False)
+            apply_btn.setEnabled(False)
+            
+            def worker():
+                try:
+                    results = self.translator.benchmark_settings(
+                        SOURCE_LANG, TARGET_LANG, progress=self.status_signal.emit
+                    )
+                except Exception as e:
+                    results = str(e)
+                finally:
+                    self.translation_in_progress = False
+                    self.translation_lock.release()
+                self.argos_benchmark_signal.emit(results)
+            
+            threading.Thread(target=worker, daemon=True).start()
+        
+        def apply_selected():
+            row = bench_table.currentRow()
+            if row < 0 or row >= len(bench_results) or 'error' in bench_results[row]:
+                return
+            chosen = bench_results[row]['settings']
+            compute_combo.setCurrentText(chosen.compute_type)
+            device_combo.setCurrentText(chosen.device)
+            inter_spin.setValue(int(chosen.inter_threads))
+            intra_spin.setValue(int(chosen.intra_threads))
+        
+        self.argos_benchmark_signal.connect(show_benchmark)
+        bench_btn.clicked.connect(run_benchmark)
+        apply_btn.clicked.connect(apply_selected)
+        
+        def save_argos_settings():
+            try:
+                cpu_cores = parse_cpu_cores(cores_input.text())
+            except ValueError as e:
+                QMessageBox.warning(dialog, "警告", f"CPU核心格式错误: {e}")
+                return
+            new_settings = InferenceSettings(
+                device=device_combo.currentText(), compute_type=compute_combo.currentText(),
+                inter_threads=inter_spin.value(), intra_threads=intra_spin.value(),
+                cpu_cores=cpu_cores, batch_size=batch_spin.value(), beam_size=beam_spin.value(),
+            )
+            try:
+                new_settings.save(self.argos_settings_path)
+            except OSError as e:
+                QMessageBox.warning(dialog, "警告", f"保存设置失败: {e}")
+                return
+            
+            reload_models = new_settings.model_options() != settings.model_options() \
+                or new_settings.cpu_cores != settings.cpu_cores
+            self.argos_settings_label.setText(new_settings.describe())
+            
+            def apply_settings():
+                # 在翻译锁内替换设置，进行中的翻译完成后才生效，不会看到一半新一半旧的设置或模型
+                with self.translation_lock:
+                    reinitialize = reload_models and self.translator.ready
+                    self.translator.settings = new_settings
+                    if reinitialize:
+                        # 线程和精度只在加载模型时生效，需要重新初始化
+                        self.translator.ready = False
+                        self.translation_ready = False
+                self.status_signal.emit(f"离线推理设置已生效: {new_settings.describe()}")
+                if reinitialize:
+                    self.initialize_offline_translator()
+            
+            if self.translation_in_progress:
+                self.update_status("离线推理设置已保存，将在当前翻译完成后生效")
+            else:
+                self.update_status(f"离线推理设置已保存: {new_settings.describe()}")
+            threading.Thread(target=apply_settings, daemon=True).start()
+            dialog.accept()
+        
+        save_btn = QPushButton("保存")
+        save_btn.clicked.connect(save_argos_settings)
+        layout.addWidget(save_btn)
+        
+        dialog.exec_()
+        try:
+            self.argos_benchmark_signal.disconnect(show_benchmark)
+        except TypeError:
+            pass
+
     def configure_api_settings(self):
         current_engine = self.online_engine_combo.currentData()
         engine_name = self.online_engine_combo.currentText()
@@ -5068,6 +5484,61 @@ class ScreenTranslator(QMainWindow):
         except queue.Empty:
             pass
 
+    def update_cache_stats(self):
+        """刷新翻译缓存命中统计"""
+        stats = self.translation_cache.stats()
+        self.cache_stats_label.setText(
+            f"翻译缓存: 命中 {stats['hits']} (内存 {stats['memory_hits']} / 磁盘 {stats['disk_hits']}), "
+            f"未命中 {stats['misses']}, 命中率 {stats['hit_rate']:.0%}, "
+            f"已缓存 {stats['disk_entries'] or stats['memory_entries']} 条"
+        )
+
+    def clear_translation_cache(self):
+        self.translation_cache.clear()
+        self.update_cache_stats()
+        self.update_status("翻译缓存已清空")
+
+    def update_latency_stats(self):
+        """刷新各阶段耗时分位数"""
+        self.update_race_stats()
+        snapshot = self.perf_monitor.snapshot()
+        self.latency_table.setRowCount(len(snapshot))
+        for row, (name, stats) in enumerate(snapshot.items()):
+            values = [name, str(stats['count'])] + [
+                f"{stats[key]:.1f}" for key in ('p50_ms', 'p95_ms', 'p99_ms')
+            ]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.latency_table.setItem(row, column, item)
+
+    def toggle_perf_trace(self):
+        """开始/停止将每次计时写入 JSONL 跟踪文件"""
+        if self.perf_monitor.tracing:
+            path = self.perf_monitor.trace_path
+            self.perf_monitor.stop_trace()
+            self.trace_btn.setText("导出跟踪")
+            self.update_status(f"性能跟踪已保存: {path}")
+            return
+        
+        default_path = str(self.app_data_dir / f"skylark_trace_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+        path, _ = QFileDialog.getSaveFileName(self, "导出性能跟踪", default_path, "JSON Lines (*.jsonl)")
+        if not path:
+            return
+        try:
+            self.perf_monitor.start_trace(path)
+        except OSError as e:
+            QMessageBox.warning(self, "导出失败", f"无法写入跟踪文件: {e}")
+            return
+        self.trace_btn.setText("停止跟踪")
+        self.update_status(f"正在记录性能跟踪: {path}")
+
+    def reset_latency_stats(self):
+        self.perf_monitor.reset()
+        self.online_translator.reset_race_stats()
+        self.update_latency_stats()
+
     def check_window_activation(self):
         if self.isMinimized():
             return
@@ -5120,6 +5591,7 @@ class ScreenTranslator(QMainWindow):
                 if hasattr(self.selection_overlay, 'selection_rect') and not self.selection_overlay.selection_rect.isEmpty():
                     rect = self.selection_overlay.selection_rect
                     self.capture_area = (rect.x(), rect.y(), rect.x() + rect.width(), rect.y() + rect.height())
+                    self.frame_change_detector.reset()
                     self.update_status(f"已选择区域: {self.capture_area}")
                     self.create_translator_overlay()
             self.show()
@@ -5145,6 +5617,10 @@ class ScreenTranslator(QMainWindow):
             self.translator_overlay = TranslatorOverlay(rect, self)
             self.update_ui_signal.connect(self.translator_overlay.handle_update_signal)
             self.translator_overlay.show()
+            # 尽量让系统把翻译框排除在截图之外，截图时就不必再切换透明度
+            self.translator_overlay.capture_excluded = exclude_window_from_capture(self.translator_overlay.winId())
+            if self.translator_overlay.capture_excluded:
+                print("翻译框已排除在截图之外")
             self.overlay_hidden = False
 
     def close_overlay(self):
@@ -5236,81 +5712,57 @@ class ScreenTranslator(QMainWindow):
                 return lang_name
         return code
 
-    def preprocess_image(self, image):
-        try:
-            if image.mode != 'L':
-                image = image.convert('L')
-            np_img = np.array(image, dtype=np.uint8)
-            mean_brightness = np.mean(np_img)
-            std_brightness = np.std(np_img)
-            
-            # 动态调整预处理策略
-            if std_brightness < 25:  # 低对比度图像
-                p_low, p_high = np.percentile(np_img, (5, 95))
-                np_img = np.clip((np_img - p_low) * 255.0 / (p_high - p_low), 0, 255).astype(np.uint8)
-                # 使用更大的 block_size 以适应更多场景
-                block_size = max(15, int(min(np_img.shape[:2]) * 0.1)) | 1
-                thresh_img = cv2.adaptiveThreshold(np_img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, block_size, 5)
-            elif mean_brightness < 50 or mean_brightness > 200:  # 过暗或过亮
-                thresh_img = cv2.equalizeHist(np_img)
-                # 适度去噪，保持细节
-                thresh_img = cv2.fastNlMeansDenoising(thresh_img, None, 7, 7, 21)
-            else:  # 正常光照
-                _, thresh_img = cv2.threshold(np_img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            
-            # 调整形态学操作，增强字符连接
-            kernel = np.ones((2, 2), np.uint8)  # 恢复到 (2, 2) 以连接字符
-            thresh_img = cv2.morphologyEx(thresh_img, cv2.MORPH_CLOSE, kernel)
-            # 恢复适当的锐化，增强边缘
-            thresh_img = cv2.filter2D(thresh_img, -1, np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]]))
-            
-            del np_img  # 释放原始数组
-            return Image.fromarray(thresh_img)
-        except Exception as e:
-            print(f"高级处理失败: {e}, 使用回退方案")
-            return image
+    def overlay_blocks_capture(self):
+        """翻译框是否会出现在截图中（已隐藏或已被系统排除在截图外时不会）"""
+        overlay = self.translator_overlay
+        if overlay is None or self.overlay_hidden:
+            return False
+        return not getattr(overlay, 'capture_excluded', False)
 
-    def capture_screen_region(self):
-        """截图方法 - 改进版，不隐藏翻译框"""
+    def overlay_capture_plan(self):
+        """
+        监视模式检测变化时翻译框的处理方式 (mask, hide_overlay)，见 screen_capture.watch_capture_plan（在GUI线程中调用）。
+        翻译框只遮住截图区域的一部分时忽略该区域；遮住大部分（例如与截图区域重合）时隐藏翻译框后截图。
+        """
+        if not self.capture_area or not self.overlay_blocks_capture():
+            return None, False
+        geometry = self.translator_overlay.frameGeometry()
+        overlay_rect = (geometry.x(), geometry.y(),
+                        geometry.x() + geometry.width(), geometry.y() + geometry.height())
+        return watch_capture_plan(self.capture_area, overlay_rect)
+
+    def capture_screen_region(self, hide_overlay=True):
+        """
+        截图方法 - 改进版，不隐藏翻译框（可在流水线线程中调用）。
+        hide_overlay 为 False 时不切换翻译框透明度，截图中可能包含翻译框（用于监视模式的变化检测）。
+        """
         if not self.capture_area:
             print("错误：尚未选择截图区域。")
-            self.update_status("错误：尚未选择截图区域")
+            self.status_signal.emit("错误：尚未选择截图区域")
             return None
         
+        # 翻译框已被排除在截图外时直接截图，省去透明度切换、重绘和等待
+        hide_overlay = hide_overlay and self.overlay_blocks_capture()
         try:
-            # 不再隐藏翻译框，而是设置其为完全透明
-            if self.translator_overlay:
-                # 保存当前透明度
-                current_opacity = self.translator_overlay.windowOpacity()
-                # 设置为完全透明
-                self.translator_overlay.setWindowOpacity(0.0)
-                # 强制立即重绘
-                self.translator_overlay.repaint()
-                QApplication.processEvents()
-            
-            # 短暂延迟确保透明度生效
-            time.sleep(0.05)
-            
-            # 截图
-            image = ImageGrab.grab(bbox=self.capture_area, all_screens=True)
-            image = image.convert('RGB').convert('L')
-            
-            # 恢复翻译框透明度
-            if self.translator_overlay:
-                self.translator_overlay.setWindowOpacity(current_opacity)
-                self.translator_overlay.repaint()
-            
-            return image
+            if hide_overlay:
+                # 不再隐藏翻译框，而是在GUI线程中将其设置为完全透明
+                self.set_overlay_capture_mode(True)
+                # 短暂延迟确保透明度生效
+                if self.capture_settle_delay > 0:
+                    time.sleep(self.capture_settle_delay)
+            
+            # 截图，直接得到灰度 NumPy 数组
+            backend = get_capture_backend(self.capture_backend_name)
+            with span("capture", backend=backend.name):
+                return backend.grab_gray(self.capture_area)
         except Exception as e:
             print(f"截图失败: {e}")
-            self.update_status(f"截图失败: {e}")
-            
-            # 确保翻译框透明度恢复
-            if self.translator_overlay:
-                self.translator_overlay.setWindowOpacity(0.8)
-                self.translator_overlay.repaint()
-            
+            self.status_signal.emit(f"截图失败: {e}")
             return None
+        finally:
+            if hide_overlay:
+                # 恢复翻译框透明度
+                self.set_overlay_capture_mode(False)
 
     def check_ocr_language_support(self, lang_code):
         """检查OCR语言支持情况"""
@@ -5320,10 +5772,9 @@ class ScreenTranslator(QMainWindow):
         if not ocr_code:
             return False, f"语言 {lang_code} 没有对应的OCR语言包"
         
-        # 检查是否已安装该语言包
+        # 检查是否已安装该语言包（使用缓存的登记表，不启动子进程）
         try:
-            installed_langs = pytesseract.get_languages()
-            if ocr_code not in installed_langs:
+            if not get_tessdata_registry().has_language(ocr_code):
                 return False, f"OCR语言包 {ocr_code} 未安装"
             return True, f"OCR语言包 {ocr_code} 已安装"
         except Exception as e:
@@ -5336,8 +5787,7 @@ class ScreenTranslator(QMainWindow):
             return False, f"语言 {lang_code} 没有对应的OCR语言包"
         
         try:
-            installed_langs = pytesseract.get_languages()
-            if ocr_code in installed_langs:
+            if get_tessdata_registry().has_language(ocr_code):
                 return True, f"OCR语言包 {ocr_code} 已安装"
             
             # 语言包未安装，尝试安装
@@ -5375,6 +5825,7 @@ class ScreenTranslator(QMainWindow):
             stdout_output, stderr_output = process.communicate(input=f"{password}\n", timeout=300)
             
             if process.returncode == 0:
+                get_tessdata_registry().invalidate()
                 return True, f"成功安装 {ocr_code} OCR语言包"
             else:
                 return False, f"安装 {ocr_code} OCR语言包失败: {stderr_output}"
@@ -5382,55 +5833,36 @@ class ScreenTranslator(QMainWindow):
         except Exception as e:
             return False, f"安装OCR语言包时出错: {e}"
     
+    def resolve_ocr_language(self):
+        """确定当前源语言对应的OCR语言包，未安装时尝试安装，失败则使用英语"""
+        # 检查语言支持
+        supported, message = self.check_ocr_language_support(SOURCE_LANG)
+        
+        if supported:
+            # 语言已支持，直接使用
+            return OCR_LANG_MAP[SOURCE_LANG]
+        
+        # 尝试安装语言包（需要在GUI线程中弹出密码对话框）
+        installed, install_message = self.request_ocr_language_install(SOURCE_LANG)
+        if installed:
+            # 安装成功，使用安装的语言
+            return OCR_LANG_MAP[SOURCE_LANG]
+        
+        # 安装失败，使用英语作为后备
+        self.status_signal.emit(f"{install_message}，使用英语OCR作为后备")
+        return "eng"
+
     def ocr_image(self, image):
         """OCR识别图像文本 - 增强版，支持语言检查和自动安装"""
         if image is None:
             return ""
         
         try:
-            # 检查语言支持
-            supported, message = self.check_ocr_language_support(SOURCE_LANG)
-            
-            if not supported:
-                # 尝试安装语言包
-                installed, install_message = self.ensure_ocr_language_installed(SOURCE_LANG)
-                
-                if not installed:
-                    # 安装失败，使用英语作为后备
-                    self.update_status(f"{install_message}，使用英语OCR作为后备")
-                    ocr_lang = "eng"
-                else:
-                    # 安装成功，使用安装的语言
-                    ocr_lang = OCR_LANG_MAP[SOURCE_LANG]
-            else:
-                # 语言已支持，直接使用
-                ocr_lang = OCR_LANG_MAP[SOURCE_LANG]
-            
-            print(f"OCR 使用语言: {ocr_lang}")
-            
-            # 尝试不同的PSM配置
-            config_options = [
-                '--psm 6 --oem 3',  # 单行文本
-                '--psm 11 --oem 3'  # 稀疏文本
-            ]
-            
-            best_text = ""
-            max_confidence = 0
-            
-            for config in config_options:
-                text = pytesseract.image_to_string(image, lang=ocr_lang, config=config)
-                # 估计置信度 (简单方法: 字符数)
-                confidence = len(text.strip())
-                if confidence > max_confidence:
-                    max_confidence = confidence
-                    best_text = text.strip()
-            
-            print(f"OCR 识别结果: {best_text}")
-            return best_text if best_text else ""
-        
+            ocr_lang = self.resolve_ocr_language()
+            return self.ocr_pipeline.recognize(image, ocr_lang)
         except Exception as e:
             print(f"OCR 识别失败: {e}")
-            self.update_status(f"OCR 识别失败: {e}")
+            self.status_signal.emit(f"OCR 识别失败: {e}")
             return ""
 
     def process_translation(self):
@@ -5438,20 +5870,92 @@ class ScreenTranslator(QMainWindow):
             self.update_status("翻译已在进行中，请稍候...")
             return
         
-        self.translation_lock.acquire()
+        if not self.begin_translation():
+            return
+        
+        # 截图、预处理和OCR交给流水线线程执行，GUI线程立即返回
+        self.pipeline_requested.emit()
+
+    def begin_translation(self):
+        """
+        开始一次翻译流程，获取翻译锁，成功时返回 True。
+        锁被占用（例如后台正在加载离线模型或应用推理设置）时不在GUI线程中等待，提示后返回 False。
+        """
+        if not self.translation_lock.acquire(blocking=False):
+            if self.offline_initializing:
+                self.update_status("正在加载离线翻译模型，请稍候...")
+            else:
+                self.update_status("翻译已在进行中，请稍候...")
+            return False
         self.translation_in_progress = True
+        self.translation_started_at = time.perf_counter()
+        
+        self.update_ui_signal.emit("正在处理翻译...", "正在处理...")
+        print("开始处理翻译...")
+        return True
+
+    def toggle_watch_mode(self, enabled):
+        """开启/关闭监视模式"""
+        self.watch_mode_enabled = enabled
+        self.frame_change_detector.reset()
+        if enabled:
+            self.watch_timer.start(int(1000 / self.watch_fps))
+            if not self.capture_area:
+                self.update_status("监视模式已开启，请先选择翻译区域")
+            else:
+                self.update_status(f"监视模式已开启 ({self.watch_fps} 次/秒)")
+        else:
+            self.watch_timer.stop()
+            self.update_status("监视模式已关闭")
+
+    def on_watch_fps_changed(self, fps):
+        self.watch_fps = fps
+        if self.watch_timer.isActive():
+            self.watch_timer.start(int(1000 / fps))
+
+    def on_watch_timer(self):
+        """监视定时器：空闲时请求流水线线程检测一帧"""
+        if (not self.capture_area or self.translation_in_progress
+                or self.watch_check_pending or self.offline_initializing):
+            return
+        # 翻译框被右键隐藏时不会出现在截图中，照常检测
+        self.watch_overlay_mask, self.watch_hide_overlay = self.overlay_capture_plan()
+        self.watch_check_pending = True
+        self.watch_check_requested.emit()
+
+    def on_watch_frame_changed(self, image):
+        """监视模式检测到区域内容变化，对该帧执行识别和翻译"""
+        if not self.watch_mode_enabled:
+            return
+        if self.translation_in_progress:
+            # 正在翻译时放弃这次变化，下一次检测会重新触发
+            self.frame_change_detector.invalidate()
+            return
+        if not self.begin_translation():
+            self.frame_change_detector.invalidate()
+            return
+        self.frame_pipeline_requested.emit(image)
+
+    def finish_translation(self):
+        """结束本次翻译流程，释放翻译锁"""
+        if self.translation_started_at is not None:
+            # 从触发翻译到结果显示的端到端耗时
+            self.perf_monitor.record("total", (time.perf_counter() - self.translation_started_at) * 1000)
+            self.translation_started_at = None
+        self.translation_in_progress = False
+        if self.translation_lock.locked():
+            self.translation_lock.release()
+
+    def on_pipeline_failed(self, status_text, overlay_text):
+        """流水线线程截图/OCR失败"""
+        self.update_ui_signal.emit(status_text, overlay_text)
+        self.finish_translation()
+
+    def on_pipeline_finished(self, original_text):
+        """流水线线程完成OCR后，在GUI线程中分派翻译任务"""
         background_thread_started = False
         
         try:
-            self.update_ui_signal.emit("正在处理翻译...", "正在处理...")
-            print("开始处理翻译...")
-            
-            image = self.capture_screen_region()
-            if not image:
-                self.update_ui_signal.emit("截图失败，请重新选择区域", "截图失败")
-                return
-        
-            original_text = self.ocr_image(image)
             if not original_text:
                 self.update_ui_signal.emit("OCR 未识别到文本，请检查图像质量", "OCR 未识别到文本")
                 return
@@ -5465,13 +5969,18 @@ class ScreenTranslator(QMainWindow):
     
             if self.use_online_translation:
                 self.update_ui_signal.emit("正在在线翻译文本...", "正在在线翻译...")
+                # 后台线程不能访问Qt控件，先在GUI线程中取得引擎显示名称
+                combo = self.online_engine_combo
+                engine_names = {combo.itemData(i): combo.itemText(i) for i in range(combo.count())}
+                current_engine_name = combo.currentText()
                 def online_translate_and_update():
                     try:
                         if not self.check_network():
                             self.update_ui_signal.emit("无网络连接，无法在线翻译", "无网络")
                             return
-                        translated_text = self.online_translator.translate(original_text, SOURCE_LANG, TARGET_LANG)
-                        engine_name = self.online_engine_combo.currentText()
+                        translated_text = self.translate_text(
+                            original_text, lambda text: self.online_translator.translate(text, SOURCE_LANG, TARGET_LANG))
+                        engine_name = engine_names.get(self.online_translator.last_engine, current_engine_name)
                         self.append_translation(f"翻译 ({engine_name}): {translated_text}")
                         self.update_ui_signal.emit("在线翻译完成", translated_text)
                     except Exception as e:
@@ -5480,23 +5989,21 @@ class ScreenTranslator(QMainWindow):
                         print(f"{error_msg}\n{traceback.format_exc()}")
                         self.update_ui_signal.emit(error_msg, f"翻译失败: {e}")
                     finally:
-                        self.translation_in_progress = False
-                        self.translation_lock.release()
+                        self.finish_translation()
                 threading.Thread(target=online_translate_and_update, daemon=True).start()
                 background_thread_started = True
     
             elif self.translator and not self.translation_ready:
-                self.update_status("离线翻译未就绪，正在初始化...")
-                self.initialize_offline_translator()
-                if not self.translation_ready:
-                    self.update_ui_signal.emit("离线翻译初始化失败，请检查语言包", "初始化失败")
-                    return
+                self.update_ui_signal.emit("离线翻译未就绪，正在初始化，请稍后重试", "正在初始化...")
+                # 初始化需要获取 translation_lock，放到后台线程中等待本次流程结束后执行
+                threading.Thread(target=self.initialize_offline_translator, daemon=True).start()
     
             elif self.translator and self.translation_ready:
                 self.update_ui_signal.emit("正在离线翻译文本...", "正在离线翻译...")
                 def offline_translate_and_update():
                     try:
-                        translated_text = self.translator.translate(original_text, SOURCE_LANG, TARGET_LANG)
+                        translated_text = self.translate_text(
+                            original_text, lambda text: self.translator.translate(text, SOURCE_LANG, TARGET_LANG))
                         self.append_translation(f"翻译 (Argos): {translated_text}")
                         self.update_ui_signal.emit("离线翻译完成", translated_text)
                     except Exception as e:
@@ -5505,16 +6012,13 @@ class ScreenTranslator(QMainWindow):
                         print(f"{error_msg}\n{traceback.format_exc()}")
                         self.update_ui_signal.emit(error_msg, f"错误: {e}")
                     finally:
-                        self.translation_in_progress = False
-                        self.translation_lock.release()
+                        self.finish_translation()
                 threading.Thread(target=offline_translate_and_update, daemon=True).start()
                 background_thread_started = True
     
             else:
                 self.update_ui_signal.emit("仅显示OCR结果 (无翻译引擎)", original_text)
                 self.append_translation(f"仅OCR: {original_text}")
-                self.translation_in_progress = False
-                self.translation_lock.release()
     
         except Exception as e:
             import traceback
@@ -5522,13 +6026,25 @@ class ScreenTranslator(QMainWindow):
             print(f"{error_msg}\n{traceback.format_exc()}")
             self.append_translation(error_msg)
             self.update_ui_signal.emit(error_msg, f"错误: {e}")
-            self.translation_in_progress = False
-            self.translation_lock.release()
     
         finally:
-            if not background_thread_started and self.translation_lock.locked():
-                self.translation_in_progress = False
-                self.translation_lock.release()
+            if not background_thread_started:
+                self.finish_translation()
+
+    def translate_text(self, text, translate_func):
+        """
+        翻译OCR文本。增量模式下按段落逐段翻译（被换行拆开的句子先拼接回完整的句子），
+        未变化的段落直接命中翻译缓存，每翻译完一段就刷新一次翻译框，不必等待全部翻译完成。
+        """
+        if not self.ocr_pipeline.incremental_enabled:
+            return translate_func(text)
+        
+        paragraphs = join_wrapped_lines(text.split("\n"))
+        translated = []
+        for index, paragraph in enumerate(paragraphs):
+            translated.append(translate_func(paragraph))
+            self.update_ui_signal.emit(f"正在翻译第 {index + 1}/{len(paragraphs)} 段...", "\n".join(translated))
+        return "\n".join(translated)
 
     def check_network(self):
         try:
@@ -5559,6 +6075,18 @@ class ScreenTranslator(QMainWindow):
             self.translator_overlay.close()
             self.translator_overlay.deleteLater()
             self.translator_overlay = None
+
+        self.watch_timer.stop()
+        # 停止流水线线程
+        if getattr(self, 'pipeline_thread', None):
+            self.pipeline_thread.quit()
+            self.pipeline_thread.wait(2000)
+        self.ocr_pipeline.close()
+        shutdown_ocr_backends()
+        shutdown_capture_backends()
+        shutdown_transport()
+        self.translation_cache.close()
+        self.perf_monitor.stop_trace()
         event.accept()
 
     def toggle_translation_mode(self, use_online):
@@ -5583,23 +6111,28 @@ class ScreenTranslator(QMainWindow):
             self.translation_ready = False
 
     def initialize_offline_translator(self):
+        """加载并预热离线模型（在后台线程中调用），期间持有翻译锁，新的翻译请求会提示正在加载"""
         with self.translation_lock:
             if self.translator and not self.translation_ready:
-                self.update_status("正在初始化离线翻译器...")
+                self.offline_initializing = True
+                self.status_signal.emit("正在初始化离线翻译器...")
                 print(f"初始化前就绪状态: {self.translation_ready}")
                 try:
-                    success = self.translator.initialize()  # 现在 initialize() 返回布尔值
+                    # 现在 initialize() 返回布尔值，并预热当前语言对（含中转路径）的模型
+                    success = self.translator.initialize(warm_pairs=[(SOURCE_LANG, TARGET_LANG)])
                     self.translator.ready = success
                     self.translation_ready = success
                     if success:
-                        self.update_status("离线翻译已就绪")
+                        self.status_signal.emit("离线翻译已就绪")
                     else:
-                        self.update_status("离线翻译初始化失败，请安装语言包")
+                        self.status_signal.emit("离线翻译初始化失败，请安装语言包")
                     print(f"初始化后就绪状态: {self.translation_ready}")
                 except Exception as e:
-                    self.update_status(f"离线翻译初始化失败: {e}")
+                    self.status_signal.emit(f"离线翻译初始化失败: {e}")
                     self.translation_ready = False
                     print(f"初始化错误: {e}")
+                finally:
+                    self.offline_initializing = False
 
     def setup_api_dialog_size(self, dialog, engine):
         """根据引擎类型设置API设置对话框大小"""
@@ -0,0 +1,527 @@
+"""
+Skylark 本地识别翻译服务（无界面，不导入 Qt）
+
+在 127.0.0.1 上提供 HTTP 接口，供本机其他工具调用 Skylark 的 OCR 和翻译功能：
+
+    POST /ocr            图片（原始字节，或 JSON {"image": base64}）-> {"text", "confidence", ...}
+    POST /translate      {"text": "...", 或 "texts": [...], "from": "en", "to": "zh"} -> {"translations": [...]}
+    POST /ocr_translate  图片 -> {"text", "translation", ...}
+    GET  /health, /stats
+
+OCR 引擎和翻译模型在启动时加载并常驻。请求进入有界队列，队列满时立即返回 503；
+翻译调度线程把短时间内到达的请求按语言对合并为一次模型调用。
+--engine stub 使用不联网、不加载模型的桩引擎，便于测试调用方。
+
+示例:
+    python skylark_service.py --port 8765 --engine argos
+    curl -s --data-binary @shot.png "http://127.0.0.1:8765/ocr_translate?from=en&to=zh"
+"""
+import argparse
+import base64
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from perf_monitor import get_perf_monitor, span
+
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_MAX_BATCH = 16
+DEFAULT_BATCH_WINDOW = 0.01    # 秒，等待更多请求合并成一批的最长时间
+DEFAULT_REQUEST_TIMEOUT = 30.0
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+
+class ServiceBusy(Exception):
+    """请求队列已满"""
+
+
+class ServiceJob:
+    """排队中的一个请求，处理线程完成后通过 event 通知等待的 HTTP 线程"""
+    __slots__ = ('payload', 'result', 'error', 'event')
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.result = None
+        self.error = None
+        self.event = threading.Event()
+
+    def finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.event.set()
+
+    def wait(self, timeout):
+        if not self.event.wait(timeout):
+            raise TimeoutError("处理超时")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class BatchingDispatcher:
+    """
+    有界队列 + 处理线程。每个线程取出一个请求后，在 batch_window 秒内继续收集，
+    最多 max_batch 个请求一起交给 handler(jobs)；handler 负责调用每个 job.finish()。
+    """
+
+    def __init__(self, name, handler, max_queue=DEFAULT_QUEUE_SIZE, max_batch=1,
+                 batch_window=0.0, workers=1):
+        self.name = name
+        self.handler = handler
+        self.max_batch = max(1, max_batch)
+        self.batch_window = batch_window
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{index}", daemon=True)
+            for index in range(max(1, workers))
+        ]
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.batches = 0
+        self.batched_jobs = 0
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, payload):
+        job = ServiceJob(payload)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            raise ServiceBusy(f"{self.name} 队列已满")
+        with self._stats_lock:
+            self.submitted += 1
+        return job
+
+    def _collect(self):
+        job = self._queue.get()
+        if job is None:
+            return None
+        batch = [job]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                # 停止信号留给其他线程
+                self._queue.put(None)
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            with self._stats_lock:
+                self.batches += 1
+                self.batched_jobs += len(batch)
+            try:
+                self.handler(batch)
+            except Exception as e:
+                for job in batch:
+                    if not job.event.is_set():
+                        job.finish(error=e)
+
+    def stop(self, timeout=5.0):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'queued': self._queue.qsize(),
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'batches': self.batches,
+                'mean_batch_size': round(self.batched_jobs / self.batches, 2) if self.batches else 0.0,
+            }
+
+
+class StubEngine:
+    """不联网、不加载模型的翻译引擎，返回带目标语言前缀的原文，delay 模拟模型耗时"""
+    name = 'stub'
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def translate_batch(self, texts, from_lang, to_lang):
+        if self.delay:
+            time.sleep(self.delay)
+        return [f"[{to_lang}] {text}" for text in texts]
+
+
+class ArgosEngine:
+    """常驻的 Argos 离线翻译引擎"""
+    name = 'argos'
+
+    def __init__(self, cache=None, warm_pairs=(), settings=None):
+        from offline_translator import Translator
+        self.translator = Translator(None, cache=cache, settings=settings)
+        if not self.translator.initialize(warm_pairs=warm_pairs):
+            raise RuntimeError("Argos 翻译引擎初始化失败")
+
+    def translate_batch(self, texts, from_lang, to_lang):
+        # 一批内所有文本的句子合并为一次模型推理
+        return self.translator.translate_batch(texts, from_lang, to_lang)
+
+
+class OnlineEngine:
+    """在线翻译引擎（OnlineTranslator 的封装）"""
+    name = 'online'
+
+    def __init__(self, engine_name='', cache=None, race_size=0):
+        from online_translator import OnlineTranslator
+        self.translator = OnlineTranslator(cache=cache)
+        if engine_name:
+            self.translator.set_translator(engine_name)
+        if race_size > 1:
+            self.translator.set_racing(True, race_size)
+
+    def translate_batch(self, texts, from_lang, to_lang):
+        return [self.translator.translate(text, from_lang, to_lang) for text in texts]
+
+
+def parse_translate_texts(params):
+    """
+    取出 /translate 请求中的待翻译文本，返回 (文本列表, 是否为单条 text 请求)。
+    texts 必须是字符串列表，text 必须是字符串，否则抛出 ValueError（返回 400）。
+    """
+    if 'texts' not in params:
+        text = params.get('text', '')
+        if not isinstance(text, str):
+            raise ValueError("text 必须是字符串")
+        return [text], True
+    texts = params['texts']
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        raise ValueError("texts 必须是字符串列表")
+    return texts, False
+
+
+def decode_image(data):
+    """将图片字节解码为灰度 NumPy 数组"""
+    import cv2
+    import numpy as np
+    if not data:
+        raise ValueError("图片数据为空")
+    try:
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    except cv2.error as e:
+        raise ValueError(f"无法解码图片: {e}")
+    if image is None or image.size == 0:
+        raise ValueError("无法解码图片")
+    return image
+
+
+class SkylarkService:
+    """OCR 和翻译的调度核心，与 HTTP 层无关，可直接在进程内使用"""
+
+    def __init__(self, engine, ocr_backend=None, ocr_workers=None,
+                 max_queue=DEFAULT_QUEUE_SIZE, max_batch=DEFAULT_MAX_BATCH,
+                 batch_window=DEFAULT_BATCH_WINDOW):
+        self.engine = engine
+        self.ocr_backend = ocr_backend or None
+        self.ocr_workers = ocr_workers or min(4, os.cpu_count() or 1)
+        self._local = threading.local()
+        self._pipelines = []
+        self._pipelines_lock = threading.Lock()
+        self.started = time.time()
+
+        # Tesseract 没有批量接口，OCR 请求由多个线程各自使用独立的流程并行处理
+        self.ocr_dispatcher = BatchingDispatcher(
+            'ocr', self._handle_ocr, max_queue=max_queue, workers=self.ocr_workers
+        )
+        # 翻译请求按语言对合并，一批只调用一次翻译引擎
+        self.translate_dispatcher = BatchingDispatcher(
+            'translate', self._handle_translate, max_queue=max_queue,
+            max_batch=max_batch, batch_window=batch_window
+        )
+
+    def _pipeline(self):
+        """当前 OCR 线程专用的识别流程（预处理缓冲区不能跨线程共用）"""
+        pipeline = getattr(self._local, 'pipeline', None)
+        if pipeline is None:
+            from ocr_engine import MultiPassRecognizer, get_ocr_backend
+            from ocr_pipeline import OCRPipeline
+            pipeline = OCRPipeline(backend_name=self.ocr_backend,
+                                   recognizer=MultiPassRecognizer(max_workers=2))
+            # 所有 OCR 线程共用同一后端，常驻引擎池需覆盖全部线程的并发识别
+            backend = get_ocr_backend(pipeline.backend_name)
+            if hasattr(backend, 'ensure_pool_size'):
+                backend.ensure_pool_size(self.ocr_workers * pipeline.recognizer.max_workers)
+            self._local.pipeline = pipeline
+            with self._pipelines_lock:
+                self._pipelines.append(pipeline)
+        return pipeline
+
+    def start(self, warm_up=True):
+        self.ocr_dispatcher.start()
+        self.translate_dispatcher.start()
+        if warm_up:
+            self.warm_up()
+
+    def warm_up(self):
+        """预先加载OCR引擎，避免第一个请求承担初始化开销"""
+        try:
+            import numpy as np
+            blank = np.full((48, 160), 255, dtype=np.uint8)
+            jobs = [self.ocr_dispatcher.submit((blank, 'eng')) for _ in range(self.ocr_workers)]
+            for job in jobs:
+                job.wait(DEFAULT_REQUEST_TIMEOUT)
+            print(f"OCR引擎已预热 ({self.ocr_workers} 个线程)")
+        except Exception as e:
+            print(f"OCR引擎预热失败: {e}")
+
+    def _handle_ocr(self, jobs):
+        pipeline = self._pipeline()
+        for job in jobs:
+            image, ocr_lang = job.payload
+            try:
+                text = pipeline.run(image, ocr_lang)
+                job.finish({
+                    'text': text,
+                    'confidence': round(pipeline.last_confidence, 2),
+                    'mode': pipeline.last_mode,
+                    'timings_ms': {name: round(ms, 2) for name, ms in pipeline.last_timings.items()},
+                })
+            except Exception as e:
+                job.finish(error=e)
+
+    def _handle_translate(self, jobs):
+        # 按语言对分组，同一批内的重复文本只翻译一次
+        groups = {}
+        for job in jobs:
+            texts, from_lang, to_lang = job.payload
+            groups.setdefault((from_lang, to_lang), []).append(job)
+
+        for (from_lang, to_lang), group in groups.items():
+            unique = list(dict.fromkeys(text for job in group for text in job.payload[0]))
+            try:
+                with span("service.translate_batch", size=len(unique)):
+                    translated = dict(zip(unique, self.engine.translate_batch(unique, from_lang, to_lang)))
+            except Exception as e:
+                for job in group:
+                    job.finish(error=e)
+                continue
+            for job in group:
+                job.finish([translated[text] for text in job.payload[0]])
+
+    def ocr(self, image, ocr_lang, timeout=DEFAULT_REQUEST_TIMEOUT):
+        return self.ocr_dispatcher.submit((image, ocr_lang)).wait(timeout)
+
+    def translate(self, texts, from_lang, to_lang, timeout=DEFAULT_REQUEST_TIMEOUT):
+        if not texts:
+            return []
+        return self.translate_dispatcher.submit((list(texts), from_lang, to_lang)).wait(timeout)
+
+    def stats(self):
+        stats = {
+            'engine': self.engine.name,
+            'uptime_s': round(time.time() - self.started, 1),
+            'ocr': self.ocr_dispatcher.stats(),
+            'translate': self.translate_dispatcher.stats(),
+            'latency': get_perf_monitor().snapshot(),
+        }
+        translator = getattr(self.engine, 'translator', None)
+        if getattr(translator, 'racing', False):
+            stats['race'] = translator.race_stats()
+        return stats
+
+    def close(self):
+        self.ocr_dispatcher.stop()
+        self.translate_dispatcher.stop()
+        with self._pipelines_lock:
+            for pipeline in self._pipelines:
+                pipeline.close()
+            self._pipelines.clear()
+        try:
+            from ocr_engine import shutdown_ocr_backends
+            shutdown_ocr_backends()
+        except ImportError:
+            pass
+        from http_transport import shutdown_transport
+        shutdown_transport()
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """HTTP 请求处理，self.server.service 为 SkylarkService"""
+    server_version = "SkylarkService/1.0"
+
+    def log_message(self, format, *args):
+        print(f"[service] {self.address_string()} {format % args}")
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise OverflowError(f"请求体超过 {MAX_BODY_BYTES // (1024 * 1024)} MB")
+        return self.rfile.read(length) if length else b""
+
+    def _read_image(self, body, params):
+        """图片可以是原始字节，也可以是 JSON {"image": base64, "from": ..., "to": ...}"""
+        content_type = self.headers.get('Content-Type', '')
+        if content_type.startswith('application/json'):
+            data = json.loads(body.decode('utf-8'))
+            params.update({key: value for key, value in data.items() if key != 'image'})
+            return decode_image(base64.b64decode(data.get('image', '')))
+        return decode_image(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/health':
+            self._send_json(200, {'status': 'ok', 'engine': self.server.service.engine.name})
+        elif path == '/stats':
+            self._send_json(200, self.server.service.stats())
+        else:
+            self._send_json(404, {'error': f"未知路径: {path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        service = self.server.service
+        timeout = self.server.request_timeout
+        try:
+            body = self._read_body()
+            if url.path == '/translate':
+                data = json.loads(body.decode('utf-8')) if body else {}
+                params.update(data)
+                texts, single = parse_translate_texts(params)
+                translations = service.translate(texts, params.get('from', 'en'), params.get('to', 'zh'), timeout)
+                result = {'translations': translations}
+                if single:
+                    result['translation'] = translations[0] if translations else ""
+                self._send_json(200, result)
+            elif url.path in ('/ocr', '/ocr_translate'):
+                image = self._read_image(body, params)
+                from_lang = params.get('from', 'en')
+                result = service.ocr(image, resolve_ocr_language(from_lang, params.get('ocr_lang')), timeout)
+                if url.path == '/ocr_translate':
+                    text = result['text']
+                    translations = service.translate([text], from_lang, params.get('to', 'zh'), timeout) if text else [""]
+                    result['translation'] = translations[0]
+                self._send_json(200, result)
+            else:
+                self._send_json(404, {'error': f"未知路径: {url.path}"})
+        except ServiceBusy as e:
+            self._send_json(503, {'error': str(e)}, headers={'Retry-After': '1'})
+        except TimeoutError as e:
+            self._send_json(504, {'error': str(e)})
+        except OverflowError as e:
+            self._send_json(413, {'error': str(e)})
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {'error': f"请求无效: {e}"})
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+
+
+def resolve_ocr_language(lang_code, ocr_lang=None):
+    """请求指定的 OCR 语言包优先，否则按源语言映射，未安装时使用英语"""
+    from languages import OCR_LANG_MAP
+    from ocr_engine import get_tessdata_registry
+    ocr_lang = ocr_lang or OCR_LANG_MAP.get(lang_code, 'eng')
+    if not get_tessdata_registry().has_language(ocr_lang):
+        return 'eng'
+    return ocr_lang
+
+
+def make_server(service, host='127.0.0.1', port=DEFAULT_PORT, request_timeout=DEFAULT_REQUEST_TIMEOUT):
+    """创建绑定到 service 的 HTTP 服务器（port=0 时自动选择端口）"""
+    server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.request_timeout = request_timeout
+    return server
+
+
+def create_engine(args, cache):
+    if args.engine == 'stub':
+        return StubEngine(delay=args.stub_delay)
+    if args.engine == 'online':
+        return OnlineEngine(args.online_engine, cache=cache, race_size=args.race)
+    warm_pairs = [tuple(pair.split('-', 1)) for pair in args.warm.split(',') if '-' in pair]
+    settings = None
+    if args.argos_settings:
+        from offline_translator import InferenceSettings
+        settings = InferenceSettings.load(args.argos_settings)
+    return ArgosEngine(cache=cache, warm_pairs=warm_pairs, settings=settings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Skylark 本地识别翻译服务")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址（默认只接受本机连接）")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--engine', choices=['argos', 'online', 'stub'], default='argos', help="翻译引擎")
+    parser.add_argument('--online-engine', default='', help="在线翻译引擎名称")
+    parser.add_argument('--race', type=int, default=0, help="在线翻译竞速：同时请求的引擎数（0 表示不竞速）")
+    parser.add_argument('--stub-delay', type=float, default=0.0, help="桩引擎每批模拟耗时（秒）")
+    parser.add_argument('--ocr-backend', default='', help="OCR后端（默认优先使用常驻引擎）")
+    parser.add_argument('--ocr-workers', type=int, default=0, help="OCR线程数（默认 min(4, CPU 核数)）")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE, help="每类请求的最大排队数")
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH, help="每批最多合并的翻译请求数")
+    parser.add_argument('--batch-window-ms', type=float, default=DEFAULT_BATCH_WINDOW * 1000,
+                        help="等待合并翻译请求的最长时间（毫秒）")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_REQUEST_TIMEOUT, help="单个请求的超时时间（秒）")
+    parser.add_argument('--cache', default='', help="翻译缓存 SQLite 文件")
+    parser.add_argument('--argos-settings', default='', help="离线推理设置 JSON 文件")
+    parser.add_argument('--warm', default='en-zh', help="启动时预热的 Argos 语言对，如 en-zh,ja-en")
+    parser.add_argument('--no-warmup', dest='warm_up', action='store_false', help="启动时不预热OCR引擎")
+    args = parser.parse_args()
+
+    cache = None
+    if args.cache:
+        from translation_cache import TranslationCache
+        cache = TranslationCache(args.cache)
+
+    try:
+        engine = create_engine(args, cache)
+    except Exception as e:
+        print(f"翻译引擎加载失败: {e}", file=sys.stderr)
+        return 1
+
+    service = SkylarkService(
+        engine, ocr_backend=args.ocr_backend, ocr_workers=args.ocr_workers,
+        max_queue=args.queue_size, max_batch=args.max_batch,
+        batch_window=args.batch_window_ms / 1000.0,
+    )
+    service.start(warm_up=args.warm_up)
+    server = make_server(service, args.host, args.port, args.timeout)
+    print(f"Skylark 服务已启动: http://{args.host}:{server.server_address[1]} (翻译引擎: {engine.name})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("正在停止服务...")
+    finally:
+        server.server_close()
+        service.close()
+        if cache is not None:
+            cache.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from incremental_ocr import IncrementalLineOCR, join_wrapped_lines
+
+
+class FakeBackend:
+    name = 'fake'
+
+
+class FakeRecognizer:
+    """按调用次数返回预设结果，记录每次识别的行带数"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+
+    def recognize_crops(self, backend, image, lang, regions):
+        self.calls.append(len(regions))
+        return [self.results.pop(0) for _ in regions]
+
+
+def two_line_image():
+    gray = np.full((60, 200), 255, dtype=np.uint8)
+    gray[10:22, 10:150] = 0
+    gray[36:48, 10:120] = 0
+    return gray
+
+
+def test_unchanged_bands_are_reused():
+    ocr = IncrementalLineOCR()
+    recognizer = FakeRecognizer([("first", 90.0), ("second", 90.0)])
+    gray = two_line_image()
+    assert ocr.recognize(recognizer, FakeBackend(), gray, 'eng')[0] == "first\nsecond"
+    assert ocr.recognize(recognizer, FakeBackend(), gray, 'eng')[0] == "first\nsecond"
+    assert recognizer.calls == [2]
+    assert ocr.last_reused == 2
+
+
+def test_empty_and_low_confidence_bands_are_retried():
+    ocr = IncrementalLineOCR(min_confidence=60)
+    recognizer = FakeRecognizer([("", 0.0), ("blurry", 20.0), ("first", 90.0), ("second", 90.0)])
+    gray = two_line_image()
+    assert ocr.recognize(recognizer, FakeBackend(), gray, 'eng')[0] == "blurry"
+    assert ocr.recognize(recognizer, FakeBackend(), gray, 'eng')[0] == "first\nsecond"
+    assert recognizer.calls == [2, 2]
+
+
+def test_join_wrapped_lines():
+    lines = ["This sentence wraps", "onto a second line.", "Short one!", "", "trailing"]
+    assert join_wrapped_lines(lines) == [
+        "This sentence wraps onto a second line.", "Short one!", "trailing"
+    ]
+    assert join_wrapped_lines(["这是一个被", "换行的句子。"]) == ["这是一个被换行的句子。"]
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("PIL")
+
+import numpy as np
+
+from screen_capture import FrameChangeDetector, watch_capture_plan
+
+CAPTURE_AREA = (100, 200, 500, 300)
+
+
+def frame_with_text(x):
+    frame = np.zeros((100, 400, 3), dtype=np.uint8)
+    frame[40:60, x:x + 80] = 255
+    return frame
+
+
+def test_plan_without_overlay():
+    assert watch_capture_plan(CAPTURE_AREA, None) == (None, False)
+    assert watch_capture_plan(CAPTURE_AREA, (600, 200, 700, 300)) == (None, False)
+
+
+def test_plan_masks_partial_overlap():
+    mask, hide = watch_capture_plan(CAPTURE_AREA, (400, 250, 600, 350))
+    assert mask == (300, 50, 400, 100)
+    assert hide is False
+
+
+def test_overlay_covering_capture_area_still_detects_changes():
+    mask, hide = watch_capture_plan(CAPTURE_AREA, CAPTURE_AREA)
+    assert mask is None
+    assert hide is True
+
+    detector = FrameChangeDetector(stable_frames=0)
+    assert detector.update(frame_with_text(20), mask=mask)
+    assert not detector.update(frame_with_text(20), mask=mask)
+    assert detector.update(frame_with_text(200), mask=mask)
+    assert detector.update(frame_with_text(20), mask=mask)
@@ -0,0 +1,52 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from skylark_service import SkylarkService, StubEngine, make_server, parse_translate_texts
+
+
+@pytest.fixture
+def server():
+    service = SkylarkService(StubEngine(), ocr_workers=1)
+    service.start(warm_up=False)
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def post_translate(server, payload):
+    url = f"http://127.0.0.1:{server.server_address[1]}/translate"
+    request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_parse_translate_texts():
+    assert parse_translate_texts({'text': 'hi'}) == (['hi'], True)
+    assert parse_translate_texts({'texts': ['a', 'b']}) == (['a', 'b'], False)
+    for texts in ("hello", {'a': 1}, ['a', 1]):
+        with pytest.raises(ValueError):
+            parse_translate_texts({'texts': texts})
+
+
+def test_translate_texts_list(server):
+    status, body = post_translate(server, {'texts': ['hello', 'world'], 'to': 'zh'})
+    assert status == 200
+    assert body['translations'] == ['[zh] hello', '[zh] world']
+
+
+def test_translate_texts_string_is_rejected(server):
+    status, body = post_translate(server, {'texts': 'hello'})
+    assert status == 400
+    assert 'texts' in body['error']
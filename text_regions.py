@@ -0,0 +1,113 @@
+"""
+文字区域检测（不依赖 Qt）
+
+使用形态学梯度 + Otsu 二值化 + 水平闭运算定位文字行，返回按阅读顺序排列的文字框。
+截图区域很大而文字稀疏时，只对这些文字框做OCR，可以大幅减少 Tesseract 的处理量。
+
+segment_line_bands 按水平投影把截图切分为整行宽度的行带，供增量识别使用。
+"""
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# x, y, w, h: 文字框（已含边距）；row: 阅读顺序中的行号；psm: 建议的 Tesseract 页面分割模式
+TextRegion = namedtuple('TextRegion', ['x', 'y', 'w', 'h', 'row', 'psm'])
+
+GRADIENT_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+LINE_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 3))  # 将同一行的字符连成一片
+
+# 文字框覆盖面积低于该比例时才视为稀疏区域，值得分块识别
+SPARSE_COVERAGE = 0.4
+# 小于该像素数的截图直接整图识别，分块没有收益
+MIN_PIXELS_FOR_REGIONS = 120000
+
+
+def detect_text_regions(gray, padding=4, min_size=6, min_fill=0.15, max_regions=64):
+    """
+    检测灰度图中的文字框，按阅读顺序（从上到下、从左到右）返回 TextRegion 列表。
+    文字框过多（通常是纹理或噪点）时返回 None，由调用方回退到整图识别。
+    """
+    height, width = gray.shape[:2]
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, GRADIENT_KERNEL)
+    _, edges = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    connected = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, LINE_KERNEL)
+    contours, _ = cv2.findContours(connected, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w < min_size or h < min_size:
+            continue
+        # 边缘像素占比过低的框通常是大片色块的轮廓而不是文字
+        fill = cv2.countNonZero(edges[y:y + h, x:x + w]) / float(w * h)
+        if fill < min_fill:
+            continue
+        boxes.append((x, y, w, h))
+
+    if len(boxes) > max_regions:
+        return None
+    if not boxes:
+        return []
+
+    line_height = float(np.median([h for _, _, _, h in boxes]))
+
+    # 按垂直中心分行，同一行内按 x 排序
+    boxes.sort(key=lambda box: box[1] + box[3] / 2.0)
+    rows = []
+    for box in boxes:
+        center = box[1] + box[3] / 2.0
+        if rows and abs(center - rows[-1][0]) <= line_height / 2.0:
+            rows[-1][1].append(box)
+        else:
+            rows.append([center, [box]])
+
+    regions = []
+    for row_index, (_, row_boxes) in enumerate(rows):
+        for x, y, w, h in sorted(row_boxes):
+            psm = 7 if h <= line_height * 1.6 else 6  # 单行文字用 psm 7，多行文字块用 psm 6
+            x1, y1 = max(0, x - padding), max(0, y - padding)
+            x2, y2 = min(width, x + w + padding), min(height, y + h + padding)
+            regions.append(TextRegion(x1, y1, x2 - x1, y2 - y1, row_index, psm))
+    return regions
+
+
+def segment_line_bands(gray, min_height=6, max_gap=2, padding=3):
+    """
+    按水平投影将（已二值化的）图像切分为文字行带，返回 [(y1, y2)]，从上到下排列。
+    像素数较少的一侧视为文字墨迹，因此深色和浅色文字都适用。
+    """
+    height, width = gray.shape[:2]
+    dark = gray < 128
+    ink = dark if np.count_nonzero(dark) < dark.size / 2 else ~dark
+    profile = np.count_nonzero(ink, axis=1)
+    has_ink = profile >= max(1, int(width * 0.002))
+
+    # 找出连续的有墨迹的行区间
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], has_ink.astype(np.int8), [0]))))
+    runs = list(zip(edges[::2], edges[1::2]))
+
+    bands = []
+    for start, end in runs:
+        if bands and start - bands[-1][1] <= max_gap:
+            bands[-1][1] = end
+        else:
+            bands.append([start, end])
+
+    return [(max(0, start - padding), min(height, end + padding))
+            for start, end in bands if end - start >= min_height]
+
+
+def region_coverage(regions, shape):
+    """文字框面积占整图面积的比例"""
+    total = shape[0] * shape[1]
+    if not total:
+        return 0.0
+    return sum(region.w * region.h for region in regions) / float(total)
+
+
+def should_use_regions(regions, shape):
+    """截图足够大且文字稀疏时才分块识别"""
+    if not regions or shape[0] * shape[1] < MIN_PIXELS_FOR_REGIONS:
+        return False
+    return region_coverage(regions, shape) < SPARSE_COVERAGE
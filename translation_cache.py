@@ -0,0 +1,199 @@
+"""
+翻译结果缓存（不依赖 Qt）
+
+两级缓存，键为 (规范化文本, 源语言, 目标语言, 翻译引擎)：
+- 内存 LRU：容量固定，命中时无需任何 I/O
+- 磁盘 SQLite：保存在应用数据目录，跨进程重启保留
+两级都支持过期时间（TTL）和按条目数淘汰。
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MEMORY_ENTRIES = 512
+DEFAULT_DISK_ENTRIES = 20000
+DEFAULT_TTL = 7 * 24 * 3600  # 7天
+
+
+def normalize_text(text):
+    """规范化OCR文本：合并行内多余空白，去掉空行，保留换行结构"""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class TranslationCache:
+    """内存 LRU + SQLite 两级翻译缓存，可在多个线程中共享"""
+
+    def __init__(self, db_path=None, max_memory_entries=DEFAULT_MEMORY_ENTRIES,
+                 max_disk_entries=DEFAULT_DISK_ENTRIES, ttl=DEFAULT_TTL):
+        self.db_path = str(db_path) if db_path else None
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+
+        self._memory = OrderedDict()  # key -> (translation, created)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._puts_since_evict = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.db_path:
+            self._open_database()
+
+    def _open_database(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " key TEXT PRIMARY KEY,"
+                " engine TEXT, source TEXT, target TEXT,"
+                " translation TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_translations_accessed ON translations(accessed)"
+            )
+            self._conn.commit()
+            self._evict_disk()
+            print(f"翻译缓存数据库: {self.db_path}")
+        except Exception as e:
+            print(f"打开翻译缓存数据库失败，仅使用内存缓存: {e}")
+            self._conn = None
+
+    @staticmethod
+    def make_key(text, from_lang, to_lang, engine):
+        raw = "\x1f".join((engine or "", from_lang or "", to_lang or "", normalize_text(text)))
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _expired(self, created, now):
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, text, from_lang, to_lang, engine):
+        """查询缓存，未命中或已过期时返回 None"""
+        key = self.make_key(text, from_lang, to_lang, engine)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                translation, created = entry
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return translation
+                del self._memory[key]
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT translation, created FROM translations WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        translation, created = row
+                        if not self._expired(created, now):
+                            self._conn.execute(
+                                "UPDATE translations SET accessed = ? WHERE key = ?", (now, key)
+                            )
+                            self._conn.commit()
+                            self._remember(key, translation, created)
+                            self.disk_hits += 1
+                            return translation
+                        self._conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+                        self._conn.commit()
+                except sqlite3.Error as e:
+                    print(f"读取翻译缓存失败: {e}")
+
+            self.misses += 1
+            return None
+
+    def put(self, text, from_lang, to_lang, engine, translation):
+        """写入缓存（空结果不缓存）"""
+        if not translation or not text or not text.strip():
+            return
+        key = self.make_key(text, from_lang, to_lang, engine)
+        now = time.time()
+        with self._lock:
+            self._remember(key, translation, now)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO translations"
+                    " (key, engine, source, target, translation, created, accessed)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, engine, from_lang, to_lang, translation, now, now)
+                )
+                self._conn.commit()
+                self._puts_since_evict += 1
+                if self._puts_since_evict >= 100:
+                    self._evict_disk()
+            except sqlite3.Error as e:
+                print(f"写入翻译缓存失败: {e}")
+
+    def _remember(self, key, translation, created):
+        """写入内存 LRU，超出容量时淘汰最久未使用的条目"""
+        self._memory[key] = (translation, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """删除过期条目，并按最近访问时间淘汰超出容量的条目"""
+        self._puts_since_evict = 0
+        if self._conn is None:
+            return
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM translations WHERE key IN ("
+            " SELECT key FROM translations ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+        self._conn.commit()
+
+    def stats(self):
+        """返回命中/未命中计数及各级缓存条目数"""
+        with self._lock:
+            disk_entries = 0
+            if self._conn is not None:
+                try:
+                    disk_entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'hits': hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+            }
+
+    def clear(self):
+        """清空两级缓存并重置计数"""
+        with self._lock:
+            self._memory.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM translations")
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    print(f"清空翻译缓存失败: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None